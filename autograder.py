@@ -1,16 +1,24 @@
 """COP2273 Autograder v2 — entry point.
 
 Run this file directly:
-    python autograder.py
+    python autograder.py [--metrics-port PORT]
+
+--metrics-port serves Prometheus metrics on 127.0.0.1:PORT/metrics.
 
 The old monolithic implementation is preserved as autograder_v1.py.
 """
 
+import argparse
 import sys
 import tkinter as tk
 
 
 def main():
+    ap = argparse.ArgumentParser(description="COP2273 Autograder")
+    ap.add_argument("--metrics-port", type=int, default=None,
+                    help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    args = ap.parse_args()
+
     # macOS: set app name in menu bar / Dock
     if sys.platform == "darwin":
         try:
@@ -35,7 +43,7 @@ def main():
             pass
 
     from ui.app import App
-    App(root)
+    App(root, metrics_port=args.metrics_port)
     root.mainloop()
 
 
@@ -0,0 +1,202 @@
+"""Comparator micro-benchmarks with a regression gate.
+
+Usage:
+    python -m benchmarks.bench_comparator              # compare with baseline
+    python -m benchmarks.bench_comparator --record     # write a new baseline
+    python -m benchmarks.bench_comparator [--tolerance 0.4] [--only NAME]
+        [--baseline FILE]
+
+Cases are built from the checked-in corpus in benchmarks/data (a long menu
+session and a cosmetic variant of it, a CSV, a binary file and a file of
+repetitive lines), scaled up where the case calls for it.
+
+Each case is timed in several rounds, each bracketed by timings of a fixed
+calibration loop doing the same kind of work (string methods, a regex and
+integer arithmetic). The case's time relative to the calibration is
+computed per round and the median is kept. A baseline recorded on one
+machine therefore stays meaningful on another, and a load spike on a
+shared machine slows the case and its calibration alike. Exits non-zero
+when any case is slower than its baseline by more than the tolerance,
+after timing it a second time to rule out a noisy first measurement.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import timeit
+from typing import Callable
+
+from engine.comparator import (
+    SemanticExtractor, _file_match, _normalize, classify_test, unified_diff_lines,
+)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "comparator_baseline.json")
+DEFAULT_TOLERANCE = 0.4
+
+_ROUNDS = 7
+_ROUND_S = 0.05         # minimum length of one timing
+
+
+def _read(name: str) -> str:
+    with open(os.path.join(DATA_DIR, name), encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def _read_bytes(name: str) -> bytes:
+    with open(os.path.join(DATA_DIR, name), "rb") as f:
+        return f.read()
+
+
+def cases() -> dict[str, Callable[[], object]]:
+    """name -> zero-argument callable; all setup happens here, untimed."""
+    menu, menu_student = _read("menu_session_base.txt"), _read("menu_session_student.txt")
+    long_menu, long_student = menu * 20, menu_student * 20
+    csv = _read("contacts.csv") * 20
+    csv_crlf = csv.replace("\n", "\r\n")                        # csv.writer line endings
+    csv_edited = csv.replace("Gator,", "Gator ,", 50)
+    photo = _read_bytes("photo.bin") * 16
+    repetitive = _read("repetitive.txt") * 100
+    inputs = ["list", "add", "Ally Gator", "exit"]
+    extractor = SemanticExtractor()
+
+    menu_raw, student_raw = {"stdout": long_menu}, {"stdout": long_student}
+    csv_base = {"stdout": "Saved.\n", "files": {"contacts.csv": csv}}
+    csv_student = {"stdout": "Saved.\n", "files": {"contacts.csv": csv_crlf}}
+    bin_base = {"stdout": "", "files": {"photo.bin": photo}}
+    bin_student = {"stdout": "", "files": {"photo.bin": photo[:-1] + b"\0"}}
+
+    return {
+        "classify_test/long_menu":
+            lambda: classify_test(1, inputs, menu_raw, student_raw),
+        "classify_test/huge_csv":
+            lambda: classify_test(1, inputs, csv_base, csv_student,
+                                  expected_fname="contacts.csv"),
+        "classify_test/binary_file":
+            lambda: classify_test(1, inputs, bin_base, bin_student),
+        "extract/long_menu":        lambda: extractor.extract(long_menu, inputs),
+        "extract/repetitive":       lambda: extractor.extract(repetitive, inputs),
+        "normalize/long_menu":      lambda: _normalize(long_menu),
+        "normalize/repetitive":     lambda: _normalize(repetitive),
+        "file_match/huge_csv":
+            lambda: _file_match({"contacts.csv": csv}, {"contacts.csv": csv_crlf}),
+        "file_match/binary":
+            lambda: _file_match({"photo.bin": photo}, {"photo.bin": photo}),
+        "unified_diff/long_menu":   lambda: unified_diff_lines(long_menu, long_student),
+        "unified_diff/huge_csv":    lambda: unified_diff_lines(csv, csv_edited),
+        "unified_diff/repetitive":
+            lambda: unified_diff_lines(repetitive, repetitive.replace("x\n", "y\n", 500)),
+    }
+
+
+_CALIBRATION_TEXT = "\n".join(f"  Item {i}:   Value = {i * 7 % 13}  " for i in range(200))
+_CALIBRATION_SPACES = re.compile(r"\s+")
+
+
+def _calibration():
+    total = 0
+    for line in _CALIBRATION_TEXT.split("\n"):
+        total += len(_CALIBRATION_SPACES.sub(" ", line.strip()).lower().split("="))
+    for i in range(20_000):
+        total += i % 7
+    return total
+
+
+def _timer(fn: Callable[[], object]) -> Callable[[], float]:
+    """A function timing fn per call, over at least _ROUND_S."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < _ROUND_S:
+        number *= 2
+    return lambda: timer.timeit(number) / number
+
+
+def measure(fn: Callable[[], object], rounds: int = _ROUNDS) -> tuple[float, float, float]:
+    """(seconds per call, calibration seconds, relative time), as medians
+    over rounds of fn timed between two calibration timings."""
+    case, calibrate = _timer(fn), _timer(_calibration)
+    seconds, calibrations, relative = [], [], []
+    for _ in range(rounds):
+        before = calibrate()
+        now = case()
+        calibration = (before + calibrate()) / 2
+        seconds.append(now)
+        calibrations.append(calibration)
+        relative.append(now / calibration)
+    return (statistics.median(seconds), statistics.median(calibrations),
+            statistics.median(relative))
+
+
+def run(only: str = "", names: list[str] | None = None) -> dict:
+    """Time every case whose name contains only (or the given names)."""
+    results = {}
+    calibrations = []
+    for name, fn in cases().items():
+        if (names is None and only in name) or (names is not None and name in names):
+            seconds, calibration, relative = measure(fn)
+            results[name] = {"seconds": seconds, "relative": relative}
+            calibrations.append(calibration)
+    return {"python": sys.version.split()[0],
+            "calibration_s": statistics.median(calibrations) if calibrations else 0.0,
+            "benchmarks": results}
+
+
+def regressions(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """Cases whose relative time exceeds the baseline's by more than tolerance."""
+    failed = []
+    for name, now in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before and now["relative"] > before["relative"] * (1 + tolerance):
+            failed.append(name)
+    return failed
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--record", action="store_true", help="write a new baseline")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    ap.add_argument("--only", default="", help="run cases whose name contains this")
+    args = ap.parse_args(argv)
+
+    current = run(args.only)
+    baseline = None
+    if not args.record and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    failed = regressions(baseline, current, args.tolerance) if baseline else []
+    if failed:
+        retry = run(names=failed)
+        for name, again in retry["benchmarks"].items():
+            if again["relative"] < current["benchmarks"][name]["relative"]:
+                current["benchmarks"][name] = again
+        failed = regressions(baseline, current, args.tolerance)
+
+    print(f"{'case':28s} {'time':>10s} {'x calib':>8s} {'baseline':>9s}")
+    for name, now in current["benchmarks"].items():
+        row = f"{name:28s} {now['seconds'] * 1000:8.3f}ms {now['relative']:8.2f}"
+        before = baseline and baseline["benchmarks"].get(name)
+        if before:
+            row += f" {now['relative'] / before['relative'] - 1:+8.1%}"
+        print(row + ("  REGRESSED" if name in failed else ""))
+
+    if args.record:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+    elif baseline is None:
+        print(f"No baseline at {args.baseline}; run with --record first")
+    elif failed:
+        print(f"{len(failed)} case(s) regressed by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Benchmark engine.diff against difflib.SequenceMatcher.
+
+Usage:
+    python -m benchmarks.bench_diff [--skip-difflib]
+
+Each case diffs a base output against a lightly edited student output and
+reports time and the number of lines kept as 'equal' (more is better).
+"""
+
+from __future__ import annotations
+
+import difflib
+import random
+import sys
+import time
+
+from benchmarks.corpus import contact_manager_output, perturb, record_output
+from engine.diff import diff_opcodes
+
+
+def _equal_lines(opcodes) -> int:
+    return sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == "equal")
+
+
+def _cases():
+    menu = contact_manager_output(50_000, seed=1)
+    yield "menu loop, 50k lines", menu, perturb(menu)
+    records = record_output(20_000)
+    yield "repeated rows, 20k lines", records, perturb(records)
+    lines = menu.split("\n")
+    yield "reordered, 50k lines", menu, "\n".join(random.Random(2).sample(lines, len(lines)))
+    huge = contact_manager_output(150_000, seed=3)
+    yield "over max_lines, 150k", huge, perturb(huge)
+
+
+def main(skip_difflib: bool = False):
+    print(f"{'case':26s} {'engine.diff':>12s} {'equal':>8s} {'difflib':>10s} {'equal':>8s}")
+    for name, base, student in _cases():
+        a, b = base.split("\n"), student.split("\n")
+        start = time.perf_counter()
+        ops = diff_opcodes(a, b)
+        t_new = time.perf_counter() - start
+        row = f"{name:26s} {t_new * 1000:10.1f}ms {_equal_lines(ops):8d}"
+        if not skip_difflib:
+            start = time.perf_counter()
+            sm_ops = difflib.SequenceMatcher(None, a, b).get_opcodes()
+            t_sm = time.perf_counter() - start
+            row += f" {t_sm * 1000:8.1f}ms {_equal_lines(sm_ops):8d}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main(skip_difflib="--skip-difflib" in sys.argv)
@@ -0,0 +1,44 @@
+"""Benchmark SemanticExtractor against the rule-by-rule reference.
+
+Usage:
+    python -m benchmarks.bench_extractor [megabytes]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+from benchmarks.corpus import contact_manager_output
+from benchmarks.reference import ReferenceSemanticExtractor
+from engine.comparator import SemanticExtractor
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(megabytes: float = 4.0):
+    # ~23 bytes per generated line; ~20% of lines are distinct list items
+    stdout = contact_manager_output(int(megabytes * 1_000_000 / 23))
+    inputs = ["d", "a", "Ally Gator", "q"]
+
+    fast, ref = SemanticExtractor(), ReferenceSemanticExtractor()
+    assert fast.extract(stdout, inputs) == ref.extract(stdout, inputs)
+
+    t_ref  = _best_of(lambda: ref.extract(stdout, inputs))
+    t_fast = _best_of(lambda: fast.extract(stdout, inputs))
+    size = len(stdout) / 1e6
+    print(f"stdout: {size:.1f} MB, {stdout.count(chr(10)) + 1} lines")
+    print(f"  reference : {t_ref * 1000:8.1f} ms  ({size / t_ref:6.1f} MB/s)")
+    print(f"  single-pass: {t_fast * 1000:7.1f} ms  ({size / t_fast:6.1f} MB/s)")
+    print(f"  speedup   : {t_ref / t_fast:8.2f}x")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 4.0)
@@ -0,0 +1,59 @@
+"""Pathological-input benchmark for SemanticExtractor.
+
+Each adversarial line shape is timed at n and 2n characters with the
+per-line length guard disabled, so the extractor rules themselves are
+measured. Linear rules roughly double; anything near 4x is quadratic.
+The guarded extract() of a 1 MB line must also finish within a budget.
+
+Usage:
+    python -m benchmarks.bench_redos [n]
+
+Exits non-zero if any shape scales super-linearly or blows the budget.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+from benchmarks.corpus import ADVERSARIAL_LINES
+from engine.comparator import SemanticExtractor
+
+MAX_RATIO      = 3.0     # time(2n) / time(n); quadratic would be ~4
+GUARD_BUDGET_S = 0.05    # one 1 MB line through the guarded extract()
+
+
+def _time(fn) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(n: int = 200_000) -> int:
+    unguarded = SemanticExtractor()
+    unguarded.MAX_CLASSIFY_LEN = sys.maxsize
+    guarded = SemanticExtractor()
+
+    failures = 0
+    print(f"{'shape':18s} {'n':>10s} {'2n':>10s} {'ratio':>6s} {'1 MB guarded':>13s}")
+    for name, build in ADVERSARIAL_LINES.items():
+        small, large = build(n), build(2 * n)
+        t_small = _time(lambda: unguarded.extract(small, []))
+        t_large = _time(lambda: unguarded.extract(large, []))
+        ratio = t_large / max(t_small, 1e-9)
+
+        huge = build(1_000_000)
+        t_guard = _time(lambda: guarded.extract(huge, []))
+
+        bad = ratio > MAX_RATIO or t_guard > GUARD_BUDGET_S
+        failures += bad
+        print(f"{name:18s} {t_small * 1000:8.2f}ms {t_large * 1000:8.2f}ms "
+              f"{ratio:6.2f} {t_guard * 1000:11.2f}ms{'  FAIL' if bad else ''}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
@@ -0,0 +1,165 @@
+"""End-to-end grading throughput on a synthetic class.
+
+Usage:
+    python -m benchmarks.bench_throughput [--students N] [--tests M]
+        [--workers W] [--timeout S] [--mix perfect=60,crash=20,...]
+        [--history FILE] [--label TEXT] [--metrics-port PORT]
+
+Generates a class (benchmarks/classgen.py), runs the base solution,
+ScriptRunner.run_batch and classification exactly as the app does, and
+reports students/s, per-test latency percentiles and peak RSS. Each result
+is appended to a JSON-lines history file and compared with the last run that
+used the same parameters. --metrics-port serves Prometheus metrics while the
+benchmark runs (see engine/exporter.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+from benchmarks.classgen import DEFAULT_MIX, KINDS, generate_class, parse_mix
+from engine.exporter import MetricsExporter
+from engine.metrics import RunMetrics
+from engine.reclassify import RawBatch, classify_batch
+from engine.runner import ScriptRunner
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(__file__), "throughput_history.jsonl")
+
+
+def run_benchmark(
+    n_students: int = 100,
+    n_tests: int = 5,
+    workers: int = 4,
+    timeout: int = 2,
+    mix: dict[str, float] | None = None,
+    seed: int = 0,
+    metrics: RunMetrics | None = None,
+) -> dict:
+    """Grade a freshly generated class and return its metrics."""
+    mix = mix or DEFAULT_MIX
+    with tempfile.TemporaryDirectory() as root:
+        cls = generate_class(root, n_students, n_tests, mix, seed)
+        runner = ScriptRunner(timeout=timeout)
+        paths = runner.find_student_submissions(cls.assignment_path, "folder")
+
+        start = time.perf_counter()
+        base_raws = runner.run_base_solution(
+            cls.base_path, cls.test_cases, "folder", cls.assignment_path)
+        all_raw = runner.run_batch(paths, cls.test_cases, "folder", cls.assignment_path,
+                                   max_workers=workers, metrics=metrics)
+        executed = time.perf_counter()
+
+        batch = RawBatch(base_raws, cls.test_cases)
+        for path in paths:
+            batch.add(os.path.basename(path), path, all_raw[os.path.basename(path)])
+        results = classify_batch(batch, cls.test_cases, max_workers=workers)
+        done = time.perf_counter()
+
+    latencies = sorted(raw["elapsed"] for raws in all_raw.values() for raw in raws
+                       if raw.get("elapsed") is not None)
+    categories: dict[str, int] = {}
+    for r in results:
+        categories[r.category.value] = categories.get(r.category.value, 0) + 1
+    return {
+        "params": {"students": n_students, "tests": n_tests, "workers": workers,
+                   "timeout": timeout, "mix": mix, "seed": seed},
+        "python": sys.version.split()[0],
+        "total_s": done - start,
+        "execute_s": executed - start,
+        "classify_s": done - executed,
+        "students_per_s": n_students / (done - start),
+        "test_p50_ms": _percentile(latencies, 50) * 1000,
+        "test_p99_ms": _percentile(latencies, 99) * 1000,
+        "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        "peak_child_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+        "categories": categories,
+    }
+
+
+def _percentile(ordered: list[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _peak_rss_mb(who) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def _previous(history: str, params: dict) -> dict | None:
+    if not os.path.exists(history):
+        return None
+    last = None
+    with open(history, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("params") == params:
+                last = record
+    return last
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--students", type=int, default=100)
+    ap.add_argument("--tests", type=int, default=5)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--timeout", type=int, default=2, help="per-test timeout (s)")
+    ap.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                    help=f"kind=weight list; kinds: {', '.join(KINDS)}")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--history", default=DEFAULT_HISTORY)
+    ap.add_argument("--label", default="")
+    ap.add_argument("--metrics-port", type=int, default=None,
+                    help="serve Prometheus metrics on 127.0.0.1:PORT while running")
+    args = ap.parse_args(argv)
+
+    metrics = exporter = None
+    if args.metrics_port is not None:
+        metrics = RunMetrics()
+        exporter = MetricsExporter(metrics)
+        print(f"Metrics on http://127.0.0.1:{exporter.serve(args.metrics_port)}/metrics")
+    try:
+        result = run_benchmark(args.students, args.tests, args.workers, args.timeout,
+                               args.mix, args.seed, metrics)
+    finally:
+        if exporter is not None:
+            exporter.close()
+    result["label"] = args.label
+    result["when"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    previous = _previous(args.history, result["params"])
+
+    print(f"{args.students} students x {args.tests} tests, {args.workers} workers")
+    for key, unit in (("total_s", "s"), ("execute_s", "s"), ("classify_s", "s"),
+                      ("students_per_s", "/s"), ("test_p50_ms", "ms"),
+                      ("test_p99_ms", "ms"), ("peak_rss_mb", "MB"),
+                      ("peak_child_rss_mb", "MB")):
+        value = result[key]
+        if value is None:
+            continue
+        row = f"  {key:18s} {value:10.2f} {unit}"
+        if previous and previous.get(key):
+            row += f"   ({value / previous[key] - 1:+.1%} vs {previous['when']})"
+        print(row)
+    print("  categories        ", ", ".join(f"{k}={v}" for k, v in
+                                            sorted(result["categories"].items())))
+
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
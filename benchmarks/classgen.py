@@ -0,0 +1,146 @@
+"""Synthetic assignments: a base solution plus a class of generated submissions.
+
+Every program is a small contact manager reading commands from stdin:
+
+    a <name>   add a contact          d   display contacts
+    s          save to out.csv        q   quit
+
+generate_class() writes a folder-mode assignment (one folder per student, a
+clean contacts.csv in the assignment root) with a chosen mix of submission
+kinds, and returns the test cases to grade it with.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from dataclasses import dataclass
+
+_BASE = '''\
+contacts = [line.strip() for line in open("contacts.csv") if line.strip()]
+print("Contact Manager")
+print("COMMAND MENU")
+print("a - Add a contact, d - Display, s - Save, q - Quit")
+while True:
+    cmd = input("Command: ").strip()
+    if cmd == "q":
+        print("Goodbye!")
+        break
+    if cmd.startswith("a "):
+        contacts.append(cmd[2:])
+        print(f"{cmd[2:]} was added.")
+    elif cmd == "d":
+        for i, name in enumerate(contacts, 1):
+            print(f"{i}. {name}")
+    elif cmd == "s":
+        with open("out.csv", "w") as f:
+            f.write("\\n".join(contacts) + "\\n")
+        print("Saved.")
+    else:
+        print("Invalid command.")
+'''
+
+# Each kind is the base program with one edit: (old, new)
+_EDITS = {
+    "perfect":     ("", ""),
+    # Same behaviour, different prompt wording
+    "cosmetic":    ('input("Command: ")', 'input("Enter a command: ")'),
+    "crash":       ('elif cmd == "d":', 'elif cmd == "d":\n        raise ValueError("bad index")'),
+    "timeout":     ('cmd = input("Command: ").strip()',
+                    'cmd = input("Command: ").strip()\n    while cmd == "d":\n        pass'),
+    # Prints every contact 5000 times on display
+    "huge_output": ('for i, name in enumerate(contacts, 1):',
+                    'for i, name in enumerate(contacts * 5000, 1):'),
+    # Saves correctly, and also leaves a pile of scratch files behind
+    "file_writer": ('print("Saved.")',
+                    'print("Saved.")\n        for k in range(20):\n'
+                    '            open(f"scratch{k}.txt", "w").write("x" * 50_000)'),
+}
+
+KINDS = tuple(_EDITS)
+
+DEFAULT_MIX = {"perfect": 0.6, "cosmetic": 0.15, "crash": 0.1,
+               "timeout": 0.02, "huge_output": 0.03, "file_writer": 0.1}
+
+
+@dataclass(frozen=True)
+class SyntheticClass:
+    base_path: str
+    assignment_path: str
+    test_cases: list[dict]
+    kinds: dict[str, str]       # student name -> kind
+
+
+def program(kind: str) -> str:
+    """Source of one submission of the given kind."""
+    old, new = _EDITS[kind]
+    return _BASE.replace(old, new, 1) if old else _BASE
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """'perfect=70,crash=30' -> {'perfect': 0.7, 'crash': 0.3}."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        kind, _, weight = part.partition("=")
+        if kind not in _EDITS:
+            raise ValueError(f"Unknown submission kind {kind!r}; choose from {', '.join(KINDS)}")
+        mix[kind] = float(weight or 1)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("mix weights must add up to more than 0")
+    return {kind: weight / total for kind, weight in mix.items()}
+
+
+def generate_class(
+    root: str,
+    n_students: int,
+    n_tests: int,
+    mix: dict[str, float] | None = None,
+    seed: int = 0,
+) -> SyntheticClass:
+    """Write a base solution and n_students submissions under root.
+
+    Kinds are assigned in proportion to the mix weights (exactly, up to
+    rounding), then shuffled. Every third test saves and checks out.csv.
+    """
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    base_path = os.path.join(root, "base")
+    assignment_path = os.path.join(root, "assignment")
+    os.makedirs(base_path)
+    os.makedirs(assignment_path)
+    with open(os.path.join(assignment_path, "contacts.csv"), "w") as f:
+        f.write("Ally Gator\nAlbert Gator\n")
+    with open(os.path.join(base_path, "main.py"), "w") as f:
+        f.write(_BASE)
+
+    # Largest-remainder split of n_students by weight
+    total = sum(mix.values())
+    exact = {kind: weight / total * n_students for kind, weight in mix.items()}
+    counts = {kind: int(share) for kind, share in exact.items()}
+    short = n_students - sum(counts.values())
+    for kind in sorted(exact, key=lambda k: exact[k] - counts[k], reverse=True)[:short]:
+        counts[kind] += 1
+    kinds = [kind for kind, n in counts.items() for _ in range(n)]
+    rng.shuffle(kinds)
+
+    assigned = {}
+    for i, kind in enumerate(kinds):
+        name = f"student{i:04d}"
+        folder = os.path.join(assignment_path, name)
+        os.makedirs(folder)
+        with open(os.path.join(folder, "main.py"), "w") as f:
+            f.write(program(kind))
+        assigned[name] = kind
+
+    test_cases = []
+    for t in range(n_tests):
+        commands = [f"a Contact {rng.randint(1, 999)}" for _ in range(rng.randint(1, 3))]
+        commands.append("d")
+        tc = {"input": commands}
+        if t % 3 == 2:
+            commands.append("s")
+            tc["expected_filename"] = "out.csv"
+        commands.append("q")
+        test_cases.append(tc)
+    return SyntheticClass(base_path, assignment_path, test_cases, assigned)
@@ -0,0 +1,102 @@
+"""Synthetic program outputs shaped like real COP2273 submissions."""
+
+from __future__ import annotations
+
+import random
+
+# Lines a contact-manager style assignment typically prints
+SAMPLE_LINES = [
+    "Contact Manager",
+    "COMMAND MENU",
+    "==============",
+    "[D]isplay - Display all contacts",
+    "[V]iew - View a contact",
+    "[A]dd - Add a contact",
+    "[R]emove - Remove a contact",
+    "[Q]uit - Exit program",
+    "Command: ",
+    "Enter a filename: ",
+    "Would you like to continue (y/n)?",
+    "1. Ally Gator",
+    "2. Albert Gator",
+    "Name: Ally Gator",
+    "Email: ally@ufl.edu",
+    "Phone: 352-555-0100",
+    "Ally Gator was added.",
+    'Ally Gator was removed and the file "contacts.csv" has been updated accordingly.',
+    "Invalid command. Please try again.",
+    "Invalid contact number.",
+    "Contact not found (check the number).",
+    "Error: no existing contacts",
+    "Thank you for using the program!",
+    "Goodbye!",
+    "Welcome to the Contact Manager",
+    "The total is 42.5",
+    "Average temperature: 71.25 degrees",
+    "   padded    output   ",
+    "",
+    "Results — all done",
+    "Kelvin K and long ſ and dotless ınvalid",
+]
+
+
+def contact_manager_output(n_lines: int, seed: int = 0) -> str:
+    """Return a stdout string of roughly n_lines realistic lines."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n_lines):
+        line = rng.choice(SAMPLE_LINES)
+        if rng.random() < 0.2:
+            line = f"{i}. Student {rng.randint(0, 10_000)}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def random_lines(n_lines: int, seed: int = 0, alphabet: str = "aZ09 :?.-[]()\"!=*\t–ıſ") -> list[str]:
+    """Return n_lines short fuzz lines built from rule-relevant characters."""
+    rng = random.Random(seed)
+    words = ["was added", "invalid", "error", "welcome", "goodbye", "Name", "and the file"]
+    out = []
+    for _ in range(n_lines):
+        parts = []
+        for _ in range(rng.randint(0, 6)):
+            if rng.random() < 0.3:
+                parts.append(rng.choice(words))
+            else:
+                parts.append("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 5))))
+        out.append("".join(parts))
+    return out
+
+
+# Builders for hostile single lines of length ~n, one per rule shape that a
+# backtracking regex engine could get stuck on.
+ADVERSARIAL_LINES = {
+    "prompt_marks":     lambda n: "? " * (n // 2) + "x",
+    "label_no_colon":   lambda n: "a" * n + "!",
+    "label_colon_gap":  lambda n: "a" + " " * n + ":x",
+    "menu_no_dash":     lambda n: "a" + " " * n + "x",
+    "item_no_dot":      lambda n: "1" * n + "x",
+    "rule_no_end":      lambda n: "=" * n + "x",
+    "unclosed_parens":  lambda n: "error " + "(" * n,
+    "unclosed_quotes":  lambda n: "error " + '"' * n,
+    "near_status_word": lambda n: "erro" * (n // 4),
+    "welcome_banner":   lambda n: "Welcome to " + "x" * n,
+}
+
+
+def record_output(n_lines: int, vocabulary: int = 1000, seed: int = 0) -> str:
+    """Table-style output drawing from a fixed set of rows (each repeats often)."""
+    rng = random.Random(seed)
+    rows = [f"Record {i}: value {i * 7}" for i in range(vocabulary)]
+    return "\n".join(rng.choice(rows) for _ in range(n_lines))
+
+
+def perturb(text: str, every: int = 500, seed: int = 0) -> str:
+    """Return text with every Nth line edited and a few lines inserted."""
+    rng = random.Random(seed)
+    lines = text.split("\n")
+    for k in range(0, len(lines), every):
+        lines[k] += " (changed)"
+    for _ in range(max(1, len(lines) // (every * 4))):
+        lines.insert(rng.randrange(len(lines) + 1), "extra student line")
+    return "\n".join(lines)
@@ -0,0 +1,68 @@
+"""Straightforward reference implementations of optimised engine code.
+
+These are the pre-optimisation versions, kept verbatim so equivalence tests
+and benchmarks have an oracle to compare the fast paths against. Nothing in
+engine/ or ui/ imports this module.
+"""
+
+from __future__ import annotations
+
+import re
+
+
+class ReferenceSemanticExtractor:
+    """Rule-by-rule SemanticExtractor (one regex per rule, per line)."""
+
+    _NUMBERED_ITEM = re.compile(r"^\d+\.\s+.+")
+    _LABELED_VALUE = re.compile(r"^[A-Za-z][\w\s]*?:\s+\S")
+    _STATUS_VERBS  = re.compile(
+        r"\b(was added|was removed|has been updated|invalid|not found|"
+        r"error|no existing|thank you|goodbye|welcome)\b",
+        re.IGNORECASE,
+    )
+    _PROMPT_ONLY   = re.compile(r"^[^:]*[:\?]\s*$")
+    _SKIP_PATTERNS = re.compile(
+        r"^(COMMAND MENU|={3,}|-{3,}|\*{3,}|Contact Manager|"
+        r"Welcome to .+|Thank you for using.+|Goodbye!?)$",
+        re.IGNORECASE,
+    )
+    _MENU_LINE     = re.compile(r"^\[?\w+\]?\s*[-–—]\s*\w")
+
+    def extract(self, stdout: str, input_lines: list[str]) -> list[tuple[str, str]]:
+        if not stdout:
+            return []
+
+        input_set = {line.strip() for line in input_lines}
+        results: list[tuple[str, str]] = []
+
+        for raw_line in stdout.split("\n"):
+            line = raw_line.strip()
+            if not line:
+                continue
+            if line in input_set:
+                continue
+            if self._SKIP_PATTERNS.match(line):
+                continue
+            if self._MENU_LINE.match(line):
+                continue
+            if self._PROMPT_ONLY.match(line):
+                continue
+
+            if self._NUMBERED_ITEM.match(line):
+                results.append(("item", line))
+            elif self._STATUS_VERBS.search(line):
+                results.append(("status", self._normalize_status(line)))
+            elif self._LABELED_VALUE.match(line):
+                if not self._PROMPT_ONLY.match(line):
+                    results.append(("label", line))
+            else:
+                results.append(("text", line))
+
+        return results
+
+    def _normalize_status(self, line: str) -> str:
+        line = line.lower()
+        line = re.sub(r'and the file.*$', '', line)
+        line = re.sub(r'"[^"]*"', '', line)
+        line = re.sub(r'\(.*?\)', '', line)
+        return " ".join(line.split()).rstrip(".,!")
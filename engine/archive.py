@@ -0,0 +1,109 @@
+"""Submissions read straight from an LMS bulk-download zip.
+
+Canvas exports every submission as one flat file named
+
+    lastfirst_12345_67890_original-name.py        (or lastfirst_LATE_...)
+
+and renames re-uploads of the same file to original-name-1.py; the suffix
+is dropped only when some submission in the export holds the name without
+it, so a file really called part-2.py keeps its name. Other
+exports (and hand-made zips) hold one folder per student instead. Both are
+indexed into {student: {file name: member}} without extracting anything;
+run_student streams one student's members into their sandbox when a worker
+picks them up.
+
+A submission inside an archive is addressed as a path below the zip file,
+e.g. "/downloads/ica5.zip/smithjane", so os.path.basename() still gives the
+student's name everywhere a folder path is expected.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import zipfile
+from typing import Optional
+
+
+# lastfirst[_LATE]_<user id>_<submission id>_<original name>
+_CANVAS_NAME = re.compile(r"^(?P<student>[^_]+?)(?:_LATE)?_\d+_\d+_(?P<name>.+)$")
+_CANVAS_RENAMED = re.compile(r"-\d+(?=\.[^.]+$)")
+
+_SKIP_DIRS = ("__MACOSX/",)
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(".zip") and os.path.isfile(path)
+
+
+class SubmissionArchive:
+    """Index of one zip export: which members belong to which student."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self.students: dict[str, dict[str, zipfile.ZipInfo]] = {}
+        self._index()
+
+    def close(self):
+        self._zip.close()
+
+    def submission_paths(self) -> list[str]:
+        return [os.path.join(self.path, name) for name in sorted(self.students)]
+
+    def files(self, student: str) -> dict[str, zipfile.ZipInfo]:
+        return self.students.get(student, {})
+
+    def extract(self, student: str, dst: str, skip: frozenset = frozenset()):
+        """Stream a student's files into dst (flat; names in skip left out)."""
+        for name, info in self.files(student).items():
+            if name.lower() in skip:
+                continue
+            # ZipFile serialises the underlying reads, so workers can
+            # stream different members at once
+            with self._zip.open(info) as src, open(os.path.join(dst, name), "wb") as out:
+                shutil.copyfileobj(src, out)
+
+    def _index(self):
+        members = [info for info in self._zip.infolist()
+                   if not info.is_dir() and not info.filename.startswith(_SKIP_DIRS)]
+        parts = [info.filename.split("/") for info in members]
+        # A zip of one "submissions/" folder (of student folders or of
+        # Canvas files): look inside it
+        prefix = ""
+        if parts and len({p[0] for p in parts}) == 1 and all(
+                len(p) >= 3 or (len(p) == 2 and _CANVAS_NAME.match(p[1])) for p in parts):
+            prefix = parts[0][0] + "/"
+
+        entries = []                        # (student, name, member, from Canvas)
+        for info in members:
+            rel = info.filename[len(prefix):]
+            folder, _, name = rel.rpartition("/")
+            if folder:
+                if "/" in folder:
+                    continue                # nested deeper; sandboxes are flat
+                entries.append((folder, name, info, False))
+            else:
+                match = _CANVAS_NAME.match(name)
+                if match is None:
+                    continue                # not a submission (e.g. a readme)
+                entries.append((match["student"], match["name"], info, True))
+        # Canvas's "-1" is a rename only if the name it renamed was uploaded
+        uploaded = {name for _, name, _, canvas in entries if canvas}
+
+        for student, name, info, canvas in entries:
+            if canvas:
+                original = _CANVAS_RENAMED.sub("", name)
+                if original in uploaded:
+                    name = original
+            files = self.students.setdefault(student, {})
+            # Of two uploads under one name, keep the later one
+            if name not in files or info.date_time >= files[name].date_time:
+                files[name] = info
+
+
+def archive_of(student_path: str) -> Optional[str]:
+    """The zip a submission path points into, or None for a real path."""
+    parent = os.path.dirname(student_path)
+    return parent if is_archive(parent) else None
@@ -0,0 +1,149 @@
+"""Content-addressed, compressed storage of program outputs.
+
+A class of students mostly prints the same few outputs (the menu, the same
+error message, a correct run), and only a handful are ever opened in the
+Inspection panel. So every distinct stdout, stderr or file body is kept once
+per grading run, zlib-compressed, in an append-only in-memory arena, and
+results hold small BlobRef handles into it. Text is decompressed only when
+something reads it.
+
+Blobs are deduplicated by a BLAKE2 digest of their content.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import zlib
+from typing import Union
+
+Blob = Union[str, bytes, None]
+
+# Blobs shorter than this are stored uncompressed
+_COMPRESS_MIN = 64
+
+# zlib level: outputs are repetitive enough that the fastest level does well
+_LEVEL = 1
+
+
+class BlobRef:
+    """Handle to one stored blob; load() returns the original value.
+
+    The owning store only needs a read(ref) method, so a BlobStore arena
+    (offset = arena position) and a RunStore (offset = row id) share it.
+    """
+    __slots__ = ("_store", "offset", "size", "flags", "digest")
+
+    def __init__(self, store, offset: int, size: int, flags: int, digest: bytes):
+        self._store = store
+        self.offset = offset
+        self.size = size
+        self.flags = flags
+        self.digest = digest
+
+    def load(self) -> Union[str, bytes]:
+        return self._store.read(self)
+
+
+# BlobRef.flags
+_BYTES      = 1     # original value was bytes, not str
+_COMPRESSED = 2
+
+
+def resolve(value):
+    """The stored value behind a BlobRef; anything else is returned as-is."""
+    return value.load() if isinstance(value, BlobRef) else value
+
+
+def resolve_files(files: dict) -> dict[str, Blob]:
+    return {name: resolve(content) for name, content in files.items()}
+
+
+def blob_digest(value: Union[str, bytes]) -> bytes:
+    """Content address of a value; str and bytes with equal data differ."""
+    is_bytes = isinstance(value, bytes)
+    data = value if is_bytes else value.encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(data, digest_size=16, person=b"b" if is_bytes else b"s").digest()
+
+
+def encode_blob(value: Union[str, bytes]) -> tuple[int, bytes, int]:
+    """(flags, stored bytes, raw size) for a value, compressed when that pays off."""
+    is_bytes = isinstance(value, bytes)
+    data = value if is_bytes else value.encode("utf-8", "surrogatepass")
+    raw_size = len(data)
+    flags = _BYTES if is_bytes else 0
+    if len(data) >= _COMPRESS_MIN:
+        packed = zlib.compress(data, _LEVEL)
+        if len(packed) < len(data):
+            data, flags = packed, flags | _COMPRESSED
+    return flags, data, raw_size
+
+
+def decode_blob(flags: int, data: bytes) -> Union[str, bytes]:
+    """Inverse of encode_blob()."""
+    if flags & _COMPRESSED:
+        data = zlib.decompress(data)
+    if flags & _BYTES:
+        return bytes(data)
+    return data.decode("utf-8", "surrogatepass")
+
+
+class BlobStore:
+    """Thread-safe, append-only arena of deduplicated, compressed blobs."""
+
+    def __init__(self):
+        self._arena = bytearray()
+        self._refs: dict[bytes, BlobRef] = {}
+        self._lock = threading.Lock()
+        self.raw_bytes = 0          # total size of the distinct blobs, uncompressed
+        self.hits = 0               # puts of content already stored
+
+    def put(self, value: Blob) -> Union[BlobRef, Blob]:
+        """Store value (once per distinct content) and return its handle.
+
+        Empty values and None are returned unchanged; they cost nothing to
+        keep inline. A BlobRef already in this store is returned as-is.
+        """
+        if not value:
+            return value
+        if isinstance(value, BlobRef):
+            if value._store is self:
+                return value
+            value = value.load()
+        digest = blob_digest(value)
+        ref = self._refs.get(digest)
+        if ref is not None:
+            self.hits += 1
+            return ref
+
+        flags, data, raw_size = encode_blob(value)
+        with self._lock:
+            ref = self._refs.get(digest)
+            if ref is not None:
+                self.hits += 1
+            else:
+                ref = BlobRef(self, len(self._arena), len(data), flags, digest)
+                self._arena += data
+                self._refs[digest] = ref
+                self.raw_bytes += raw_size
+        return ref
+
+    def put_files(self, files: dict[str, Blob]) -> dict:
+        """Copy of a {filename: content} dict with every content stored."""
+        return {name: self.put(content) for name, content in files.items()}
+
+    def read(self, ref: BlobRef) -> Union[str, bytes]:
+        return decode_blob(ref.flags, self.stored(ref))
+
+    def stored(self, ref: BlobRef) -> bytes:
+        """The bytes kept in the arena for ref, still compressed."""
+        with self._lock:
+            return bytes(self._arena[ref.offset:ref.offset + ref.size])
+
+    @property
+    def stored_bytes(self) -> int:
+        """Arena size: what the distinct blobs cost after compression."""
+        return len(self._arena)
+
+    def __len__(self) -> int:
+        return len(self._refs)
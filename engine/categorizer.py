@@ -7,9 +7,13 @@ objects, including behavioral annotations.
 from __future__ import annotations
 
 import os
+from typing import Optional
 
-from engine.comparator import classify_test
-from engine.models import MatchTier, StudentCategory, StudentResult, TestResult
+from engine import trace
+from engine.blobs import BlobStore, resolve
+from engine.comparator import DEFAULT_MATCHER, ProfileMatcher, build_test_base, classify_test
+from engine.diff import diff_opcodes
+from engine.models import MatchTier, StudentCategory, StudentResult, TestBase, TestResult
 
 
 def process_student(
@@ -19,6 +23,9 @@ def process_student(
     student_raws: list[dict],
     test_cases: list[dict],
     check_stdout: bool = True,
+    matcher: Optional[ProfileMatcher] = None,
+    bases: Optional[list[TestBase]] = None,
+    blobs: Optional[BlobStore] = None,
 ) -> StudentResult:
     """Build a full StudentResult from raw runner outputs.
 
@@ -29,25 +36,38 @@ def process_student(
         student_raws: Raw result dicts from student (one per test case)
         test_cases: Original test case configs (for expected file metadata)
         check_stdout: When False, only file output is graded
+        matcher: Compiled comparison profile shared by the whole batch
+        bases: Shared per-test base data from build_test_bases(); built
+               for this student alone when omitted
+        blobs: Store holding the batch's outputs, compressed and deduplicated
     """
-    test_results: list[TestResult] = []
-
-    for i, (base_raw, student_raw) in enumerate(zip(base_raws, student_raws)):
-        tc = test_cases[i] if i < len(test_cases) else {}
-        tr = classify_test(
-            test_num=i + 1,
-            input_lines=tc.get("input", []),
-            base_raw=base_raw,
-            student_raw=student_raw,
-            expected_override=tc.get("expected_file_content", ""),
-            expected_fname=tc.get("expected_filename", ""),
-            check_stdout=check_stdout,
-        )
-        test_results.append(tr)
+    with trace.span("classify", student=name):
+        matcher = matcher or DEFAULT_MATCHER
+        if bases is None:
+            bases = build_test_bases(base_raws, test_cases, matcher)
+        test_results: list[TestResult] = []
+
+        for i, (base_raw, student_raw) in enumerate(zip(base_raws, student_raws)):
+            tc = test_cases[i] if i < len(test_cases) else {}
+            with trace.span("compare", student=name, test=i + 1):
+                tr = classify_test(
+                    test_num=i + 1,
+                    input_lines=tc.get("input", []),
+                    base_raw=base_raw,
+                    student_raw=student_raw,
+                    expected_override=tc.get("expected_file_content", ""),
+                    expected_fname=tc.get("expected_filename", ""),
+                    check_stdout=check_stdout,
+                    matcher=matcher,
+                    base=bases[i],
+                    blobs=blobs,
+                )
+            test_results.append(tr)
 
-    category, overall_tier = _classify(test_results)
-    score = _score(test_results)
-    notes = _generate_notes(test_results, student_raws)
+        category, overall_tier = _classify(test_results)
+        score = _score(test_results)
+        notes = _generate_notes(test_results, student_raws,
+                                matcher.profile.invalid_loop_exempt)
 
     return StudentResult(
         name=name,
@@ -60,6 +80,26 @@ def process_student(
     )
 
 
+def build_test_bases(
+    base_raws: list[dict],
+    test_cases: list[dict],
+    matcher: Optional[ProfileMatcher] = None,
+) -> list[TestBase]:
+    """Build the base side of every test once, to share across all students."""
+    bases = []
+    for i, base_raw in enumerate(base_raws):
+        tc = test_cases[i] if i < len(test_cases) else {}
+        bases.append(build_test_base(
+            test_num=i + 1,
+            input_lines=tc.get("input", []),
+            base_raw=base_raw,
+            expected_override=tc.get("expected_file_content", ""),
+            expected_fname=tc.get("expected_filename", ""),
+            matcher=matcher,
+        ))
+    return bases
+
+
 def process_base(
     base_raws: list[dict],
     test_cases: list[dict],
@@ -106,7 +146,7 @@ def _classify(tests: list[TestResult]) -> tuple[StudentCategory, MatchTier]:
     best = _best_tier(tiers)
     if best in (MatchTier.EXACT, MatchTier.NORMALIZED):
         return StudentCategory.PERFECT, best
-    if best in (MatchTier.SEMANTIC, MatchTier.FILE_ONLY):
+    if best in (MatchTier.NUMERIC, MatchTier.SEMANTIC, MatchTier.FILE_ONLY):
         return StudentCategory.COSMETIC, best
     return StudentCategory.PARTIAL, best
 
@@ -116,6 +156,7 @@ def _best_tier(tiers: list[MatchTier]) -> MatchTier:
     order = [
         MatchTier.EXACT,
         MatchTier.NORMALIZED,
+        MatchTier.NUMERIC,
         MatchTier.SEMANTIC,
         MatchTier.FILE_ONLY,
         MatchTier.MISMATCH,
@@ -136,6 +177,7 @@ def _score(tests: list[TestResult]) -> float:
 def _generate_notes(
     test_results: list[TestResult],
     student_raws: list[dict],
+    invalid_loop_exempt: tuple[str, ...] = ("contact", "number"),
 ) -> list[str]:
     """Generate human-readable behavioral annotations for a student."""
     notes: list[str] = []
@@ -161,7 +203,7 @@ def _generate_notes(
         # Surface the actual error line for quick diagnosis
         for raw in student_raws:
             if raw.get("error_type") == et:
-                stderr = raw.get("stderr", "")
+                stderr = resolve(raw.get("stderr", ""))
                 if stderr:
                     last_line = [l for l in stderr.strip().split("\n") if l.strip()]
                     if last_line:
@@ -175,10 +217,15 @@ def _generate_notes(
             notes.append(_prompt_diff_note(tr))
             break
 
+    for tr in test_results:
+        if tr.match_tier == MatchTier.NUMERIC:
+            notes.append("Numbers match within tolerance — number formatting differs")
+            break
+
     # --- Rigid input validation detection ---
     for tr in test_results:
         if tr.match_tier in (MatchTier.MISMATCH, MatchTier.ERROR):
-            if _has_invalid_loop(tr.student_stdout):
+            if _has_invalid_loop(tr.student_stdout, invalid_loop_exempt):
                 notes.append(
                     "Rigid input validation — 'Invalid command' repeated for "
                     "verbose inputs (missing .lower() or .startswith() normalization)"
@@ -187,7 +234,7 @@ def _generate_notes(
 
     # --- Missing output detection ---
     for tr in test_results:
-        if not tr.student_stdout and tr.base_stdout:
+        if not tr.stdout_blob and tr.base_stdout:   # empty output is never stored
             notes.append("Produced no stdout output")
             break
 
@@ -204,13 +251,11 @@ def _generate_notes(
 
 def _prompt_diff_note(tr: TestResult) -> str:
     """Produce a short description of how the student's prompts differed."""
-    import difflib
     base_lines    = [l.strip() for l in (tr.base_stdout or "").split("\n") if l.strip()]
     student_lines = [l.strip() for l in (tr.student_stdout or "").split("\n") if l.strip()]
 
     # Find the first line that differs
-    sm = difflib.SequenceMatcher(None, base_lines, student_lines)
-    for op, i1, i2, j1, j2 in sm.get_opcodes():
+    for op, i1, i2, j1, j2 in diff_opcodes(base_lines, student_lines):
         if op == "replace":
             base_sample    = base_lines[i1] if i1 < len(base_lines) else ""
             student_sample = student_lines[j1] if j1 < len(student_lines) else ""
@@ -222,12 +267,15 @@ def _prompt_diff_note(tr: TestResult) -> str:
     return "Prompt text differs from base solution"
 
 
-def _has_invalid_loop(stdout: str) -> bool:
+def _has_invalid_loop(
+    stdout: str, exempt: tuple[str, ...] = ("contact", "number")
+) -> bool:
     """Detect rigid command-rejection loops in student output.
 
-    Only counts lines where 'invalid' refers to a COMMAND, not a contact number.
-    'Invalid contact number.' is *correct* behavior for out-of-range views; we
-    must not penalise it as rigid validation.
+    Only counts lines where 'invalid' refers to a COMMAND, not data. Lines
+    containing any profile-exempt word (by default 'contact' / 'number', since
+    'Invalid contact number.' is *correct* behavior for out-of-range views)
+    are not penalised as rigid validation.
 
     Triggers when the student produces ≥ 3 command-rejection messages, which
     strongly implies they only accept single-letter commands and reject the
@@ -235,13 +283,14 @@ def _has_invalid_loop(stdout: str) -> bool:
     """
     if not stdout:
         return False
+    exempt = [word.lower() for word in exempt]
     count = 0
     for line in stdout.lower().split("\n"):
         line = line.strip()
         if not line:
             continue
         # 'Invalid contact number.' / 'Invalid contact.' = correct behaviour → skip
-        if "contact" in line or "number" in line:
+        if any(word in line for word in exempt):
             continue
         if "invalid" in line or "try again" in line:
             count += 1
@@ -3,6 +3,7 @@
 Tiers (weakest → strongest match):
   EXACT      – raw stdout identical
   NORMALIZED – whitespace-normalized match
+  NUMERIC    – same text; numbers equal within the profile's tolerance
   SEMANTIC   – extracted data values match; prompt text ignored
   FILE_ONLY  – stdout differs but file output (CSV, TXT…) is correct
   MISMATCH   – values differ
@@ -11,10 +12,20 @@ Tiers (weakest → strongest match):
 
 from __future__ import annotations
 
+import math
 import re
+from dataclasses import dataclass, field
 from typing import Optional
 
-from engine.models import MatchTier, TestResult
+try:
+    import numpy as np
+except ImportError:  # optional: only speeds up number-heavy comparisons
+    np = None
+
+from engine.diff import DIFF_MAX_LINES, diff_opcodes
+from engine.blobs import BlobStore, resolve, resolve_files
+from engine.models import MatchTier, TestBase, TestResult
+from engine.profile import DEFAULT_PROFILE, ComparisonProfile
 
 
 # ---------------------------------------------------------------------------
@@ -29,6 +40,9 @@ def classify_test(
     expected_override: str = "",
     expected_fname: str = "",
     check_stdout: bool = True,
+    matcher: Optional[ProfileMatcher] = None,
+    base: Optional[TestBase] = None,
+    blobs: Optional[BlobStore] = None,
 ) -> TestResult:
     """Run the full comparison cascade and return a TestResult.
 
@@ -36,45 +50,52 @@ def classify_test(
         test_num: 1-based test case index
         input_lines: stdin lines fed to both programs
         base_raw: raw result dict from runner for the base solution
-        student_raw: raw result dict from runner for the student
+        student_raw: raw result dict from runner for the student; its
+                     outputs may already be BlobRefs (see RawBatch)
         expected_override: optional manual expected file content
         expected_fname: filename key to check in file dicts
         check_stdout: when False, only file output is graded
+        matcher: compiled comparison profile (defaults to DEFAULT_MATCHER)
+        base: this test's shared TestBase from build_test_base(); built
+              from the arguments above when omitted
+        blobs: store that the student's outputs are kept in; without one
+               the TestResult holds them as plain values
     """
-    base_stdout   = base_raw.get("stdout", "") or ""
-    student_stdout = student_raw.get("stdout", "") or ""
-    base_files    = base_raw.get("files") or {}
-    student_files = student_raw.get("files") or {}
-    error         = student_raw.get("error")
+    matcher = matcher or DEFAULT_MATCHER
+    if base is None:
+        base = build_test_base(test_num, input_lines, base_raw,
+                               expected_override, expected_fname, matcher)
+    base_stdout   = base.stdout
+    base_files    = base.files
+    stdout_blob   = student_raw.get("stdout", "") or ""
+    files_blob    = student_raw.get("files") or {}
+    error_blob    = student_raw.get("error")
     error_type    = student_raw.get("error_type")
+    student_stdout = resolve(stdout_blob)
+    student_files = resolve_files(files_blob)
+    error         = resolve(error_blob)
+    if blobs is not None:
+        stdout_blob, files_blob, error_blob = (
+            blobs.put(stdout_blob), blobs.put_files(files_blob), blobs.put(error_blob))
 
-    # If there is an expected file content override, inject it as the base
-    if expected_override and expected_fname:
-        base_files = dict(base_files)
-        base_files[expected_fname] = expected_override
-
-    extractor = SemanticExtractor()
-    sem_base    = extractor.extract(base_stdout, input_lines)
-    sem_student = extractor.extract(student_stdout, input_lines)
+    sem_student = matcher.extractor.extract(student_stdout, base.input_lines)
+    sem_base    = base.semantic_values
 
     # --- Crash / error -------------------------------------------------------
     if error and student_raw.get("returncode", 0) != 0:
         file_ok, file_details = _file_match(base_files, student_files, expected_fname)
         return TestResult(
-            test_num=test_num,
-            input_lines=input_lines,
-            base_stdout=base_stdout,
-            student_stdout=student_stdout,
-            base_files=base_files,
-            student_files=student_files,
+            base=base,
+            stdout_blob=stdout_blob,
+            files_blob=files_blob,
             match_tier=MatchTier.ERROR,
             stdout_match=False,
             file_match=file_ok,
             file_mismatch_details=file_details,
-            semantic_values_base=sem_base,
             semantic_values_student=sem_student,
-            error=error,
+            error_blob=error_blob,
             error_type=error_type,
+            elapsed=student_raw.get("elapsed"),
         )
 
     # --- Stdout tiers --------------------------------------------------------
@@ -85,9 +106,12 @@ def classify_test(
         if _exact_match(base_stdout, student_stdout):
             stdout_tier  = MatchTier.EXACT
             stdout_match = True
-        elif _normalized_match(base_stdout, student_stdout):
+        elif _normalized_match(base_stdout, student_stdout, matcher):
             stdout_tier  = MatchTier.NORMALIZED
             stdout_match = True
+        elif _numeric_match(base_stdout, student_stdout, matcher):
+            stdout_tier  = MatchTier.NUMERIC
+            stdout_match = True
         elif sem_base == sem_student and sem_base:
             stdout_tier  = MatchTier.SEMANTIC
             stdout_match = True
@@ -110,20 +134,50 @@ def classify_test(
         tier = MatchTier.MISMATCH
 
     return TestResult(
-        test_num=test_num,
-        input_lines=input_lines,
-        base_stdout=base_stdout,
-        student_stdout=student_stdout,
-        base_files=base_files,
-        student_files=student_files,
+        base=base,
+        stdout_blob=stdout_blob,
+        files_blob=files_blob,
         match_tier=tier,
         stdout_match=stdout_match,
         file_match=file_ok,
         file_mismatch_details=file_details,
-        semantic_values_base=sem_base,
         semantic_values_student=sem_student,
-        error=error,
+        error_blob=error_blob,
         error_type=error_type,
+        elapsed=student_raw.get("elapsed"),
+    )
+
+
+def build_test_base(
+    test_num: int,
+    input_lines: list[str],
+    base_raw: dict,
+    expected_override: str = "",
+    expected_fname: str = "",
+    matcher: Optional[ProfileMatcher] = None,
+) -> TestBase:
+    """Prepare the base-solution side of a test once for a whole batch.
+
+    Arguments are as for classify_test(). The base's semantic values are
+    extracted here, so they are not recomputed for every student. Base
+    output is kept as plain text: it is read for every student and there is
+    only one copy per test.
+    """
+    base_stdout = base_raw.get("stdout", "") or ""
+    base_files  = base_raw.get("files") or {}
+
+    # If there is an expected file content override, inject it as the base
+    if expected_override and expected_fname:
+        base_files = dict(base_files)
+        base_files[expected_fname] = expected_override
+
+    matcher = matcher or DEFAULT_MATCHER
+    return TestBase(
+        test_num=test_num,
+        input_lines=input_lines,
+        stdout=base_stdout,
+        files=base_files,
+        semantic_values=matcher.extractor.extract(base_stdout, input_lines),
     )
 
 
@@ -135,8 +189,39 @@ def _exact_match(a: str, b: str) -> bool:
     return a == b
 
 
-def _normalized_match(a: str, b: str) -> bool:
-    return _normalize(a) == _normalize(b)
+def _normalized_match(a: str, b: str, matcher: ProfileMatcher) -> bool:
+    return matcher.normalize(a) == matcher.normalize(b)
+
+
+def _numeric_match(a: str, b: str, matcher: ProfileMatcher) -> bool:
+    """Same text around the numbers, and every number pair within tolerance."""
+    a_text, a_nums = matcher.split_numbers(a)
+    b_text, b_nums = matcher.split_numbers(b)
+    if not a_nums or a_text != b_text or len(a_nums) != len(b_nums):
+        return False
+    return _numbers_close(a_nums, b_nums, matcher.profile.abs_tol, matcher.profile.rel_tol)
+
+
+# Below this many numbers a plain loop beats building arrays
+_BULK_NUMERIC_MIN = 256
+
+
+def _numbers_close(
+    a: list[str], b: list[str], abs_tol: float, rel_tol: float
+) -> bool:
+    """math.isclose() over paired number tokens, vectorised when numpy is present."""
+    if np is not None and len(a) >= _BULK_NUMERIC_MIN:
+        x = np.array(a, dtype=float)
+        y = np.array(b, dtype=float)
+        with np.errstate(invalid="ignore"):
+            bound = np.maximum(rel_tol * np.maximum(np.abs(x), np.abs(y)), abs_tol)
+            close = (x == y) | (np.abs(x - y) <= bound)
+        return bool(close.all())
+    for x, y in zip(a, b):
+        if x != y and not math.isclose(float(x), float(y),
+                                       rel_tol=rel_tol, abs_tol=abs_tol):
+            return False
+    return True
 
 
 def _normalize(text: str) -> list[str]:
@@ -228,6 +313,18 @@ def _fuzzy_get(d: dict, key: str) -> Optional[str | bytes]:
     return None
 
 
+def _fold(text: str) -> str:
+    """Caseless form of text for literal prefilters and ignore_case compares.
+
+    casefold() covers every character the IGNORECASE regex folds except the
+    dotless ı, which re treats as a case variant of i.
+    """
+    folded = text.casefold()
+    if "\u0131" in folded:
+        folded = folded.replace("\u0131", "i")
+    return folded
+
+
 # ---------------------------------------------------------------------------
 # Semantic Extractor
 # ---------------------------------------------------------------------------
@@ -245,25 +342,55 @@ class SemanticExtractor:
       - Labeled values       ("Name: Ally Gator")
       - Status messages      ("was added", "was removed", "invalid command")
       - Error / not-found messages
+
+    Each distinct line is classified in a single pass: one anchored regex
+    whose named alternatives are ordered by rule priority, plus a literal
+    keyword scan that only falls back to the word-boundary regex on
+    candidate lines. The assignment-specific parts (decorative lines, status
+    verbs, case policy) come from a ComparisonProfile and are compiled once
+    in __init__; build one extractor per profile and reuse it.
     """
 
-    _NUMBERED_ITEM = re.compile(r"^\d+\.\s+.+")
-    _LABELED_VALUE = re.compile(r"^[A-Za-z][\w\s]*?:\s+\S")
-    _STATUS_VERBS  = re.compile(
-        r"\b(was added|was removed|has been updated|invalid|not found|"
-        r"error|no existing|thank you|goodbye|welcome)\b",
-        re.IGNORECASE,
-    )
-    # Lines that end with prompt punctuation and carry no data
-    _PROMPT_ONLY   = re.compile(r"^[^:]*[:\?]\s*$")
-    # Decorative headers / titles to skip
-    _SKIP_PATTERNS = re.compile(
-        r"^(COMMAND MENU|={3,}|-{3,}|\*{3,}|Contact Manager|"
-        r"Welcome to .+|Thank you for using.+|Goodbye!?)$",
-        re.IGNORECASE,
-    )
-    # Menu option lines like "[D]isplay - ..." or "[D] - ..."
-    _MENU_LINE     = re.compile(r"^\[?\w+\]?\s*[-–—]\s*\w")
+    # Lines longer than this are kept verbatim as generic text without running
+    # any rule, so one enormous line costs a strip and a compare, nothing more.
+    MAX_CLASSIFY_LEN = 4096
+
+    _DROPPED       = frozenset({"skip", "menu", "prompt"})
+    _QUOTED        = re.compile(r'"[^"]*"')
+    _PARENTHETICAL = re.compile(r"\([^)]*\)")
+
+    def __init__(self, profile: Optional[ComparisonProfile] = None):
+        profile = profile or DEFAULT_PROFILE
+        self._fold_values = profile.ignore_case
+        self._status_words = tuple(_fold(verb) for verb in profile.status_verbs)
+        self._status_verbs = re.compile(
+            r"\b(" + "|".join(re.escape(v) for v in profile.status_verbs) + r")\b",
+            re.IGNORECASE,
+        )
+        skip = "|".join(f"(?:{p})" for p in profile.skip_patterns) or "(?!)"
+
+        # One anchored alternation; Python's regex engine tries branches left
+        # to right at position 0, so branch order is rule priority and
+        # ``m.lastgroup`` names the rule that decided the line.
+        #
+        # Student output is untrusted, so every built-in branch is kept linear
+        # in the line length: each is anchored by match(), has a single
+        # unbounded run that is followed by a character the run cannot contain
+        # (or by $), and nothing nests quantifiers. Profile skip patterns are
+        # instructor-authored and trusted. benchmarks/bench_redos.py checks
+        # the scaling.
+        self._line_rules = re.compile(
+            # Decorative headers / titles to skip
+            rf"(?P<skip>(?i:{skip})$)"
+            # Menu option lines like "[D]isplay - ..." or "[D] - ..."
+            r"|(?P<menu>\[?\w+\]?\s*[-–—]\s*\w)"
+            # Lines that end with prompt punctuation and carry no data
+            r"|(?P<prompt>[^:]*[:\?]\s*$)"
+            # Numbered list items  ("1. Ally Gator")
+            r"|(?P<item>\d+\.\s+.+)"
+            # Labeled values       ("Name: Ally Gator")
+            r"|(?P<label>[A-Za-z][\w\s]*?:\s+\S)"
+        )
 
     def extract(self, stdout: str, input_lines: list[str]) -> list[tuple[str, str]]:
         """Return a list of (type, value) semantic tokens from stdout."""
@@ -272,6 +399,10 @@ class SemanticExtractor:
 
         input_set = {line.strip() for line in input_lines}
         results: list[tuple[str, str]] = []
+        # Menus and prompts repeat on every loop iteration, so each distinct
+        # line is classified once per call and replayed from here afterwards.
+        seen: dict[str, Optional[tuple[str, str]]] = {}
+        classify = self._classify_line
 
         for raw_line in stdout.split("\n"):
             line = raw_line.strip()
@@ -282,33 +413,45 @@ class SemanticExtractor:
             if line in input_set:
                 continue
 
-            # Skip known decorative patterns
-            if self._SKIP_PATTERNS.match(line):
-                continue
-
-            # Skip menu option lines
-            if self._MENU_LINE.match(line):
-                continue
-
-            # Skip pure prompt lines (nothing after the colon/question mark)
-            if self._PROMPT_ONLY.match(line):
-                continue
-
-            # Classify
-            if self._NUMBERED_ITEM.match(line):
-                results.append(("item", line))
-            elif self._STATUS_VERBS.search(line):
-                results.append(("status", self._normalize_status(line)))
-            elif self._LABELED_VALUE.match(line):
-                # Only keep if it carries actual data (not a prompt)
-                if not self._PROMPT_ONLY.match(line):
-                    results.append(("label", line))
+            if line in seen:
+                token = seen[line]
             else:
-                # Non-empty, non-prompt, non-menu — keep as generic text
-                results.append(("text", line))
+                token = seen[line] = classify(line)
+            if token is not None:
+                results.append(token)
 
         return results
 
+    def _classify_line(self, line: str) -> Optional[tuple[str, str]]:
+        """Return the (type, value) token for one stripped line, or None."""
+        if len(line) > self.MAX_CLASSIFY_LEN:
+            return ("text", _fold(line) if self._fold_values else line)
+
+        m = self._line_rules.match(line)
+        kind = m.lastgroup if m else None
+
+        # Decorative headers, menu options and pure prompts carry no data
+        if kind in self._DROPPED:
+            return None
+
+        if kind != "item" and self._has_status(line):
+            return ("status", self._normalize_status(line))
+        value = _fold(line) if self._fold_values else line
+        if kind == "item":
+            return ("item", value)
+        if kind == "label":
+            return ("label", value)
+        # Non-empty, non-prompt, non-menu — keep as generic text
+        return ("text", value)
+
+    def _has_status(self, line: str) -> bool:
+        """Equivalent to ``_status_verbs.search(line)``, literal scan first."""
+        folded = _fold(line)
+        for word in self._status_words:
+            if word in folded:
+                return self._status_verbs.search(line) is not None
+        return False
+
     def _normalize_status(self, line: str) -> str:
         """Reduce status messages to a canonical form for comparison.
 
@@ -317,30 +460,80 @@ class SemanticExtractor:
         """
         line = line.lower()
         # Drop file references
-        line = re.sub(r'and the file.*$', '', line)
-        line = re.sub(r'"[^"]*"', '', line)
-        # Drop parenthetical / trailing decoration
-        line = re.sub(r'\(.*?\)', '', line)
+        cut = line.find("and the file")
+        if cut != -1:
+            line = line[:cut]
+        if '"' in line:
+            line = self._QUOTED.sub("", line)
+        # Drop parenthetical / trailing decoration. Nothing can match past the
+        # last ")", and limiting the scan to that prefix keeps a run of
+        # unclosed "(" linear instead of rescanning to the end from each one.
+        close = line.rfind(")")
+        if close != -1 and "(" in line:
+            line = self._PARENTHETICAL.sub("", line[:close + 1]) + line[close + 1:]
         return " ".join(line.split()).rstrip(".,!")
 
 
+# ---------------------------------------------------------------------------
+# Compiled profile
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ProfileMatcher:
+    """Immutable, precompiled form of a ComparisonProfile.
+
+    Build one per grading batch and pass it to every classify_test /
+    process_student call; it holds no mutable state, so worker threads can
+    share it without locking.
+    """
+    profile: ComparisonProfile = DEFAULT_PROFILE
+    extractor: SemanticExtractor = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "extractor", SemanticExtractor(self.profile))
+
+    # Integers, decimals and exponents; digits glued to a word ("ICA5", "x2")
+    # stay part of the text.
+    _NUMBER = re.compile(r"(?<![\w.])([-+]?(?:\d+(?:\.\d+)?|\.\d+)(?:[eE][-+]?\d+)?)(?!\w)")
+
+    def split_numbers(self, text: str) -> tuple[list[str], list[str]]:
+        """Tokenize normalized text into (text pieces, number tokens) in one pass."""
+        parts = self._NUMBER.split("\n".join(self.normalize(text)))
+        return parts[0::2], parts[1::2]
+
+    def normalize(self, text: str) -> list[str]:
+        """Apply the profile's whitespace and case policy (NORMALIZED tier)."""
+        policy = self.profile.whitespace
+        if policy == "collapse":
+            lines = _normalize(text)
+        elif policy == "trim":
+            lines = [l for l in (raw.strip() for raw in text.strip().split("\n")) if l]
+        else:
+            lines = text.split("\n")
+        if self.profile.ignore_case:
+            lines = [_fold(l) for l in lines]
+        return lines
+
+
+DEFAULT_MATCHER = ProfileMatcher()
+
+
 # ---------------------------------------------------------------------------
 # Diff utilities (used by the UI)
 # ---------------------------------------------------------------------------
 
 def unified_diff_lines(
-    base: str, student: str, context: int = 3
+    base: str, student: str, context: int = 3, max_lines: int = DIFF_MAX_LINES
 ) -> list[tuple[str, str]]:
     """Return (tag, line) pairs for a side-by-side diff.
 
     tag is one of: 'equal', 'replace', 'insert', 'delete'
+    Beyond max_lines combined lines a cheap positional diff is used.
     """
-    import difflib
     base_lines    = (base or "").splitlines()
     student_lines = (student or "").splitlines()
-    sm = difflib.SequenceMatcher(None, base_lines, student_lines)
     result = []
-    for op, i1, i2, j1, j2 in sm.get_opcodes():
+    for op, i1, i2, j1, j2 in diff_opcodes(base_lines, student_lines, max_lines):
         if op == "equal":
             for line in base_lines[i1:i2]:
                 result.append(("equal", line))
@@ -0,0 +1,295 @@
+"""Line diff engine used by the comparator notes and the Inspection panel.
+
+difflib.SequenceMatcher is quadratic on long, repetitive outputs (a menu
+printed on every loop iteration), which is exactly what student programs
+produce. This module diffs lines the way git's histogram diff does:
+
+  1. Every distinct line is interned to a small int, so all later
+     comparisons are int compares and hashing happens once per line.
+  2. Common prefix / suffix are matched directly.
+  3. Lines that occur exactly once on each side, taken in order, anchor
+     matches (patience diff); the regions between them are diffed the same
+     way. Without such lines, the line that occurs least often in the base
+     (and at most _MAX_CHAIN times) anchors one match, which is grown in
+     both directions before the two sides are diffed recursively.
+  4. Small regions, and regions with no usable anchor (only very frequent
+     lines), use Myers' O(ND) algorithm instead, capped at _MYERS_MAX_COST
+     edits; past the cap the region is reported as replaced.
+
+Inputs longer than max_lines (combined) only get one anchor pass with the
+gaps paired up by position, so the cost is bounded no matter what a
+student prints. Shorter inputs fall back to that pass too once the
+histogram steps have used up their work budget (_WORK_PER_LINE steps per
+input line, at most _MAX_WORK): lines repeated in a different order on
+each side (a block per item on one side, the items interleaved on the
+other) would otherwise make them quadratic.
+
+Results use difflib's opcode format, so callers can swap engines freely.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Optional
+
+
+# Combined line count above which only the cheap bounded diff is computed
+DIFF_MAX_LINES = 200_000
+
+# Lines occurring more often than this in a region cannot anchor a split
+_MAX_CHAIN = 64
+
+# Edit distance at which the Myers fallback gives up on a region
+_MYERS_MAX_COST = 256
+
+# Regions this small (combined lines) go straight to Myers for a minimal diff
+_MYERS_REGION = 128
+
+# Histogram diff work (region scans, anchor candidates and match extensions)
+# allowed per input line, and in all, before the bounded diff is used instead.
+# Typical outputs need under 16 per line; about 2.5M steps take a second.
+_WORK_PER_LINE = 24
+_MAX_WORK = 2_000_000
+
+
+def diff_opcodes(
+    a: list[str], b: list[str], max_lines: int = DIFF_MAX_LINES
+) -> list[tuple[str, int, int, int, int]]:
+    """Return difflib-style (tag, i1, i2, j1, j2) opcodes turning a into b.
+
+    tag is one of 'equal', 'replace', 'delete', 'insert'; every unmatched
+    stretch between two equal runs is reported as a single opcode.
+    """
+    ids: dict[str, int] = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+
+    matches = None
+    if len(a_ids) + len(b_ids) <= max_lines:
+        matches = _histogram_matches(a_ids, b_ids)
+    if matches is None:
+        matches = _bounded_matches(a_ids, b_ids)
+    return _opcodes(matches, len(a_ids), len(b_ids))
+
+
+# ---------------------------------------------------------------------------
+# Match finders — each returns (i, j, size) runs of equal lines
+# ---------------------------------------------------------------------------
+
+def _trim(a, b, alo, ahi, blo, bhi, matches):
+    """Match common prefix and suffix of a region; return the remainder."""
+    start = alo
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        alo += 1
+        blo += 1
+    if alo > start:
+        matches.append((start, blo - (alo - start), alo - start))
+    end = ahi
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+    if ahi < end:
+        matches.append((ahi, bhi, end - ahi))
+    return alo, ahi, blo, bhi
+
+
+def _bounded_matches(a: list[int], b: list[int]) -> list[tuple[int, int, int]]:
+    """Cheap fallback for huge inputs: one anchor pass, no recursion.
+
+    Lines unique on both sides are matched in order, and the lines between
+    two anchors are paired up by position. O(n log n) whatever the input.
+    """
+    matches: list[tuple[int, int, int]] = []
+    alo, ahi, blo, bhi = _trim(a, b, 0, len(a), 0, len(b), matches)
+    prev_i, prev_j = alo, blo
+    for i, j in _unique_anchors(a, b, alo, ahi, blo, bhi) + [(ahi, bhi)]:
+        for k in range(min(i - prev_i, j - prev_j)):
+            if a[prev_i + k] == b[prev_j + k]:
+                matches.append((prev_i + k, prev_j + k, 1))
+        if i < ahi:
+            matches.append((i, j, 1))
+        prev_i, prev_j = i + 1, j + 1
+    return matches
+
+
+def _histogram_matches(a: list[int], b: list[int]) -> Optional[list[tuple[int, int, int]]]:
+    """Histogram diff matches; None once it exceeds its work budget."""
+    matches: list[tuple[int, int, int]] = []
+    budget = min(_WORK_PER_LINE * max(len(a) + len(b), _MYERS_REGION), _MAX_WORK)
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = _trim(a, b, *stack.pop(), matches)
+        if alo == ahi or blo == bhi:
+            continue
+        budget -= (ahi - alo) + (bhi - blo)
+        if budget < 0:
+            return None
+        if (ahi - alo) + (bhi - blo) <= _MYERS_REGION:
+            matches.extend(_myers_matches(a, b, alo, ahi, blo, bhi))
+            continue
+
+        anchors = _unique_anchors(a, b, alo, ahi, blo, bhi)
+        if anchors:
+            # Split at every anchor in one go; trim() grows each one.
+            prev_i, prev_j = alo, blo
+            for i, j in anchors:
+                matches.append((i, j, 1))
+                stack.append((prev_i, i, prev_j, j))
+                prev_i, prev_j = i + 1, j + 1
+            stack.append((prev_i, ahi, prev_j, bhi))
+            continue
+
+        occurrences: dict[int, list[int]] = {}
+        for i in range(alo, ahi):
+            positions = occurrences.setdefault(a[i], [])
+            if len(positions) <= _MAX_CHAIN:
+                positions.append(i)
+
+        best = None          # (count, -size, i, j, size)
+        j = blo
+        while j < bhi:
+            positions = occurrences.get(b[j])
+            j_next = j + 1
+            if positions and len(positions) <= _MAX_CHAIN and (
+                best is None or len(positions) <= best[0]
+            ):
+                for i in positions:
+                    si, sj = i, j
+                    while si > alo and sj > blo and a[si - 1] == b[sj - 1]:
+                        si -= 1
+                        sj -= 1
+                    ei, ej = i + 1, j + 1
+                    while ei < ahi and ej < bhi and a[ei] == b[ej]:
+                        ei += 1
+                        ej += 1
+                    budget -= 1 + (ei - si)
+                    candidate = (len(positions), -(ei - si), si, sj, ei - si)
+                    if best is None or candidate < best:
+                        best = candidate
+                    j_next = max(j_next, ej)
+                if budget < 0:
+                    return None
+            j = j_next
+
+        if best is None:
+            matches.extend(_myers_matches(a, b, alo, ahi, blo, bhi))
+            continue
+
+        _, _, i, j, size = best
+        matches.append((i, j, size))
+        stack.append((alo, i, blo, j))
+        stack.append((i + size, ahi, j + size, bhi))
+    return matches
+
+
+def _unique_anchors(a, b, alo, ahi, blo, bhi) -> list[tuple[int, int]]:
+    """Lines occurring exactly once on each side, longest in-order subset.
+
+    This is patience diff's anchor step: it splits a region at many points
+    in one O(n log n) pass, where the histogram step splits only once.
+    """
+    a_pos: dict[int, int] = {}
+    for i in range(alo, ahi):
+        a_pos[a[i]] = -1 if a[i] in a_pos else i
+    b_pos: dict[int, int] = {}
+    for j in range(blo, bhi):
+        line = b[j]
+        if line in b_pos:
+            b_pos[line] = -1
+        elif a_pos.get(line, -1) != -1:
+            b_pos[line] = j
+    pairs = [(a_pos[line], j) for line, j in b_pos.items() if j != -1]
+    if not pairs:
+        return []
+    pairs.sort()
+
+    # Longest increasing subsequence of j (patience sorting with back links)
+    tails: list[int] = []           # j at the top of each pile
+    tops: list[int] = []            # index into pairs for each pile top
+    back = [-1] * len(pairs)
+    for idx, (_, j) in enumerate(pairs):
+        pile = bisect_left(tails, j)
+        if pile == len(tails):
+            tails.append(j)
+            tops.append(idx)
+        else:
+            tails[pile] = j
+            tops[pile] = idx
+        back[idx] = tops[pile - 1] if pile else -1
+    chain = []
+    idx = tops[-1]
+    while idx != -1:
+        chain.append(pairs[idx])
+        idx = back[idx]
+    chain.reverse()
+    return chain
+
+
+def _myers_matches(a, b, alo, ahi, blo, bhi) -> list[tuple[int, int, int]]:
+    """Myers' greedy O(ND) diff of one region; [] if D exceeds the cap."""
+    n, m = ahi - alo, bhi - blo
+    max_d = min(n + m, _MYERS_MAX_COST)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+    for d in range(max_d + 1):
+        trace.append(v[:])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _myers_backtrack(trace, offset, n, m, d, alo, blo)
+    return []
+
+
+def _myers_backtrack(trace, offset, x, y, d, alo, blo):
+    """Walk the saved V arrays back from (x, y) and collect the snakes."""
+    matches = []
+    while d > 0:
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+            prev_k = k + 1                      # insertion: came down
+            mid_x = v[offset + prev_k]
+        else:
+            prev_k = k - 1                      # deletion: came right
+            mid_x = v[offset + prev_k] + 1
+        if x > mid_x:
+            matches.append((alo + mid_x, blo + mid_x - k, x - mid_x))
+        x = v[offset + prev_k]
+        y = x - prev_k
+        d -= 1
+    if x > 0:
+        matches.append((alo, blo, x))
+    return matches
+
+
+# ---------------------------------------------------------------------------
+# Opcode assembly
+# ---------------------------------------------------------------------------
+
+def _opcodes(matches, n: int, m: int) -> list[tuple[str, int, int, int, int]]:
+    ops: list[tuple[str, int, int, int, int]] = []
+    i = j = 0
+    for mi, mj, size in sorted(matches) + [(n, m, 0)]:
+        if i < mi and j < mj:
+            ops.append(("replace", i, mi, j, mj))
+        elif i < mi:
+            ops.append(("delete", i, mi, j, j))
+        elif j < mj:
+            ops.append(("insert", i, i, j, mj))
+        if size:
+            if ops and ops[-1][0] == "equal":
+                _, ei, _, ej, _ = ops.pop()
+                ops.append(("equal", ei, mi + size, ej, mj + size))
+            else:
+                ops.append(("equal", mi, mi + size, mj, mj + size))
+        i, j = mi + size, mj + size
+    return ops
@@ -0,0 +1,171 @@
+"""Submission discovery: one parallel scan of the assignment folder.
+
+The assignment folder is listed once with os.scandir, and the student
+folders are scanned in a small thread pool, which matters on a network
+share where every listing is a round trip. The result is one manifest per
+submission, and the runner and the staging cache work from it instead of
+listing each folder again:
+
+    scanner = SubmissionScanner()
+    for m in scanner.scan(assignment_path, "folder", runner._pick_main):
+        m.path, m.main_script, m.files      # name -> FileEntry(size, mtime_ns, digest)
+
+A file's digest is carried over from the previous scan while its size and
+mtime are unchanged, so rescanning a class that has not changed (as watch
+mode does every second) reads no file contents. One scanner can be shared by
+every runner an app makes, so that holds across runs too.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+# OS/editor system files that should never be copied into student sandboxes
+SYSTEM_FILES = frozenset({".ds_store", "thumbs.db", "desktop.ini", ".gitkeep", ".gitignore"})
+
+_CHUNK = 1 << 20
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    size: int
+    mtime_ns: int
+    digest: str                     # BLAKE2b of the content, hex
+
+
+@dataclass(frozen=True)
+class SubmissionManifest:
+    """What one submission holds, as of the scan."""
+    path: str                       # as returned by find_student_submissions()
+    main_script: Optional[str]      # full path; None if no script qualifies
+    files: dict[str, FileEntry]     # everything copied into the sandbox, by name
+
+    @property
+    def data_files(self) -> list[str]:
+        return sorted(n for n in self.files if not n.endswith((".py", ".pyc")))
+
+    @property
+    def digest(self) -> str:
+        """Content digest of the whole submission; equal for identical ones."""
+        h = hashlib.blake2b(digest_size=16)
+        for name in sorted(self.files):
+            h.update(name.encode("utf-8", "surrogatepass") + b"\0")
+            h.update(bytes.fromhex(self.files[name].digest))
+        return h.hexdigest()
+
+
+class SubmissionScanner:
+    """Scans an assignment folder into SubmissionManifests."""
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        # assignment path -> {file path -> entry} from its last scan, to skip
+        # re-hashing
+        self._known: dict[str, dict[str, FileEntry]] = {}
+
+    def scan(self, assignment_path: str, mode: str,
+             pick_main: Callable[[str, list[str]], Optional[str]]) -> list[SubmissionManifest]:
+        """Manifests of every submission, sorted by path; pick_main(folder
+        name, file names) chooses a folder's main script.
+
+        mode='folder' → subdirs containing .py files
+        mode='file'   → .py files directly in the folder; each one's sandbox
+                        gets the whole folder, so all share its listing
+        """
+        root = os.path.abspath(assignment_path)
+        with self._lock:
+            known = self._known.get(root, {})
+        seen: dict[str, FileEntry] = {}
+        if mode == "file":
+            files = self._scan_dir(assignment_path, known, seen)
+            manifests = [
+                SubmissionManifest(os.path.join(assignment_path, name),
+                                   os.path.join(assignment_path, name), files)
+                for name in sorted(files) if name.endswith(".py")
+            ]
+        else:
+            with os.scandir(assignment_path) as it:
+                folders = sorted(entry.path for entry in it
+                                 if entry.is_dir() and not entry.name.startswith("__"))
+            if len(folders) > 1 and self.max_workers > 1:
+                with ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix="discover") as pool:
+                    listings = list(pool.map(
+                        lambda folder: self._scan_dir(folder, known, seen), folders))
+            else:
+                listings = [self._scan_dir(folder, known, seen) for folder in folders]
+            manifests = []
+            for folder, files in zip(folders, listings):
+                main = pick_main(os.path.basename(folder), list(files))
+                if files:
+                    manifests.append(SubmissionManifest(
+                        folder, os.path.join(folder, main) if main else None, files))
+        with self._lock:
+            self._known[root] = seen
+        return manifests
+
+    def scan_one(self, path: str, mode: str,
+                 pick_main: Callable[[str, list[str]], Optional[str]],
+                 ) -> Optional[SubmissionManifest]:
+        """The manifest of one submission, scanned again; None if it no
+        longer is one. Hashes are shared with scan() of its assignment."""
+        folder = os.path.dirname(path) if mode == "file" else path
+        root = os.path.abspath(folder if mode == "file" else os.path.dirname(folder))
+        with self._lock:
+            known = self._known.get(root, {})
+        seen: dict[str, FileEntry] = {}
+        files = self._scan_dir(folder, known, seen)
+        with self._lock:
+            self._known.setdefault(root, {}).update(seen)
+        if mode == "file":
+            return SubmissionManifest(path, path, files) \
+                if os.path.basename(path) in files else None
+        if not files:
+            return None
+        main = pick_main(os.path.basename(folder), list(files))
+        return SubmissionManifest(path, os.path.join(folder, main) if main else None, files)
+
+    def _scan_dir(self, directory: str, known: dict[str, FileEntry],
+                  seen: dict[str, FileEntry]) -> dict[str, FileEntry]:
+        """directory's files; none for a student folder without a script,
+        which is not hashed."""
+        stats = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.lower() not in SYSTEM_FILES:
+                        stats.append((entry.name, entry.path, entry.stat()))
+        except OSError:
+            return {}                   # vanished or unreadable; not a submission
+        if not any(name.endswith(".py") for name, _, _ in stats):
+            return {}
+
+        files: dict[str, FileEntry] = {}
+        for name, path, st in stats:
+            old = known.get(path)
+            if old is not None and (old.size, old.mtime_ns) == (st.st_size, st.st_mtime_ns):
+                files[name] = old
+                continue
+            try:
+                files[name] = FileEntry(st.st_size, st.st_mtime_ns, _digest(path))
+            except OSError:
+                continue                # removed mid-scan
+        with self._lock:
+            for name, fe in files.items():
+                seen[os.path.join(directory, name)] = fe
+        return files
+
+
+def _digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,172 @@
+"""Prometheus metrics endpoint for a grading process.
+
+Serves the runner's counters in the Prometheus text exposition format on a
+loopback port, for a grading box to be scraped and graphed overnight:
+
+    exporter = MetricsExporter(run_metrics)
+    exporter.add_cache("diffs", lambda: (diffs.hits, diffs.misses))
+    exporter.serve(9464)              # http://127.0.0.1:9464/metrics
+    ...
+    exporter.close()
+
+Exposed:
+    autograder_tests_executed_total            tests run by ScriptRunner
+    autograder_test_timeouts_total
+    autograder_test_errors_total{type}         error type of failed runs
+    autograder_stage_seconds{stage}            histogram per trace stage
+    autograder_queue_depth                     students not started yet
+    autograder_workers                         worker pool size
+    autograder_sandboxes_active                sandboxes in use (busy workers)
+    autograder_students_per_second             moving average, current run
+    autograder_cache_hits_total{cache}         and _misses_total, per cache
+    autograder_run_cache_hits{cache}           and _misses, per-run caches
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from engine import trace
+from engine.metrics import RunMetrics
+
+
+# Histogram bucket upper bounds (s); +Inf is implied
+_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsExporter:
+    """Renders RunMetrics, stage latencies and cache counters on request."""
+
+    def __init__(self, metrics: RunMetrics):
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        # stage -> [per-bucket counts incl. +Inf, sum of seconds]
+        self._stages: dict[str, list] = {}
+        self._caches: dict[str, Callable[[], tuple[int, int]]] = {}
+        self._run_caches: dict[str, Callable[[], tuple[int, int]]] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        trace.add_listener(self._observe)
+
+    def add_cache(self, name: str, stats: Callable[[], tuple[int, int]],
+                  per_run: bool = False):
+        """Report a cache's (hits, misses), read at each scrape.
+
+        A per_run cache starts from zero each run (like a run's BlobStore),
+        so it is exported as gauges: a counter must never go down.
+        """
+        (self._run_caches if per_run else self._caches)[name] = stats
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> int:
+        """Start answering GET /metrics in a daemon thread; returns the port."""
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http",
+                         daemon=True).start()
+        return self._server.server_address[1]
+
+    def close(self):
+        trace.remove_listener(self._observe)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _observe(self, stage: str, duration_ns: int, tags: dict):
+        seconds = duration_ns / 1e9
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = [[0] * (len(_BUCKETS) + 1), 0.0]
+            entry[0][bisect.bisect_left(_BUCKETS, seconds)] += 1
+            entry[1] += seconds
+
+    # ------------------------------------------------------------------
+    # Exposition
+    # ------------------------------------------------------------------
+
+    def render(self) -> str:
+        totals = self.metrics.totals()
+        snap = self.metrics.snapshot()
+        out: list[str] = []
+
+        _metric(out, "autograder_tests_executed_total", "counter",
+                "Test runs completed by the script runner.", [("", totals.tests)])
+        _metric(out, "autograder_test_timeouts_total", "counter",
+                "Test runs stopped at the timeout.", [("", totals.timeouts)])
+        _metric(out, "autograder_test_errors_total", "counter",
+                "Test runs that ended in an error, by error type.",
+                [(_labels(type=t), n) for t, n in sorted(totals.errors.items())])
+
+        with self._lock:
+            stages = {name: (list(counts), total) for name, (counts, total)
+                      in self._stages.items()}
+        out.append("# HELP autograder_stage_seconds Latency of each grading stage.")
+        out.append("# TYPE autograder_stage_seconds histogram")
+        for stage, (counts, total) in sorted(stages.items()):
+            cumulative = 0
+            for bound, n in zip(_BUCKETS + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                out.append(f"autograder_stage_seconds_bucket{_labels(stage=stage, le=le)} "
+                           f"{cumulative}")
+            out.append(f"autograder_stage_seconds_sum{_labels(stage=stage)} {total!r}")
+            out.append(f"autograder_stage_seconds_count{_labels(stage=stage)} {cumulative}")
+
+        _metric(out, "autograder_queue_depth", "gauge",
+                "Students in the current run not started yet.", [("", snap.queued)])
+        _metric(out, "autograder_workers", "gauge",
+                "Worker pool size of the current run.", [("", snap.workers)])
+        _metric(out, "autograder_sandboxes_active", "gauge",
+                "Student sandboxes in use (one per busy worker).", [("", snap.busy)])
+        _metric(out, "autograder_students_per_second", "gauge",
+                "Moving-average grading rate of the current run.",
+                [("", round(snap.students_per_s, 3))])
+
+        caches = {name: stats() for name, stats in self._caches.items()}
+        _metric(out, "autograder_cache_hits_total", "counter", "Cache hits, by cache.",
+                [(_labels(cache=name), hits) for name, (hits, _) in caches.items()])
+        _metric(out, "autograder_cache_misses_total", "counter", "Cache misses, by cache.",
+                [(_labels(cache=name), misses) for name, (_, misses) in caches.items()])
+        run_caches = {name: stats() for name, stats in self._run_caches.items()}
+        _metric(out, "autograder_run_cache_hits", "gauge",
+                "Cache hits in the current run, by per-run cache.",
+                [(_labels(cache=name), hits) for name, (hits, _) in run_caches.items()])
+        _metric(out, "autograder_run_cache_misses", "gauge",
+                "Cache misses in the current run, by per-run cache.",
+                [(_labels(cache=name), misses) for name, (_, misses) in run_caches.items()])
+        return "\n".join(out) + "\n"
+
+
+def _metric(out: list[str], name: str, kind: str, help_: str, samples):
+    out.append(f"# HELP {name} {help_}")
+    out.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        out.append(f"{name}{labels} {value}")
+
+
+def _labels(**labels) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(str(v))}"' for k, v in labels.items()) + "}"
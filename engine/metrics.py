@@ -0,0 +1,148 @@
+"""Live counters for a grading run, shared between the runner and the UI.
+
+The runner bumps a few integers as students start and finish and as each
+test completes; the UI polls snapshot() on a timer instead of reacting to
+every event, so a fast class costs it the same as a slow one.
+
+    metrics = RunMetrics()
+    metrics.reset(students=len(paths), tests=len(test_cases), workers=4)
+    runner.run_batch(paths, ..., metrics=metrics)     # in a worker thread
+    snap = metrics.snapshot()                         # from the UI, every 500 ms
+
+reset() starts a new run's live figures; totals() are cumulative over every
+run since the object was made, for the metrics endpoint (engine/exporter.py).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+# Completions the moving-average rates are taken over
+_WINDOW = 32
+
+
+@dataclass(frozen=True)
+class MetricsSnapshot:
+    students_total: int
+    students_done: int
+    tests_done: int
+    timeouts: int
+    busy: int                       # workers running a student right now
+    idle: int
+    queued: int                     # students not started yet
+    students_per_s: float           # moving averages over the last few completions
+    tests_per_s: float
+    eta_s: Optional[float]          # None until a rate is known
+    elapsed_s: float
+    workers: int
+
+
+@dataclass(frozen=True)
+class MetricsTotals:
+    tests: int
+    timeouts: int
+    errors: dict[str, int]          # error type -> tests that ended with it
+
+
+class RunMetrics:
+    """Counters updated from runner threads; reads are consistent snapshots."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tests_total = 0
+        self._timeouts_total = 0
+        self._errors: dict[str, int] = {}
+        self.reset()
+
+    def reset(self, students: int = 0, tests: int = 0, workers: int = 0):
+        with self._lock:
+            self._students_total = students
+            self._tests_per_student = tests
+            self._workers = workers
+            self._started = 0
+            self._students_done = 0
+            self._tests_done = 0
+            self._timeouts = 0
+            self._t0 = time.monotonic()
+            self._student_times: deque[float] = deque([self._t0], maxlen=_WINDOW + 1)
+            self._test_times: deque[float] = deque([self._t0], maxlen=_WINDOW + 1)
+
+    # ---- runner side -----------------------------------------------------
+
+    def add_students(self, n: int):
+        """Grow the run by n queued students (watch mode)."""
+        with self._lock:
+            self._students_total += n
+
+    def student_started(self):
+        with self._lock:
+            self._started += 1
+
+    def student_finished(self):
+        with self._lock:
+            self._students_done += 1
+            self._student_times.append(time.monotonic())
+
+    def test_finished(self, error_type: Optional[str] = None):
+        timed_out = error_type == "Timeout"
+        with self._lock:
+            self._tests_done += 1
+            self._timeouts += timed_out
+            self._test_times.append(time.monotonic())
+            self._tests_total += 1
+            self._timeouts_total += timed_out
+            if error_type:
+                self._errors[error_type] = self._errors.get(error_type, 0) + 1
+
+    # ---- UI side ---------------------------------------------------------
+
+    def snapshot(self) -> MetricsSnapshot:
+        now = time.monotonic()
+        with self._lock:
+            students_rate = _rate(self._student_times, now)
+            tests_rate = _rate(self._test_times, now)
+            remaining = self._students_total - self._students_done
+            busy = self._started - self._students_done
+            if remaining <= 0:
+                eta = 0.0
+            elif students_rate > 0:
+                eta = remaining / students_rate
+            elif tests_rate > 0 and self._tests_per_student:
+                # Early on, before any student finishes, go by tests
+                eta = (remaining * self._tests_per_student - self._tests_done) / tests_rate
+            else:
+                eta = None
+            return MetricsSnapshot(
+                students_total=self._students_total,
+                students_done=self._students_done,
+                tests_done=self._tests_done,
+                timeouts=self._timeouts,
+                busy=busy,
+                idle=max(0, min(self._workers, self._students_total) - busy),
+                queued=self._students_total - self._started,
+                students_per_s=students_rate,
+                tests_per_s=tests_rate,
+                eta_s=eta if eta is None else max(0.0, eta),
+                elapsed_s=now - self._t0,
+                workers=self._workers,
+            )
+
+    def totals(self) -> MetricsTotals:
+        with self._lock:
+            return MetricsTotals(self._tests_total, self._timeouts_total, dict(self._errors))
+
+
+def _rate(times: deque, now: float) -> float:
+    """Events per second over the window, which always starts at times[0].
+
+    The window runs to now rather than to the last event, so the rate decays
+    while nothing finishes instead of freezing at its last value.
+    """
+    events = len(times) - 1
+    span = now - times[0]
+    return events / span if events and span > 0 else 0.0
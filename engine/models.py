@@ -1,15 +1,23 @@
 """Data classes for autograder results."""
 
 from __future__ import annotations
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import Optional, Union
+
+from engine.blobs import BlobRef, resolve, resolve_files
+
+
+# dataclass(slots=True) needs Python 3.10; older interpreters keep a __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
 class MatchTier(Enum):
     """Comparison result tier, from strongest to weakest match."""
     EXACT      = "exact"       # Raw stdout identical
     NORMALIZED = "normalized"  # Whitespace-normalized match
+    NUMERIC    = "numeric"     # Same text, numbers equal within tolerance
     SEMANTIC   = "semantic"    # Extracted values match, prompts differ
     FILE_ONLY  = "file_only"   # Stdout differs but file output correct
     MISMATCH   = "mismatch"    # Values differ
@@ -19,7 +27,7 @@ class MatchTier(Enum):
 class StudentCategory(Enum):
     """Overall student classification."""
     PERFECT    = "perfect"     # All tests EXACT or NORMALIZED
-    COSMETIC   = "cosmetic"    # All logic correct; only prompt wording differs
+    COSMETIC   = "cosmetic"    # All logic correct; only wording / number format differs
     PARTIAL    = "partial"     # Mix of passes and failures
     LOGIC_FAIL = "logic_fail"  # Code ran but produced wrong behavior
     CRASH      = "crash"       # Runtime / syntax / import / timeout error
@@ -45,23 +53,67 @@ class StudentCategory(Enum):
         }[self.value]
 
 
-@dataclass
-class TestResult:
-    """Result of running one test case against one student submission."""
+@dataclass(**_SLOTS)
+class TestBase:
+    """Base-solution side of one test case, shared by every student's TestResult."""
     test_num: int
     input_lines: list[str]
-    base_stdout: str
-    student_stdout: str
-    base_files: dict[str, str | bytes | None]
-    student_files: dict[str, str | bytes | None]
+    stdout: str
+    files: dict[str, str | bytes | None]
+    semantic_values: list[tuple[str, str]]     # [(type, value), ...]
+
+
+@dataclass(**_SLOTS)
+class TestResult:
+    """Result of running one test case against one student submission.
+
+    Student output is held as BlobRef handles into the run's BlobStore (or
+    as plain values when graded without one); the student_stdout,
+    student_files and error properties decompress on access.
+    """
+    base: TestBase
+    stdout_blob: Union[str, BlobRef]
+    files_blob: dict[str, Union[str, bytes, None, BlobRef]]
     match_tier: MatchTier
     stdout_match: bool          # True if stdout passes at any tier
     file_match: bool            # True if file output matches
     file_mismatch_details: list[str]
-    semantic_values_base: list[tuple[str, str]]    # [(type, value), ...]
     semantic_values_student: list[tuple[str, str]]
-    error: Optional[str] = None
+    error_blob: Union[str, BlobRef, None] = None
     error_type: Optional[str] = None  # "SyntaxError", "EOFError", "Timeout", etc.
+    elapsed: Optional[float] = None   # wall-clock seconds of the student's run
+
+    @property
+    def student_stdout(self) -> str:
+        return resolve(self.stdout_blob)
+
+    @property
+    def student_files(self) -> dict[str, str | bytes | None]:
+        return resolve_files(self.files_blob)
+
+    @property
+    def error(self) -> Optional[str]:
+        return resolve(self.error_blob)
+
+    @property
+    def test_num(self) -> int:
+        return self.base.test_num
+
+    @property
+    def input_lines(self) -> list[str]:
+        return self.base.input_lines
+
+    @property
+    def base_stdout(self) -> str:
+        return self.base.stdout
+
+    @property
+    def base_files(self) -> dict[str, str | bytes | None]:
+        return self.base.files
+
+    @property
+    def semantic_values_base(self) -> list[tuple[str, str]]:
+        return self.base.semantic_values
 
     @property
     def passed(self) -> bool:
@@ -69,7 +121,7 @@ class TestResult:
         return self.match_tier not in (MatchTier.MISMATCH, MatchTier.ERROR)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class StudentResult:
     """Aggregated result for one student across all test cases."""
     name: str
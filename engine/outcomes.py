@@ -0,0 +1,205 @@
+"""Students × tests outcome index for fast result queries.
+
+Built once per run from the StudentResult list. Every cell holds the match
+tier code of one test for one student, and for every (tier, test) pair the
+set of students with that outcome is kept as a packed bitset — a packbits
+uint8 array when NumPy is available, a Python int otherwise. Queries are
+then a few bitwise ANDs / ORs over those sets, independent of how many
+TestResult objects there are.
+
+Queries are whitespace-separated terms that must all hold:
+
+    <outcome>:<tests>        outcome is a tier name (exact, normalized,
+                             numeric, semantic, file_only, mismatch, error)
+                             or pass / fail
+                             tests is a test number, a comma list (1,3),
+                             'any', 'all', or 'file' (any test with
+                             expected file output)
+    !<outcome>:<tests>       negated term
+
+    "fail:3 pass:5"          failed test 3 but passed test 5
+    "error:file"             ERROR on any file test
+    "semantic:all"           every test matched at the SEMANTIC tier
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional: Python ints serve as bitsets instead
+    np = None
+
+from engine.models import MatchTier, StudentResult
+
+
+# Tier code of each MatchTier (row order of the bitset table)
+TIER_CODES = {tier: code for code, tier in enumerate(MatchTier)}
+
+# Code for a test the student has no result for (e.g. grading was stopped)
+MISSING = len(TIER_CODES)
+
+# Tiers counted as passing, mirroring TestResult.passed
+PASSING = tuple(t for t in MatchTier if t not in (MatchTier.MISMATCH, MatchTier.ERROR))
+
+
+class OutcomeMatrix:
+    """Tier codes for every student and test, with per-outcome bitsets.
+
+    Student sets returned by the query methods are opaque bitsets; pass them
+    to names() / count() or combine them with &, | and invert().
+    """
+
+    def __init__(self, results: list[StudentResult], use_numpy: Optional[bool] = None):
+        self.student_names = [r.name for r in results]
+        self.n_tests = max((len(r.test_results) for r in results), default=0)
+        self.file_tests = sorted({
+            tr.test_num for r in results for tr in r.test_results if tr.base_files
+        })
+        self._use_numpy = np is not None if use_numpy is None else use_numpy
+        if self._use_numpy and np is None:
+            raise ImportError("NumPy is not installed")
+
+        # codes[student][test], test index 0 is test 1
+        codes = [
+            [TIER_CODES[tr.match_tier] for tr in r.test_results]
+            + [MISSING] * (self.n_tests - len(r.test_results))
+            for r in results
+        ]
+        if self._use_numpy:
+            self.codes = np.array(codes, dtype=np.uint8).reshape(len(results), self.n_tests)
+            tiers = np.arange(MISSING + 1, dtype=np.uint8)[:, None, None]
+            # (code, test, packed students)
+            self._bits = np.packbits(self.codes.T[None, :, :] == tiers, axis=2)
+            self._empty = np.zeros(self._bits.shape[2], dtype=np.uint8)
+            self._full = np.packbits(np.ones(len(results), dtype=bool))
+        else:
+            self.codes = codes
+            self._bits = [[0] * self.n_tests for _ in range(MISSING + 1)]
+            for i, row in enumerate(codes):
+                bit = 1 << i
+                for t, code in enumerate(row):
+                    self._bits[code][t] |= bit
+            self._empty = 0
+            self._full = (1 << len(results)) - 1
+
+    # ------------------------------------------------------------------
+    # Student sets
+    # ------------------------------------------------------------------
+
+    def has(self, test_num: int, tiers) -> object:
+        """Students whose test test_num ended in one of tiers."""
+        t = self._test_index(test_num)
+        found = self._empty
+        for tier in tiers:
+            found = found | self._bits[TIER_CODES[tier]][t]
+        return found
+
+    def any_test(self, tiers, tests: Optional[list[int]] = None) -> object:
+        """Students with one of tiers on at least one of tests (default all)."""
+        found = self._empty
+        for test_num in self._tests(tests):
+            found = found | self.has(test_num, tiers)
+        return found
+
+    def all_tests(self, tiers, tests: Optional[list[int]] = None) -> object:
+        """Students with one of tiers on every one of tests (default all)."""
+        found = self._full
+        for test_num in self._tests(tests):
+            found = found & self.has(test_num, tiers)
+        return found
+
+    def invert(self, students) -> object:
+        return ~students & self._full
+
+    def names(self, students) -> list[str]:
+        """Student names in a set, in result order."""
+        if self._use_numpy:
+            members = np.flatnonzero(np.unpackbits(students, count=len(self.student_names)))
+            return [self.student_names[i] for i in members]
+        return [name for i, name in enumerate(self.student_names) if students >> i & 1]
+
+    def count(self, students) -> int:
+        if self._use_numpy:
+            return int(np.unpackbits(students, count=len(self.student_names)).sum())
+        return bin(students).count("1")
+
+    # ------------------------------------------------------------------
+    # Aggregates
+    # ------------------------------------------------------------------
+
+    def pass_rates(self) -> list[float]:
+        """Fraction of students passing each test, among those who ran it."""
+        rates = []
+        for test_num in range(1, self.n_tests + 1):
+            ran = len(self.student_names) - self.count(self._bits[MISSING][test_num - 1])
+            passed = self.count(self.has(test_num, PASSING))
+            rates.append(passed / ran if ran else 0.0)
+        return rates
+
+    def tier_counts(self) -> list[dict[MatchTier, int]]:
+        """Per test, how many students ended in each tier."""
+        return [
+            {tier: self.count(self._bits[code][t]) for tier, code in TIER_CODES.items()}
+            for t in range(self.n_tests)
+        ]
+
+    # ------------------------------------------------------------------
+    # Query language
+    # ------------------------------------------------------------------
+
+    def query(self, text: str) -> object:
+        """Evaluate a query (see module docstring). Raises ValueError."""
+        found = self._full
+        for term in text.split():
+            negate = term.startswith("!")
+            outcome, sep, spec = term.lstrip("!").partition(":")
+            if not sep or not outcome or not spec:
+                raise ValueError(f"Expected <outcome>:<tests>, got {term!r}")
+            tiers = _outcome_tiers(outcome.lower())
+
+            spec = spec.lower()
+            if spec == "all":
+                students = self.all_tests(tiers)
+            elif spec == "any":
+                students = self.any_test(tiers)
+            elif spec == "file":
+                students = self.any_test(tiers, self.file_tests)
+            else:
+                students = self.any_test(tiers, _test_list(spec))
+            found = found & (self.invert(students) if negate else students)
+        return found
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _tests(self, tests: Optional[list[int]]) -> list[int]:
+        return list(range(1, self.n_tests + 1)) if tests is None else tests
+
+    def _test_index(self, test_num: int) -> int:
+        if not 1 <= test_num <= self.n_tests:
+            raise ValueError(f"No test {test_num} (tests are 1–{self.n_tests})")
+        return test_num - 1
+
+
+def _outcome_tiers(outcome: str) -> tuple[MatchTier, ...]:
+    if outcome == "pass":
+        return PASSING
+    if outcome == "fail":
+        return (MatchTier.MISMATCH, MatchTier.ERROR)
+    try:
+        return (MatchTier(outcome),)
+    except ValueError:
+        names = ", ".join([t.value for t in MatchTier] + ["pass", "fail"])
+        raise ValueError(f"Unknown outcome {outcome!r} (use {names})") from None
+
+
+def _test_list(spec: str) -> list[int]:
+    try:
+        return [int(part) for part in spec.split(",")]
+    except ValueError:
+        raise ValueError(
+            f"Tests must be a number, a comma list, 'any', 'all' or 'file', not {spec!r}"
+        ) from None
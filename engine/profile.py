@@ -0,0 +1,141 @@
+"""Assignment-level comparison profiles.
+
+A profile holds the assignment-specific knobs of the comparison cascade so a
+new assignment can be graded without editing engine code. Profiles are plain
+JSON files; any key left out keeps its default:
+
+    {
+      "name": "Contact Manager",
+      "skip_patterns": ["COMMAND MENU", "={3,}", "Contact Manager"],
+      "status_verbs": ["was added", "was removed", "not found"],
+      "ignore_case": false,
+      "whitespace": "collapse",
+      "abs_tol": 0.0,
+      "rel_tol": 0.0,
+      "invalid_loop_exempt": ["contact", "number"]
+    }
+
+The defaults reproduce the built-in rules used before profiles existed
+(see profiles/contact_manager.json). Compile a profile once per batch with
+engine.comparator.ProfileMatcher and share that object across workers.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, fields
+
+
+# Whitespace policies for the NORMALIZED tier
+WHITESPACE_POLICIES = ("collapse", "trim", "exact")
+
+
+@dataclass(frozen=True)
+class ComparisonProfile:
+    """Comparison rules for one assignment.
+
+    skip_patterns:       regexes for decorative lines the semantic tier
+                         ignores; each must match the whole (stripped)
+                         line, case-insensitively
+    status_verbs:        literal phrases that mark a status message
+                         ("was added", "not found", …), matched as whole
+                         words, case-insensitively
+    ignore_case:         compare NORMALIZED lines and semantic values
+                         without regard to case
+    whitespace:          "collapse" – strip lines, collapse inner runs,
+                                      drop blank lines
+                         "trim"     – strip lines, drop blank lines
+                         "exact"    – no whitespace normalization
+    abs_tol / rel_tol:   tolerance for the NUMERIC tier, as in math.isclose();
+                         at 0 only differently formatted equal values
+                         ("3.0" vs "3") match
+    invalid_loop_exempt: words that mark an 'invalid …' line as correct
+                         behaviour rather than rigid command validation
+    """
+    name: str = "Contact Manager"
+    skip_patterns: tuple[str, ...] = (
+        "COMMAND MENU", "={3,}", "-{3,}", r"\*{3,}", "Contact Manager",
+        "Welcome to .+", "Thank you for using.+", "Goodbye!?",
+    )
+    status_verbs: tuple[str, ...] = (
+        "was added", "was removed", "has been updated", "invalid", "not found",
+        "error", "no existing", "thank you", "goodbye", "welcome",
+    )
+    ignore_case: bool = False
+    whitespace: str = "collapse"
+    abs_tol: float = 0.0
+    rel_tol: float = 0.0
+    invalid_loop_exempt: tuple[str, ...] = ("contact", "number")
+
+    def __post_init__(self):
+        if self.whitespace not in WHITESPACE_POLICIES:
+            raise ValueError(
+                f"whitespace must be one of {', '.join(WHITESPACE_POLICIES)}, "
+                f"not {self.whitespace!r}"
+            )
+        if self.abs_tol < 0 or self.rel_tol < 0:
+            raise ValueError("abs_tol and rel_tol must be non-negative")
+        # Checked as ProfileMatcher embeds them: inside one case-insensitive
+        # group of its line rules, so inline global flags like (?i) and the
+        # rule group names are errors there even if valid alone
+        for pattern in self.skip_patterns:
+            try:
+                re.compile(_skip_rules(f"(?:{pattern})"))
+            except re.error as e:
+                raise ValueError(f"Invalid skip pattern {pattern!r}: {e}") from None
+        try:
+            re.compile(_skip_rules("|".join(f"(?:{p})" for p in self.skip_patterns)))
+        except re.error as e:
+            raise ValueError(f"Invalid skip patterns together: {e}") from None
+        if any(not verb.strip() for verb in self.status_verbs):
+            raise ValueError("status_verbs must not contain blank entries")
+
+
+def _skip_rules(skip: str) -> str:
+    """skip in the surroundings ProfileMatcher compiles it in."""
+    return (rf"(?P<skip>(?i:{skip})$)"
+            r"|(?P<menu>)|(?P<prompt>)|(?P<item>)|(?P<label>)")
+
+
+DEFAULT_PROFILE = ComparisonProfile()
+
+
+def load_profile(path: str) -> ComparisonProfile:
+    """Read a JSON profile file. Raises ValueError on malformed content."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path} is not valid JSON: {e}") from None
+    return profile_from_dict(data)
+
+
+def profile_from_dict(data: dict) -> ComparisonProfile:
+    """Build a ComparisonProfile from parsed JSON, validating types."""
+    if not isinstance(data, dict):
+        raise ValueError("A comparison profile must be a JSON object")
+
+    known = {f.name: f for f in fields(ComparisonProfile)}
+    unknown = sorted(set(data) - set(known))
+    if unknown:
+        raise ValueError(f"Unknown profile key(s): {', '.join(unknown)}")
+
+    kwargs = {}
+    for key, value in data.items():
+        default = getattr(DEFAULT_PROFILE, key)
+        if isinstance(default, tuple):
+            if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                raise ValueError(f"{key} must be a list of strings")
+            value = tuple(value)
+        elif isinstance(default, bool):
+            if not isinstance(value, bool):
+                raise ValueError(f"{key} must be true or false")
+        elif isinstance(default, float):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"{key} must be a number")
+            value = float(value)
+        elif not isinstance(value, str):
+            raise ValueError(f"{key} must be a string")
+        kwargs[key] = value
+    return ComparisonProfile(**kwargs)
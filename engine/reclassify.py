@@ -0,0 +1,224 @@
+"""Classification of cached runner output, in parallel.
+
+Grading has two stages: executing every program (slow, one subprocess per
+test) and classifying the raw outputs (pure Python). RawBatch keeps the
+runner's raw dicts for a whole class, with the outputs held in a BlobStore,
+so the second stage can be repeated after toggling stdout grading, editing
+an expected file override or switching comparison profile, without running
+anything again. When one test case was wrong, replace_test() swaps in output
+from re-executing just that test.
+
+classify_batch() spreads students over a process pool. Workers get plain
+text and send back results stripped of their outputs; the parent re-attaches
+the BlobRefs it already holds, so outputs cross the process boundary once.
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from engine import trace
+from engine.blobs import BlobStore, resolve, resolve_files
+from engine.categorizer import build_test_bases, process_student
+from engine.comparator import DEFAULT_MATCHER, ProfileMatcher
+from engine.models import StudentResult, TestBase
+from engine.profile import ComparisonProfile
+
+
+# Raw dict keys whose values are program output
+_OUTPUT_KEYS = ("stdout", "stderr", "error")
+
+# Students per worker task, relative to an even split across workers
+_CHUNKS_PER_WORKER = 4
+
+# Roughly what spawning a pool and importing the engine in it costs (s)
+_POOL_STARTUP_S = 1.0
+
+
+class RawBatch:
+    """Raw runner results for one class, kept for reclassification."""
+
+    def __init__(self, base_raws: list[dict], test_cases: list[dict],
+                 blobs: Optional[BlobStore] = None):
+        self.base_raws = list(base_raws)
+        self.run_keys = [_run_key(tc) for tc in test_cases]
+        self.blobs = blobs or BlobStore()
+        self.students: list[tuple[str, str, list[dict]]] = []   # (name, path, raws)
+
+    def add(self, name: str, path: str, raws: list[dict]):
+        """Keep a student's raws, moving their outputs into the BlobStore."""
+        self.students.append((name, path, [self._pack(raw) for raw in raws]))
+
+    def changed_tests(self, test_cases: list[dict]) -> Optional[list[int]]:
+        """Indices of the tests that would execute differently now.
+
+        Only stdin and the captured filename affect execution; expected file
+        content, stdout grading and the profile are applied at classification.
+        None when tests were added or removed, which needs a full run.
+        """
+        if len(test_cases) != len(self.run_keys):
+            return None
+        return [i for i, tc in enumerate(test_cases) if _run_key(tc) != self.run_keys[i]]
+
+    def replace_test(self, index: int, test_case: dict, base_raw: dict,
+                     student_raws: dict[str, dict]):
+        """Swap in freshly executed raws for one test case.
+
+        student_raws maps student name to that student's new raw dict;
+        students missing from it keep their old output.
+        """
+        self.run_keys[index] = _run_key(test_case)
+        self.base_raws[index] = base_raw
+        for name, _, raws in self.students:
+            if name in student_raws:
+                raws[index] = self._pack(student_raws[name])
+
+    def _pack(self, raw: dict) -> dict:
+        packed = dict(raw)
+        for key in _OUTPUT_KEYS:
+            if key in packed:
+                packed[key] = self.blobs.put(packed[key])
+        if packed.get("files"):
+            packed["files"] = self.blobs.put_files(packed["files"])
+        return packed
+
+
+def _run_key(tc: dict) -> tuple:
+    return tuple(tc.get("input", [])), tc.get("expected_filename", "").strip()
+
+
+def classify_batch(
+    batch: RawBatch,
+    test_cases: list[dict],
+    check_stdout: bool = True,
+    matcher: Optional[ProfileMatcher] = None,
+    max_workers: int = 4,
+    on_results: Optional[Callable[[list[StudentResult]], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> list[StudentResult]:
+    """Classify every student in batch; results come back in batch order.
+
+    on_results(chunk) is called as each group of students is finished, and
+    should_stop() is polled between groups. The first group is classified
+    in this thread; the rest go to a process pool only if, at that pace,
+    they would take longer than starting one. Everything stays in this
+    thread with max_workers <= 1, while tracing (spans are only recorded in
+    this process), or when no process pool can be started.
+    """
+    matcher = matcher or DEFAULT_MATCHER
+    bases = build_test_bases(batch.base_raws, test_cases, matcher)
+    students = batch.students
+    size = max(1, math.ceil(len(students) / (max(1, max_workers) * _CHUNKS_PER_WORKER)))
+    chunks = [students[i:i + size] for i in range(0, len(students), size)]
+    may_fork = max_workers > 1 and len(chunks) > 1 and not trace.enabled()
+
+    done_chunks: dict[int, list[StudentResult]] = {}
+    started = time.perf_counter()
+    for idx, chunk in enumerate(chunks):
+        if should_stop and should_stop():
+            break
+        if idx == 1 and may_fork:
+            first_chunk = time.perf_counter() - started
+            if first_chunk * (len(chunks) - 1) > _POOL_STARTUP_S:
+                try:
+                    _classify_parallel(batch, chunks, 1, done_chunks, bases, test_cases,
+                                       check_stdout, matcher, max_workers, on_results,
+                                       should_stop)
+                    break
+                except (OSError, BrokenProcessPool):
+                    # No usable process pool (or it died): carry on in-thread
+                    # with the chunks it had not delivered
+                    pass
+        if idx in done_chunks:
+            continue
+        done = [
+            process_student(name, path, batch.base_raws, raws, test_cases,
+                            check_stdout=check_stdout, matcher=matcher,
+                            bases=bases, blobs=batch.blobs)
+            for name, path, raws in chunk
+        ]
+        done_chunks[idx] = done
+        if on_results:
+            on_results(done)
+    return [r for idx in sorted(done_chunks) for r in done_chunks[idx]]
+
+
+def _classify_parallel(batch, chunks, first, done_chunks, bases, test_cases,
+                       check_stdout, matcher, max_workers, on_results, should_stop):
+    """Classify chunks[first:] in a process pool into done_chunks, which
+    holds what was delivered to on_results even if the pool breaks."""
+    # Spawned, not forked: the caller is usually a Tk app with threads running
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        pending = {}
+        next_chunk = first
+        while next_chunk < len(chunks) or pending:
+            # Keep a bounded number of chunks in flight, so only those are
+            # decompressed at any one time
+            while next_chunk < len(chunks) and len(pending) < 2 * max_workers:
+                payload = (batch.base_raws, test_cases, check_stdout, matcher.profile,
+                           [(name, path, [_unpack(raw) for raw in raws])
+                            for name, path, raws in chunks[next_chunk]])
+                pending[pool.submit(_classify_chunk, payload)] = next_chunk
+                next_chunk += 1
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                idx = pending.pop(future)
+                results = future.result()
+                for result, (_, _, raws) in zip(results, chunks[idx]):
+                    _attach(result, raws, bases)
+                done_chunks[idx] = results
+                if on_results:
+                    on_results(results)
+            if should_stop and should_stop():
+                for future in pending:
+                    future.cancel()
+                break
+
+
+def _unpack(raw: dict) -> dict:
+    plain = dict(raw)
+    for key in _OUTPUT_KEYS:
+        if key in plain:
+            plain[key] = resolve(plain[key])
+    if plain.get("files"):
+        plain["files"] = resolve_files(plain["files"])
+    return plain
+
+
+def _attach(result: StudentResult, raws: list[dict], bases: list[TestBase]):
+    """Point a worker's stripped result at the parent's shared objects."""
+    for i, (tr, raw) in enumerate(zip(result.test_results, raws)):
+        tr.base = bases[i]
+        tr.stdout_blob = raw.get("stdout", "") or ""
+        tr.files_blob = raw.get("files") or {}
+        tr.error_blob = raw.get("error")
+
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+_matchers: dict[ComparisonProfile, ProfileMatcher] = {}
+
+
+def _classify_chunk(payload) -> list[StudentResult]:
+    base_raws, test_cases, check_stdout, profile, students = payload
+    matcher = _matchers.get(profile)
+    if matcher is None:
+        matcher = _matchers[profile] = ProfileMatcher(profile)
+    bases = build_test_bases(base_raws, test_cases, matcher)
+    results = []
+    for name, path, raws in students:
+        result = process_student(name, path, base_raws, raws, test_cases,
+                                 check_stdout=check_stdout, matcher=matcher, bases=bases)
+        for tr in result.test_results:
+            tr.stdout_blob, tr.files_blob, tr.error_blob = "", {}, None
+            tr.base = None      # re-attached by the parent; not worth pickling
+        results.append(result)
+    return results
@@ -7,17 +7,23 @@ import shutil
 import subprocess
 import sys
 import tempfile
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Optional, Sequence
+
+from engine import trace
+from engine.archive import SubmissionArchive, archive_of, is_archive
+from engine.discovery import SYSTEM_FILES as _SYSTEM_FILES
+from engine.discovery import SubmissionManifest, SubmissionScanner
+from engine.metrics import RunMetrics
+from engine.staging import StagingCache
 
 
 # Data file extensions eligible for reset between test cases
 _DATA_EXTENSIONS = frozenset({".csv", ".txt", ".json", ".xml", ".dat", ".tsv", ".ini", ".cfg"})
 
-# OS/editor system files that should never be copied into student sandboxes
-_SYSTEM_FILES = frozenset({".ds_store", "thumbs.db", "desktop.ini", ".gitkeep", ".gitignore"})
-
 
 class ScriptRunner:
     """Executes student Python scripts in isolated sandboxes.
@@ -25,6 +31,20 @@ class ScriptRunner:
     Each student gets one temp directory for all their test cases.
     Data files (CSV, TXT, etc.) from the assignment root are refreshed
     between test cases so earlier runs don't corrupt later ones.
+
+    The assignment path may also be an LMS zip export (engine/archive.py);
+    its submissions are streamed from the zip into each sandbox, and data
+    files come from the folder the zip is in.
+
+    find_student_submissions() scans the assignment folder once
+    (engine/discovery.py) and keeps a manifest per submission, from which
+    run_student() picks the main script and copies files without listing
+    the folder again. Pass one SubmissionScanner to every runner to keep
+    its file hashes between runs.
+
+    With a StagingCache, run_batch() copies submissions and data files to
+    local disk ahead of the workers (engine/staging.py), for assignments
+    on network shares.
     """
 
     def __init__(
@@ -33,11 +53,18 @@ class ScriptRunner:
         timeout: int = 30,
         utility_path: str = "",
         module_names: list[str] | None = None,
+        staging: Optional[StagingCache] = None,
+        scanner: Optional[SubmissionScanner] = None,
     ):
         self.python_exe = python_exe
         self.timeout = timeout
         self.utility_path = utility_path
         self.module_names = module_names or []
+        self.staging = staging
+        self._archives: dict[str, SubmissionArchive] = {}
+        self._lock = threading.Lock()
+        self._scanner = scanner or SubmissionScanner()
+        self._manifests: dict[str, SubmissionManifest] = {}
 
     # ------------------------------------------------------------------
     # Public API
@@ -52,7 +79,12 @@ class ScriptRunner:
           3. First valid .py file alphabetically
         """
         folder = Path(folder_path)
-        python_files = list(folder.glob("*.py"))
+        name = self._pick_main(folder.name, [f.name for f in folder.glob("*.py")])
+        return str(folder / name) if name else None
+
+    def _pick_main(self, folder_name: str, file_names: list[str]) -> Optional[str]:
+        """find_main_script() over a list of file names."""
+        python_files = [n for n in file_names if n.endswith(".py")]
         if not python_files:
             return None
 
@@ -63,24 +95,21 @@ class ScriptRunner:
                 n += ".py"
             skip.add(n.lower())
 
-        valid = sorted(
-            [f for f in python_files if f.name.lower() not in skip],
-            key=lambda f: f.name,
-        )
+        valid = sorted(n for n in python_files if n.lower() not in skip)
         if not valid:
             return None
 
-        folder_lower = folder.name.lower()
-        for f in valid:
-            if f.name.lower().startswith(folder_lower):
-                return str(f)
+        folder_lower = folder_name.lower()
+        for n in valid:
+            if n.lower().startswith(folder_lower):
+                return n
 
-        for f in valid:
-            low = f.name.lower()
+        for n in valid:
+            low = n.lower()
             if "ica" in low or "pca" in low or "lca" in low or "hwa" in low:
-                return str(f)
+                return n
 
-        return str(valid[0])
+        return valid[0]
 
     def find_student_submissions(
         self, assignment_path: str, mode: str
@@ -89,19 +118,35 @@ class ScriptRunner:
 
         mode='folder' → subdirs containing .py files
         mode='file'   → .py files directly in the folder
+        A zip export gives one path per student in it, in either mode.
         """
-        root = Path(assignment_path)
-        paths = []
-        if mode == "file":
-            for item in sorted(root.iterdir()):
-                if item.is_file() and item.suffix == ".py":
-                    paths.append(str(item))
-        else:
-            for item in sorted(root.iterdir()):
-                if item.is_dir() and not item.name.startswith("__"):
-                    if list(item.glob("*.py")):
-                        paths.append(str(item))
-        return paths
+        if is_archive(assignment_path):
+            archive = self._archive(assignment_path)
+            return [path for path in archive.submission_paths()
+                    if any(n.endswith(".py") for n in archive.files(os.path.basename(path)))]
+        return [m.path for m in self.discover(assignment_path, mode)]
+
+    def discover(self, assignment_path: str, mode: str) -> list[SubmissionManifest]:
+        """Scan the assignment folder (not a zip) and remember the manifests."""
+        manifests = self._scanner.scan(assignment_path, mode, self._pick_main)
+        with self._lock:
+            self._manifests.update((m.path, m) for m in manifests)
+        return manifests
+
+    def rediscover(self, student_path: str, mode: str) -> Optional[SubmissionManifest]:
+        """Scan one submission (not in a zip) again and remember its manifest."""
+        manifest = self._scanner.scan_one(student_path, mode, self._pick_main)
+        with self._lock:
+            if manifest is None:
+                self._manifests.pop(student_path, None)
+            else:
+                self._manifests[student_path] = manifest
+        return manifest
+
+    def manifest(self, student_path: str) -> Optional[SubmissionManifest]:
+        """The manifest from the last scan that found student_path, if any."""
+        with self._lock:
+            return self._manifests.get(student_path)
 
     def run_student(
         self,
@@ -110,58 +155,99 @@ class ScriptRunner:
         mode: str,
         assignment_root: str,
         strict_stdout: bool = True,
+        test_indices: Optional[Sequence[int]] = None,
+        metrics: Optional[RunMetrics] = None,
+        manifest: Optional[SubmissionManifest] = None,
     ) -> list[dict]:
         """Run all test cases for one student inside a single temp sandbox.
 
         Returns a list of raw result dicts (one per test case):
-          {test_num, input, stdout, files, error, error_type, returncode}
+          {test_num, input, stdout, files, error, error_type, returncode, elapsed}
+
+        test_indices limits the run to those (0-based) test cases, returning
+        one dict for each. Every test starts from the same fixtures (the
+        submission plus clean assignment data files), so a test run alone
+        sees exactly what it sees in a full run. metrics, if given, counts
+        each finished test. manifest describes the submission's files (by
+        default, as last found by find_student_submissions()); student_path
+        may be a copy of it, as when staged.
         """
-        if mode == "file":
+        if test_indices is None:
+            test_indices = range(len(test_cases))
+        if manifest is None:
+            manifest = self.manifest(student_path)
+        names = list(manifest.files) if manifest is not None else None
+        zip_path = archive_of(student_path)
+        if zip_path is not None:
+            archive = self._archive(zip_path)
+            student = os.path.basename(student_path)
+            main_script_path = self._pick_main(student, list(archive.files(student)))
+            source_dir = None
+        elif mode == "file":
             main_script_path = student_path
             source_dir = str(Path(student_path).parent)
+        elif manifest is not None:
+            main_script_path = manifest.main_script and os.path.join(
+                student_path, os.path.basename(manifest.main_script))
+            source_dir = student_path
         else:
             main_script_path = self.find_main_script(student_path)
             source_dir = student_path
 
         if not main_script_path:
             return [
-                self._error_result(i + 1, tc["input"], "No main script found", "FileNotFound")
-                for i, tc in enumerate(test_cases)
+                self._error_result(i + 1, test_cases[i]["input"], "No main script found",
+                                   "FileNotFound")
+                for i in test_indices
             ]
 
         script_name = Path(main_script_path).name
+        student = Path(student_path).name
         results = []
 
         with tempfile.TemporaryDirectory() as tmp:
             # Copy student files once
-            self._copy_dir(source_dir, tmp, py_only=False)
+            with trace.span("copy", student=student):
+                if zip_path is not None:
+                    archive.extract(student, tmp, skip=_SYSTEM_FILES)
+                else:
+                    self._copy_dir(source_dir, tmp, py_only=False, names=names)
 
             # Track which non-.py files came with the student's original submission
             # so we know what to preserve vs. clean up between test cases
             original_data_files = self._list_data_files(tmp)
-
-            for i, tc in enumerate(test_cases):
-                # Remove files generated during the previous test case
-                # (e.g. contacts.csv the student wrote) before resetting the clean copy
-                if i > 0:
-                    self._clean_generated_files(tmp, original_data_files)
-
-                # Reset clean data files from assignment root (e.g. empty contacts.csv)
-                self._reset_data_files(assignment_root, tmp)
-
-                # Snapshot AFTER reset but BEFORE execution so auto-detection only
-                # captures files the student *generates*, not the ones we placed
-                pre_run_files = self._list_data_files(tmp)
-
-                result = self._run_one(tmp, script_name, tc["input"])
+            data_files = self._assignment_data_files(assignment_root)
+
+            for i in test_indices:
+                tc = test_cases[i]
+                with trace.span("reset", student=student, test=i + 1):
+                    # Remove files generated during the previous test case (e.g.
+                    # contacts.csv the student wrote) before resetting the clean copy
+                    if results:
+                        self._clean_generated_files(tmp, original_data_files)
+
+                    # Reset clean data files from assignment root (e.g. empty contacts.csv)
+                    self._reset_data_files(assignment_root, tmp, data_files)
+
+                    # Snapshot AFTER reset but BEFORE execution so auto-detection only
+                    # captures files the student *generates*, not the ones we placed
+                    pre_run_files = self._list_data_files(tmp)
+
+                with trace.span("execute", student=student, test=i + 1):
+                    started = time.perf_counter()
+                    result = self._run_one(tmp, script_name, tc["input"])
+                    result["elapsed"] = time.perf_counter() - started
                 result["test_num"] = i + 1
                 result["input"] = tc["input"]
 
                 # Collect expected file output
                 expected_fname = tc.get("expected_filename", "").strip()
-                result["files"] = self._read_output_files(tmp, expected_fname, pre_run_files)
+                with trace.span("read_files", student=student, test=i + 1):
+                    result["files"] = self._read_output_files(tmp, expected_fname, pre_run_files)
 
                 results.append(result)
+                if metrics is not None:
+                    metrics.test_finished(result["error_type"])
 
         return results
 
@@ -173,19 +259,39 @@ class ScriptRunner:
         assignment_root: str,
         max_workers: int = 4,
         progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        test_indices: Optional[Sequence[int]] = None,
+        metrics: Optional[RunMetrics] = None,
     ) -> dict[str, list[dict]]:
         """Grade all students in parallel using a thread pool.
 
         Returns {student_name: [raw_result_dicts]}.
         progress_callback(student_name, completed, total) called after each.
+        test_indices runs only those test cases, as in run_student().
+        metrics, if given, is reset for this batch and updated as it runs.
         """
+        if test_indices is None:
+            test_indices = range(len(test_cases))
+        if trace.enabled():
+            self._time_startup()
         total = len(student_paths)
         all_results: dict[str, list[dict]] = {}
+        if metrics is not None:
+            metrics.reset(total, len(test_indices), max_workers)
+        staged = {}
+        manifests = {path: self.manifest(path) for path in student_paths}
+        if self.staging is not None:
+            staged = self.staging.prefetch(student_paths, mode, manifests)
+            try:
+                assignment_root = self.staging.stage_data(assignment_root, _is_data_file)
+            except OSError:
+                pass        # read data files from the source instead
 
         with ThreadPoolExecutor(max_workers=max_workers) as pool:
             future_to_name = {
                 pool.submit(
-                    self.run_student, path, test_cases, mode, assignment_root
+                    self._run_counted, path, test_cases, mode, assignment_root,
+                    test_indices=test_indices, metrics=metrics, staged=staged.get(path),
+                    manifest=manifests[path],
                 ): os.path.basename(path)
                 for path in student_paths
             }
@@ -198,8 +304,9 @@ class ScriptRunner:
                     all_results[name] = future.result()
                 except Exception as exc:
                     all_results[name] = [
-                        self._error_result(i + 1, tc["input"], str(exc), "InternalError")
-                        for i, tc in enumerate(test_cases)
+                        self._error_result(i + 1, test_cases[i]["input"], str(exc),
+                                           "InternalError")
+                        for i in test_indices
                     ]
                 if progress_callback:
                     progress_callback(name, completed, total)
@@ -212,14 +319,52 @@ class ScriptRunner:
         test_cases: list[dict],
         mode: str,
         assignment_root: str,
+        test_indices: Optional[Sequence[int]] = None,
     ) -> list[dict]:
         """Run the base/reference solution against all test cases."""
-        return self.run_student(base_path, test_cases, mode, assignment_root)
+        return self.run_student(base_path, test_cases, mode, assignment_root,
+                                test_indices=test_indices)
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _run_counted(self, student_path: str, *args, metrics: Optional[RunMetrics],
+                     staged: Optional[Future] = None, **kwargs) -> list[dict]:
+        """run_student() on the staged copy if there is one, counted as busy
+        in metrics while it runs."""
+        if staged is not None:
+            try:
+                student_path = staged.result()
+            except OSError:
+                pass        # could not stage; read from the source
+        if metrics is None:
+            return self.run_student(student_path, *args, **kwargs)
+        metrics.student_started()
+        try:
+            return self.run_student(student_path, *args, metrics=metrics, **kwargs)
+        finally:
+            metrics.student_finished()
+
+    def _archive(self, path: str) -> SubmissionArchive:
+        """The (indexed once, then shared) archive at path."""
+        with self._lock:
+            archive = self._archives.get(path)
+            if archive is None:
+                archive = self._archives[path] = SubmissionArchive(path)
+            return archive
+
+    def _time_startup(self, runs: int = 3):
+        """Trace bare interpreter startup, as a baseline for 'execute' spans."""
+        env = self._build_env()
+        for _ in range(runs):
+            try:
+                with trace.span("interpreter_startup"):
+                    subprocess.run([self.python_exe, "-c", "pass"], env=env,
+                                   capture_output=True, timeout=self.timeout)
+            except (subprocess.TimeoutExpired, OSError):
+                pass        # diagnostic only: no sample, and the batch goes on
+
     def _build_env(self) -> dict:
         env = os.environ.copy()
         if self.utility_path:
@@ -289,12 +434,15 @@ class ScriptRunner:
                 return kind
         return "RuntimeError"
 
-    def _copy_dir(self, src: str, dst: str, py_only: bool = False):
+    def _copy_dir(self, src: str, dst: str, py_only: bool = False,
+                  names: Optional[list[str]] = None):
         """Copy files from src into dst (flat copy, no subdirs).
 
-        System/OS files (.DS_Store, Thumbs.db, etc.) are always skipped.
+        names, if given, is src's listing (from a manifest), so src is not
+        listed again. System/OS files (.DS_Store, Thumbs.db, etc.) are
+        always skipped.
         """
-        for item in os.listdir(src):
+        for item in os.listdir(src) if names is None else names:
             s = os.path.join(src, item)
             d = os.path.join(dst, item)
             if not os.path.isfile(s):
@@ -314,22 +462,32 @@ class ScriptRunner:
             and not item.endswith(".pyc")
         }
 
-    def _reset_data_files(self, assignment_root: str, tmp: str):
-        """Restore original data files from assignment_root into tmp.
+    def _assignment_data_files(self, assignment_root: str) -> list[str]:
+        """Paths of the data files _reset_data_files() restores.
 
-        Only recognized data extensions (.csv, .txt, .json, …) are copied so
-        that system files (ICA5.pdf, .DS_Store, etc.) never pollute the sandbox.
+        Only recognized data extensions (.csv, .txt, .json, …) count, so
+        that system files (ICA5.pdf, .DS_Store, etc.) never pollute the
+        sandbox. For a zip export, the data files sit next to the zip.
         """
+        if is_archive(assignment_root):
+            assignment_root = os.path.dirname(assignment_root)
         if not assignment_root or not os.path.isdir(assignment_root):
-            return
-        for item in os.listdir(assignment_root):
-            s = os.path.join(assignment_root, item)
-            if not os.path.isfile(s):
-                continue
-            ext = os.path.splitext(item)[1].lower()
-            if ext not in _DATA_EXTENSIONS:
-                continue
-            shutil.copy2(s, os.path.join(tmp, item))
+            return []
+        with os.scandir(assignment_root) as it:
+            return sorted(entry.path for entry in it
+                          if entry.is_file() and _is_data_file(entry.name))
+
+    def _reset_data_files(self, assignment_root: str, tmp: str,
+                          data_files: Optional[list[str]] = None):
+        """Restore original data files from assignment_root into tmp.
+
+        data_files, if given, is _assignment_data_files(assignment_root),
+        listed once per student rather than once per test.
+        """
+        if data_files is None:
+            data_files = self._assignment_data_files(assignment_root)
+        for path in data_files:
+            shutil.copy2(path, os.path.join(tmp, os.path.basename(path)))
 
     def _clean_generated_files(self, tmp: str, original_data_files: set[str]):
         """Remove non-.py files that were generated during the previous test run.
@@ -411,3 +569,7 @@ class ScriptRunner:
             "error_type": error_type,
             "files": {},
         }
+
+
+def _is_data_file(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in _DATA_EXTENSIONS
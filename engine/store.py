@@ -0,0 +1,503 @@
+"""SQLite store of grading runs.
+
+Each finished run is recorded with its configuration, the base side of every
+test, every student's result and every per-test outcome (tier, error type,
+timing). Outputs are stored once per distinct content in a shared blobs
+table, still compressed as the run's BlobStore kept them, so reopening a past
+run only reads the rows, and outputs are fetched when something displays
+them.
+
+    store = RunStore(DEFAULT_STORE_PATH)
+    run_id = store.save_run(config, results)
+    store.runs()                                  # newest first
+    store.find(run_id, test_num=3, tier="error")  # indexed lookups
+    results = store.load_run(run_id)
+
+A session file is a store holding a single run, written by save_session()
+and reopened with open_session(). Its results load lazily: the students
+table is the index the results table needs, and each student's per-test
+rows are read when something first touches them.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from engine.blobs import BlobRef, blob_digest, decode_blob, encode_blob
+from engine.models import (
+    MatchTier, StudentCategory, StudentResult, TestBase, TestResult,
+)
+
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".cop2273_autograder", "runs.db")
+
+SESSION_SUFFIX = ".agsession"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    created     REAL NOT NULL,
+    label       TEXT NOT NULL,
+    config      TEXT NOT NULL               -- JSON
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    id          INTEGER PRIMARY KEY,
+    digest      BLOB NOT NULL UNIQUE,
+    flags       INTEGER NOT NULL,
+    data        BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tests (
+    run_id      INTEGER NOT NULL REFERENCES runs(id),
+    test_num    INTEGER NOT NULL,
+    input       TEXT NOT NULL,              -- JSON list of lines
+    stdout      INTEGER,                    -- blob id, NULL when empty
+    files       TEXT NOT NULL,              -- JSON {name: blob ref}
+    semantic    TEXT NOT NULL,              -- JSON [[type, value], ...]
+    PRIMARY KEY (run_id, test_num)
+);
+CREATE TABLE IF NOT EXISTS students (
+    id          INTEGER PRIMARY KEY,
+    run_id      INTEGER NOT NULL REFERENCES runs(id),
+    name        TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    score       REAL NOT NULL,
+    tier        TEXT NOT NULL,
+    notes       TEXT NOT NULL               -- JSON list
+);
+CREATE TABLE IF NOT EXISTS results (
+    student_id  INTEGER NOT NULL REFERENCES students(id),
+    test_num    INTEGER NOT NULL,
+    tier        TEXT NOT NULL,
+    stdout_match INTEGER NOT NULL,
+    file_match  INTEGER NOT NULL,
+    file_details TEXT NOT NULL,             -- JSON list
+    semantic    TEXT NOT NULL,              -- JSON [[type, value], ...]
+    stdout      INTEGER,                    -- blob id, NULL when empty
+    files       TEXT NOT NULL,              -- JSON {name: blob ref}
+    error       INTEGER,                    -- blob id, NULL when none
+    error_type  TEXT,
+    elapsed     REAL,
+    PRIMARY KEY (student_id, test_num)
+);
+CREATE INDEX IF NOT EXISTS idx_students_run  ON students(run_id, name);
+CREATE INDEX IF NOT EXISTS idx_students_name ON students(name);
+CREATE INDEX IF NOT EXISTS idx_results_test  ON results(test_num, tier);
+CREATE INDEX IF NOT EXISTS idx_results_tier  ON results(tier);
+CREATE INDEX IF NOT EXISTS idx_results_error ON results(error_type);
+"""
+
+# Blob refs inside the JSON file maps: null = not generated, 0 = empty,
+# n > 0 = blob id
+
+_RESULT_COLUMNS = ("r.student_id, r.test_num, r.tier, r.stdout_match, r.file_match,"
+                   " r.file_details, r.semantic, r.stdout, r.files, r.error,"
+                   " r.error_type, r.elapsed")
+
+
+@dataclass(frozen=True)
+class RunInfo:
+    """One row of the run history."""
+    id: int
+    created: float
+    label: str
+    students: int
+    avg_score: float
+
+
+class RunStore:
+    """Thread-safe handle on one SQLite run database."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def save_run(self, config: dict, results: list[StudentResult],
+                 label: str = "") -> int:
+        """Record a finished run in one transaction; return its id."""
+        blob_ids: dict[bytes, int] = {}
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO runs (created, label, config) VALUES (?, ?, ?)",
+                (time.time(), label or f"{len(results)} students",
+                 json.dumps(config, default=str)),
+            )
+            run_id = cur.lastrowid
+            self._insert_bases(run_id, results, blob_ids)
+            for r in results:
+                self._insert_student(run_id, r, blob_ids)
+        return run_id
+
+    def put_student(self, run_id: int, result: StudentResult):
+        """Add a student to a run, replacing any earlier result of theirs.
+
+        For runs that grow while they are graded (watch mode); tests the run
+        has no base for yet are recorded from this result.
+        """
+        blob_ids: dict[bytes, int] = {}
+        with self._lock, self._conn:
+            old = [row[0] for row in self._conn.execute(
+                "SELECT id FROM students WHERE run_id = ? AND name = ?",
+                (run_id, result.name))]
+            for student_id in old:
+                self._conn.execute("DELETE FROM results WHERE student_id = ?", (student_id,))
+                self._conn.execute("DELETE FROM students WHERE id = ?", (student_id,))
+            self._insert_bases(run_id, [result], blob_ids)
+            self._insert_student(run_id, result, blob_ids)
+
+    def _insert_bases(self, run_id: int, results: list[StudentResult],
+                      blob_ids: dict[bytes, int]):
+        """Record the base side of each test the run lacks (lock held)."""
+        bases: dict[int, TestBase] = {}
+        for r in results:
+            for tr in r.test_results:
+                bases.setdefault(tr.test_num, tr.base)
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO tests VALUES (?, ?, ?, ?, ?, ?)",
+            [(run_id, num, json.dumps(b.input_lines),
+              self._blob_id(b.stdout, blob_ids),
+              self._files_json(b.files, blob_ids),
+              json.dumps(b.semantic_values))
+             for num, b in sorted(bases.items())],
+        )
+
+    def _insert_student(self, run_id: int, r: StudentResult, blob_ids: dict[bytes, int]):
+        cur = self._conn.execute(
+            "INSERT INTO students (run_id, name, path, category, score, tier, notes)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run_id, r.name, r.path, r.category.value, r.score,
+             r.overall_match_tier.value, json.dumps(r.notes)),
+        )
+        student_id = cur.lastrowid
+        self._conn.executemany(
+            "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(student_id, tr.test_num, tr.match_tier.value,
+              tr.stdout_match, tr.file_match,
+              json.dumps(tr.file_mismatch_details),
+              json.dumps(tr.semantic_values_student),
+              self._blob_id(tr.stdout_blob, blob_ids),
+              self._files_json(tr.files_blob, blob_ids),
+              self._blob_id(tr.error_blob, blob_ids),
+              tr.error_type, tr.elapsed)
+             for tr in r.test_results],
+        )
+
+    def _blob_id(self, value, blob_ids: dict[bytes, int]) -> Optional[int]:
+        """Row id for a value, inserting it if the store lacks it (lock held)."""
+        if not value:
+            return None
+        data = None
+        if isinstance(value, BlobRef):
+            if value._store is self:
+                return value.offset
+            if value.flags < 0:                       # not yet read from its store
+                data = value._store.stored(value)
+            digest = value.digest
+        else:
+            digest = blob_digest(value)
+        blob_id = blob_ids.get(digest)
+        if blob_id is not None:
+            return blob_id
+
+        row = self._conn.execute("SELECT id FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row:
+            blob_id = row[0]
+        else:
+            if not isinstance(value, BlobRef):
+                flags, data, _ = encode_blob(value)
+            else:
+                flags = value.flags
+                if data is None:
+                    data = value._store.stored(value)
+            blob_id = self._conn.execute(
+                "INSERT INTO blobs (digest, flags, data) VALUES (?, ?, ?)",
+                (digest, flags, data),
+            ).lastrowid
+        blob_ids[digest] = blob_id
+        return blob_id
+
+    def _files_json(self, files: dict, blob_ids: dict[bytes, int]) -> str:
+        return json.dumps({
+            name: None if content is None else (self._blob_id(content, blob_ids) or 0)
+            for name, content in files.items()
+        })
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def runs(self) -> list[RunInfo]:
+        """All recorded runs, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.id, r.created, r.label, COUNT(s.id), COALESCE(AVG(s.score), 0)"
+                " FROM runs r LEFT JOIN students s ON s.run_id = r.id"
+                " GROUP BY r.id ORDER BY r.id DESC"
+            ).fetchall()
+        return [RunInfo(*row) for row in rows]
+
+    def config(self, run_id: int) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT config FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No run {run_id}")
+        return json.loads(row[0])
+
+    def load_run(self, run_id: int, with_tests: bool = True,
+                 lazy: bool = False) -> list[StudentResult]:
+        """Rebuild a run's StudentResults; outputs stay in the database
+        until read. with_tests=False skips per-test rows (enough for reports);
+        lazy=True reads each student's per-test rows on first use instead.
+        """
+        with self._lock:
+            students = self._conn.execute(
+                "SELECT id, name, path, category, score, tier, notes FROM students"
+                " WHERE run_id = ? ORDER BY id", (run_id,)
+            ).fetchall()
+            if with_tests and lazy:
+                counts = dict(self._conn.execute(
+                    "SELECT r.student_id, COUNT(*) FROM results r"
+                    " JOIN students s ON s.id = r.student_id"
+                    " WHERE s.run_id = ? GROUP BY r.student_id", (run_id,)
+                ).fetchall())
+            elif with_tests:
+                rows = self._conn.execute(
+                    f"SELECT {_RESULT_COLUMNS} FROM results r"
+                    " JOIN students s ON s.id = r.student_id"
+                    " WHERE s.run_id = ? ORDER BY r.student_id, r.test_num", (run_id,)
+                ).fetchall()
+
+        per_student: dict[int, list[TestResult]] = {}
+        if with_tests and lazy:
+            bases = _Once(lambda: self._bases(run_id))
+            for student_id, count in counts.items():
+                per_student[student_id] = LazyTests(
+                    lambda sid=student_id: self._student_tests(sid, bases()), count)
+        elif with_tests:
+            bases = self._bases(run_id)
+            for row in rows:
+                per_student.setdefault(row[0], []).append(self._test_result(row, bases))
+
+        return [
+            StudentResult(
+                name=name,
+                path=path,
+                category=StudentCategory(category),
+                score=score,
+                test_results=per_student.get(student_id, []),
+                overall_match_tier=MatchTier(tier),
+                notes=json.loads(notes),
+            )
+            for student_id, name, path, category, score, tier, notes in students
+        ]
+
+    def _bases(self, run_id: int) -> dict[int, TestBase]:
+        with self._lock:
+            tests = self._conn.execute(
+                "SELECT test_num, input, stdout, files, semantic FROM tests WHERE run_id = ?",
+                (run_id,)
+            ).fetchall()
+        return {
+            num: TestBase(
+                test_num=num,
+                input_lines=json.loads(inp),
+                stdout=self._load(stdout) or "",
+                files=self._load_files(files, lazy=False),
+                semantic_values=[tuple(v) for v in json.loads(sem)],
+            )
+            for num, inp, stdout, files, sem in tests
+        }
+
+    def _student_tests(self, student_id: int, bases: dict[int, TestBase]) -> list[TestResult]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_RESULT_COLUMNS} FROM results r"
+                " WHERE r.student_id = ? ORDER BY r.test_num", (student_id,)
+            ).fetchall()
+        return [self._test_result(row, bases) for row in rows]
+
+    def _test_result(self, row: tuple, bases: dict[int, TestBase]) -> TestResult:
+        (_, num, tier, stdout_match, file_match, details, sem,
+         stdout, files, error, error_type, elapsed) = row
+        return TestResult(
+            base=bases[num],
+            stdout_blob=self._ref(stdout) or "",
+            files_blob=self._load_files(files, lazy=True),
+            match_tier=MatchTier(tier),
+            stdout_match=bool(stdout_match),
+            file_match=bool(file_match),
+            file_mismatch_details=json.loads(details),
+            semantic_values_student=[tuple(v) for v in json.loads(sem)],
+            error_blob=self._ref(error),
+            error_type=error_type,
+            elapsed=elapsed,
+        )
+
+    def find(
+        self,
+        run_id: int,
+        student: Optional[str] = None,
+        test_num: Optional[int] = None,
+        tier: Optional[str] = None,
+        error_type: Optional[str] = None,
+    ) -> list[tuple[str, int, str, Optional[str]]]:
+        """(student, test_num, tier, error_type) rows matching every given filter."""
+        sql = ("SELECT s.name, r.test_num, r.tier, r.error_type FROM results r"
+               " JOIN students s ON s.id = r.student_id WHERE s.run_id = ?")
+        args: list = [run_id]
+        for column, value in (("s.name", student), ("r.test_num", test_num),
+                              ("r.tier", tier), ("r.error_type", error_type)):
+            if value is not None:
+                sql += f" AND {column} = ?"
+                args.append(value)
+        with self._lock:
+            return self._conn.execute(sql + " ORDER BY s.id, r.test_num", args).fetchall()
+
+    # ------------------------------------------------------------------
+    # Blobs
+    # ------------------------------------------------------------------
+
+    def read(self, ref: BlobRef):
+        """BlobRef protocol: ref.offset is the blob's row id."""
+        data = self.stored(ref)
+        return decode_blob(ref.flags, data)
+
+    def stored(self, ref: BlobRef) -> bytes:
+        with self._lock:
+            ref.flags, ref.digest, data = self._conn.execute(
+                "SELECT flags, digest, data FROM blobs WHERE id = ?", (ref.offset,)
+            ).fetchone()
+        return data
+
+    def _ref(self, blob_id: Optional[int]) -> Optional[BlobRef]:
+        # flags / digest are fetched with the data on first read
+        return BlobRef(self, blob_id, 0, -1, b"") if blob_id else None
+
+    def _load(self, blob_id: Optional[int]):
+        ref = self._ref(blob_id)
+        return ref.load() if ref else None
+
+    def _load_files(self, files_json: str, lazy: bool) -> dict:
+        files = {}
+        for name, blob_id in json.loads(files_json).items():
+            if blob_id is None:
+                files[name] = None
+            elif blob_id == 0:
+                files[name] = ""
+            else:
+                files[name] = self._ref(blob_id) if lazy else self._load(blob_id)
+        return files
+
+
+# ---------------------------------------------------------------------------
+# Session files
+# ---------------------------------------------------------------------------
+
+def save_session(path: str, config: dict, results: list[StudentResult],
+                 label: str = "") -> None:
+    """Write one run, with its outputs, to a standalone session file.
+
+    Written beside path first and moved into place, so an existing session
+    is replaced whole or not at all.
+    """
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    store = RunStore(tmp)
+    try:
+        store.save_run(config, results, label=label)
+        with store._lock:
+            store._conn.execute("VACUUM")
+    finally:
+        store.close()
+    os.replace(tmp, path)
+
+
+def open_session(path: str) -> tuple[RunStore, int, list[StudentResult]]:
+    """(store, run id, lazily loaded results) for a session file.
+
+    The store must stay open while the results are in use.
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"No session file at {path}")
+    store = RunStore(path)
+    runs = store.runs()
+    if not runs:
+        store.close()
+        raise ValueError(f"{os.path.basename(path)} holds no grading run")
+    run_id = runs[0].id
+    return store, run_id, store.load_run(run_id, lazy=True)
+
+
+class LazyTests(Sequence):
+    """A student's TestResults, read from the store on first use.
+
+    len() is known up front, so counting never touches the database.
+    """
+    __slots__ = ("_load", "_len", "_items")
+
+    def __init__(self, load: Callable[[], list[TestResult]], count: int):
+        self._load = load
+        self._len = count
+        self._items: Optional[list[TestResult]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._items is not None
+
+    def load(self) -> list[TestResult]:
+        if self._items is None:
+            self._items = self._load()
+            self._len = len(self._items)
+        return self._items
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index):
+        return self.load()[index]
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Sequence) and list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return repr(self._items) if self.loaded else f"<{self._len} tests, not loaded>"
+
+
+class _Once:
+    """Call fn on first use only and keep its result."""
+    __slots__ = ("_fn", "_value", "_lock")
+
+    def __init__(self, fn):
+        self._fn = fn
+        self._value = None
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            if self._fn is not None:
+                self._value, self._fn = self._fn(), None
+        return self._value
@@ -0,0 +1,217 @@
+"""Span instrumentation for the grading hot path.
+
+The runner and comparator wrap each stage in a span:
+
+    with trace.span("execute", student=name, test=i + 1):
+        ...
+
+Spans cost two global lookups while tracing is off. While a Tracer is
+installed, each span records its wall time, thread and tags, and the run can
+be exported as a Chrome trace (open in chrome://tracing or ui.perfetto.dev)
+and summarised as a per-stage latency histogram.
+
+    tracer = trace.start()
+    ...grade...
+    trace.stop()
+    tracer.write_chrome_trace("run.json")
+    print(tracer.format_histogram())
+
+Listeners added with add_listener(fn) are called as fn(name, duration_ns,
+tags) at the end of every span, tracer or not; the metrics endpoint
+(engine/exporter.py) uses one to keep per-stage latency histograms.
+
+Stages recorded:
+    copy                  copying a submission into its sandbox
+    reset                 cleaning generated files and restoring data files
+    execute               one program run, including interpreter startup
+    interpreter_startup   `python -c pass`, timed once per batch as a baseline
+    read_files            collecting output files after a run
+    classify              one student's classification
+    compare               one test's comparison cascade
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+_tracer: Optional["Tracer"] = None
+_listeners: tuple[Callable[[str, int, dict], None], ...] = ()
+
+
+def span(name: str, **tags):
+    """Context manager timing one stage; a shared no-op while nothing listens.
+
+    A span left by an exception is not recorded: the stage did not finish.
+    """
+    tracer = _tracer
+    if tracer is None and not _listeners:
+        return _NULL_SPAN
+    return _Span(tracer, name, tags)
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def start() -> "Tracer":
+    """Install a fresh Tracer for the whole process and return it."""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop() -> Optional["Tracer"]:
+    """Uninstall the current Tracer (spans still open are dropped)."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def add_listener(fn: Callable[[str, int, dict], None]):
+    global _listeners
+    _listeners = _listeners + (fn,)
+
+
+def remove_listener(fn: Callable[[str, int, dict], None]):
+    global _listeners
+    _listeners = tuple(f for f in _listeners if f != fn)
+
+
+class _Span:
+    __slots__ = ("_tracer", "_name", "_tags", "_start")
+
+    def __init__(self, tracer: Optional["Tracer"], name: str, tags: dict):
+        self._tracer = tracer
+        self._name = name
+        self._tags = tags
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            return False
+        end = time.perf_counter_ns()
+        tracer = self._tracer
+        if tracer is not None:
+            ident = threading.get_ident()
+            if ident not in tracer.thread_names:
+                tracer.thread_names[ident] = threading.current_thread().name
+            # list.append is atomic, so worker threads need no lock here
+            tracer.events.append((self._name, self._start, end - self._start, ident, self._tags))
+        for fn in _listeners:
+            fn(self._name, end - self._start, self._tags)
+        return False
+
+
+class Tracer:
+    """Collected spans: (name, start_ns, duration_ns, thread id, tags)."""
+
+    def __init__(self):
+        self.events: list[tuple[str, int, int, int, dict]] = []
+        self.origin = time.perf_counter_ns()
+        self.thread_names: dict[int, str] = {}      # thread id -> name, i.e. the worker
+
+    def chrome_trace(self) -> dict:
+        """The spans in Chrome's Trace Event format, one track per thread."""
+        pid = os.getpid()
+        tids: dict[int, int] = {}
+        events = []
+        for name, start, dur, ident, tags in self.events:
+            tid = tids.setdefault(ident, len(tids) + 1)
+            events.append({
+                "name": name, "ph": "X", "pid": pid, "tid": tid,
+                "ts": (start - self.origin) / 1000, "dur": dur / 1000,
+                "args": dict(tags, worker=self.thread_names.get(ident, "")),
+            })
+        for ident, tid in tids.items():
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                "args": {"name": self.thread_names.get(ident, f"thread-{tid}")},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def histograms(self) -> dict[str, "Histogram"]:
+        """Per-stage latency histograms, in order of first appearance."""
+        out: dict[str, Histogram] = {}
+        for name, _, dur, _, _ in self.events:
+            hist = out.get(name)
+            if hist is None:
+                hist = out[name] = Histogram()
+            hist.add(dur)
+        return out
+
+    def format_histogram(self) -> str:
+        """Text summary: one row per stage, then its log2 latency buckets."""
+        lines = [f"{'stage':20s} {'count':>7s} {'total':>9s} {'p50':>9s} "
+                 f"{'p90':>9s} {'p99':>9s} {'max':>9s}"]
+        for name, hist in self.histograms().items():
+            lines.append(
+                f"{name:20s} {hist.count:7d} {_ms(hist.total)} {_ms(hist.percentile(50))} "
+                f"{_ms(hist.percentile(90))} {_ms(hist.percentile(99))} {_ms(hist.max)}")
+            peak = max(hist.buckets.values())
+            for bucket, n in sorted(hist.buckets.items()):
+                bar = "█" * max(1, round(30 * n / peak))
+                lines.append(f"    ≤{_ms(2 ** bucket).strip():>9s} {n:7d} {bar}")
+        return "\n".join(lines)
+
+
+class Histogram:
+    """Latencies in nanoseconds, bucketed by power of two.
+
+    Exact values are kept too (one int per span), so percentiles are exact.
+    """
+
+    def __init__(self):
+        self.values: list[int] = []
+        self.buckets: dict[int, int] = {}
+
+    def add(self, ns: int):
+        self.values.append(ns)
+        bucket = max(0, math.ceil(math.log2(ns))) if ns > 0 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    @property
+    def count(self) -> int:
+        return len(self.values)
+
+    @property
+    def total(self) -> int:
+        return sum(self.values)
+
+    @property
+    def max(self) -> int:
+        return max(self.values, default=0)
+
+    def percentile(self, p: float) -> int:
+        if not self.values:
+            return 0
+        ordered = sorted(self.values)
+        return ordered[min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _ms(ns: int) -> str:
+    return f"{ns / 1e6:7.2f}ms"
@@ -0,0 +1,420 @@
+"""Watch mode: grade submissions as they arrive in the assignment folder.
+
+SubmissionWatcher hands over every submission present when it starts, then
+each one that is added or changed once it has stopped changing for settle_s
+seconds, so a folder still being uploaded or unzipped is not graded
+half-written. On Linux it sleeps on inotify and re-examines only what the
+events touched; elsewhere, or when inotify is unavailable, it polls every
+submission every poll_s. The list of submissions is asked for again only
+when something appears, disappears or changes at the top level of the
+assignment folder outside the known submissions.
+
+WatchGrader runs the base solution once, keeps its output and the per-test
+bases warm, and grades every ready submission on a long-lived thread pool:
+
+    grader = WatchGrader(runner, base_path, assignment_path, "folder",
+                         test_cases, on_result=show)
+    grader.start()          # grades what is there now, then keeps watching
+    ...
+    grader.stop()
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from engine.categorizer import build_test_bases, process_student
+from engine.comparator import DEFAULT_MATCHER, ProfileMatcher
+from engine.metrics import RunMetrics
+from engine.models import StudentResult
+from engine.runner import ScriptRunner
+
+
+# A submission's state: (file name, size, mtime_ns) of every file it holds
+Signature = tuple
+
+
+class SubmissionWatcher:
+    """Reports new or changed submissions once they have settled."""
+
+    def __init__(
+        self,
+        assignment_path: str,
+        find_submissions: Callable[[], list[str]],
+        on_ready: Callable[[list[str]], None],
+        settle_s: float = 2.0,
+        poll_s: float = 1.0,
+        use_inotify: bool = True,
+    ):
+        self.assignment_path = assignment_path
+        self._find = find_submissions
+        self._on_ready = on_ready
+        self.settle_s = settle_s
+        self.poll_s = poll_s
+        self._seen: dict[str, Signature] = {}                  # last handed over
+        self._pending: dict[str, tuple[Signature, float]] = {}  # changed, settling
+        self._submissions: Optional[set[str]] = None           # last find_submissions()
+        self._top: dict[str, tuple] = {}        # top-level listing, when polling
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify = _Inotify.create() if use_inotify else None
+
+    @property
+    def using_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="watch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Ask the watch thread to finish (within poll_s); does not wait."""
+        self._stop.set()
+        if self._thread is None and self._inotify is not None:
+            self._inotify.close()
+
+    def scan(self, paths: Optional[set[str]] = None, initial: bool = False):
+        """Check paths (or every submission) and hand over those now settled.
+
+        With initial, everything found is handed over at once: it was there
+        before watching began.
+        """
+        now = time.monotonic()
+        if paths is None:
+            current = self._poll_submissions()
+            for gone in set(self._seen) - current:
+                del self._seen[gone]
+            for gone in set(self._pending) - current:
+                del self._pending[gone]
+            paths = current
+        paths = paths | set(self._pending)
+
+        ready = []
+        for path in sorted(paths):
+            sig = _signature(path)
+            if sig is None or sig == self._seen.get(path):
+                self._pending.pop(path, None)
+                continue
+            settling = self._pending.get(path)
+            if initial:
+                self._seen[path] = sig
+                ready.append(path)
+            elif settling is None or settling[0] != sig:
+                self._pending[path] = (sig, now)
+            elif now - settling[1] >= self.settle_s:
+                del self._pending[path]
+                self._seen[path] = sig
+                ready.append(path)
+        if ready:
+            self._on_ready(ready)
+
+    def _loop(self):
+        try:
+            self._watch()
+        finally:
+            if self._inotify is not None:
+                self._inotify.close()
+
+    def _watch(self):
+        inotify = self._inotify
+        if inotify is not None:
+            inotify.watch_tree(self.assignment_path)
+        self.scan(initial=True)
+        while not self._stop.is_set():
+            if inotify is None:
+                self._stop.wait(self.poll_s)
+                self.scan()
+                continue
+            # While something is settling, wake up in time to hand it over
+            timeout = min(self.poll_s, self.settle_s) if self._pending else self.poll_s
+            touched = inotify.read(timeout)
+            if touched is None:                     # queue overflowed: rescan all
+                inotify.watch_tree(self.assignment_path)
+                self.scan()
+            elif touched or self._pending:
+                for path in touched:
+                    if os.path.isdir(path):
+                        inotify.watch(path)
+                self.scan(self._submissions_for(touched))
+
+    def _submissions_for(self, touched: set[str]) -> set[str]:
+        """Map touched paths to the submissions they belong to."""
+        root = os.path.normpath(self.assignment_path)
+        tops = set()
+        for path in touched:
+            path = os.path.normpath(path)
+            while os.path.dirname(path) != root and os.path.dirname(path) != path:
+                path = os.path.dirname(path)
+            tops.add(path)
+        known = self._known()
+        # A top-level entry created, removed, or not (yet) a submission
+        if any(top not in known or not os.path.exists(top) for top in tops):
+            known = self._known(rescan=True)
+        return tops & known
+
+    def _known(self, rescan: bool = False) -> set[str]:
+        """The submissions last found; asks find_submissions() if rescan."""
+        if rescan or self._submissions is None:
+            self._submissions = set(self._find())
+        return self._submissions
+
+    def _poll_submissions(self) -> set[str]:
+        """Every submission, found again only if the top level changed.
+
+        One listing of the assignment folder shows entries created or
+        removed; folders that are not submissions (yet) are listed too, to
+        see files arriving that may make them one.
+        """
+        try:
+            with os.scandir(self.assignment_path) as it:
+                entries = [(os.path.normpath(e.path), e.is_dir()) for e in it]
+        except OSError:
+            return self._known(rescan=True)
+
+        def listing(known: set[str]) -> dict[str, tuple]:
+            top: dict[str, tuple] = {}
+            for path, is_dir in entries:
+                top[path] = ()
+                if is_dir and path not in known:
+                    try:
+                        top[path] = tuple(sorted(os.listdir(path)))
+                    except OSError:
+                        pass
+            return top
+
+        if self._submissions is not None:
+            top = listing(self._submissions)
+            if top == self._top:
+                return self._submissions
+        known = self._known(rescan=True)
+        self._top = listing(known)
+        return known
+
+
+def _signature(path: str) -> Optional[Signature]:
+    """What the runner would copy for a submission, by name, size and mtime."""
+    try:
+        if os.path.isfile(path):
+            st = os.stat(path)
+            return ((os.path.basename(path), st.st_size, st.st_mtime_ns),)
+        entries = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_file():
+                    st = entry.stat()
+                    entries.append((entry.name, st.st_size, st.st_mtime_ns))
+        return tuple(sorted(entries))
+    except OSError:
+        return None
+
+
+class _Inotify:
+    """Minimal Linux inotify binding: which paths changed, with a timeout."""
+
+    _MASK = (0x002 | 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200)
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    # | IN_CREATE | IN_DELETE
+    _Q_OVERFLOW = 0x4000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, libc, fd: int):
+        self._libc = libc
+        self._fd = fd
+        self._dirs: dict[int, str] = {}         # watch descriptor -> directory
+
+    @classmethod
+    def create(cls) -> Optional["_Inotify"]:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        return cls(libc, fd) if fd >= 0 else None
+
+    def watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self._MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+    def watch_tree(self, root: str):
+        """Watch root and the submission folders directly inside it."""
+        self.watch(root)
+        try:
+            with os.scandir(root) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        self.watch(entry.path)
+        except OSError:
+            pass
+
+    def read(self, timeout: float) -> Optional[set[str]]:
+        """Paths touched within timeout; None if events were lost."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        touched: set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return touched
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & self._Q_OVERFLOW:
+                    return None
+                directory = self._dirs.get(wd)
+                if directory is not None:
+                    touched.add(os.path.join(directory, os.fsdecode(name))
+                                if name else directory)
+
+    def close(self):
+        os.close(self._fd)
+
+
+class WatchGrader:
+    """Grades submissions as a SubmissionWatcher hands them over."""
+
+    def __init__(
+        self,
+        runner: ScriptRunner,
+        base_path: str,
+        assignment_path: str,
+        mode: str,
+        test_cases: list[dict],
+        on_result: Callable[[StudentResult], None],
+        check_stdout: bool = True,
+        matcher: Optional[ProfileMatcher] = None,
+        max_workers: int = 4,
+        metrics: Optional[RunMetrics] = None,
+        settle_s: float = 2.0,
+        poll_s: float = 1.0,
+        use_inotify: bool = True,
+    ):
+        self.runner = runner
+        self.base_path = base_path
+        self.assignment_path = assignment_path
+        self.mode = mode
+        self.test_cases = test_cases
+        self.check_stdout = check_stdout
+        self.matcher = matcher or DEFAULT_MATCHER
+        self.max_workers = max_workers
+        self.metrics = metrics
+        self._on_result = on_result
+        self._lock = threading.Lock()
+        self._queued: set[str] = set()          # waiting for a worker
+        self._running: set[str] = set()
+        self._again: set[str] = set()           # changed while being graded
+        self._stopped = False
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.watcher = SubmissionWatcher(
+            assignment_path,
+            lambda: runner.find_student_submissions(assignment_path, mode),
+            self._enqueue, settle_s=settle_s, poll_s=poll_s, use_inotify=use_inotify)
+
+    def start(self) -> bool:
+        """Run the base solution and start watching; False if the base fails."""
+        self.base_raws = self.runner.run_base_solution(
+            self.base_path, self.test_cases, self.mode, self.assignment_path)
+        if all(r.get("error") and r.get("returncode", 0) != 0 for r in self.base_raws):
+            return False
+        self.bases = build_test_bases(self.base_raws, self.test_cases, self.matcher)
+        if self.metrics is not None:
+            self.metrics.reset(0, len(self.test_cases), self.max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix="watch-grade")
+        self.watcher.start()
+        return True
+
+    def stop(self):
+        """Stop watching and drop queued submissions; does not wait for
+        the ones being graded, whose results are discarded."""
+        with self._lock:
+            self._stopped = True
+            self._queued.clear()
+            self._again.clear()
+        self.watcher.stop()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+    def pending(self) -> int:
+        """Submissions queued or being graded."""
+        with self._lock:
+            return len(self._queued) + len(self._running)
+
+    def _enqueue(self, paths: list[str]):
+        with self._lock:
+            if self._stopped:
+                return
+            for path in paths:
+                if path in self._running:
+                    self._again.add(path)
+                elif path not in self._queued:
+                    self._queued.add(path)
+                    self._submit(path)
+
+    def _submit(self, path: str):
+        """Queue path on the pool (lock held)."""
+        if self.metrics is not None:
+            self.metrics.add_students(1)
+        self._pool.submit(self._grade, path)
+
+    def _grade(self, path: str):
+        with self._lock:
+            if self._stopped:
+                return
+            self._queued.discard(path)
+            self._running.add(path)
+        try:
+            try:
+                result = self._run_and_classify(path)
+            except Exception as exc:
+                # As in run_batch: a row with the error, not a lost submission
+                raws = [self.runner._error_result(i + 1, tc["input"], str(exc),
+                                                  "InternalError")
+                        for i, tc in enumerate(self.test_cases)]
+                result = self._classify(path, raws)
+            if not self._stopped:
+                self._on_result(result)
+        finally:
+            with self._lock:
+                self._running.discard(path)
+                if path in self._again and not self._stopped:
+                    self._again.discard(path)
+                    self._queued.add(path)
+                    self._submit(path)
+
+    def _run_and_classify(self, path: str) -> StudentResult:
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.student_started()
+        try:
+            # What changed may be any file in it, so list it again rather than
+            # grade it from the manifest of an earlier scan
+            manifest = self.runner.rediscover(path, self.mode)
+            raws = self.runner.run_student(path, self.test_cases, self.mode,
+                                           self.assignment_path, metrics=metrics,
+                                           manifest=manifest)
+        finally:
+            if metrics is not None:
+                metrics.student_finished()
+        return self._classify(path, raws)
+
+    def _classify(self, path: str, raws: list[dict]) -> StudentResult:
+        return process_student(
+            os.path.basename(path), path, self.base_raws, raws, self.test_cases,
+            check_stdout=self.check_stdout, matcher=self.matcher, bases=self.bases)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for grading from LMS zip exports (engine/archive.py)
+"""
+
+import os
+import tempfile
+import zipfile
+
+from engine.archive import SubmissionArchive
+from engine.runner import ScriptRunner
+
+
+_MAIN = """\
+import helper
+names = open("contacts.csv").read().split()
+print(helper.greet(input()), len(names))
+"""
+
+
+def test_canvas_export_is_indexed_per_student():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "submissions.zip")
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("smithjane_12_345_ica5.py", "print(1)")
+            zf.writestr("smithjane_12_345_helper-1.py", "x = 1")
+            zf.writestr("doejohn_LATE_13_346_ica5.py", "print(2)")
+            zf.writestr("doejohn_LATE_13_346_helper.py", "x = 2")
+            zf.writestr("__MACOSX/._smithjane_12_345_ica5.py", "junk")
+            zf.writestr("README.txt", "not a submission")
+        archive = SubmissionArchive(path)
+        assert {s: sorted(f) for s, f in archive.students.items()} == {
+            "smithjane": ["helper.py", "ica5.py"], "doejohn": ["helper.py", "ica5.py"]}
+        assert archive.submission_paths() == [os.path.join(path, "doejohn"),
+                                              os.path.join(path, "smithjane")]
+
+
+
+def test_canvas_names_ending_in_a_number_are_kept():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "submissions.zip")
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("smithjane_12_345_part-2.py", "print(1)")
+            zf.writestr("smithjane_12_345_data-2023.csv", "a,b")
+            zf.writestr("smithjane_12_345_q.py", "print('q')")
+            zf.writestr("smithjane_12_345_q-1.py", "print('q again')")
+        files = SubmissionArchive(path).files("smithjane")
+        assert sorted(files) == ["data-2023.csv", "part-2.py", "q.py"]
+        assert files["q.py"].filename == "smithjane_12_345_q-1.py"
+
+def test_zip_grades_like_the_extracted_folder():
+    with tempfile.TemporaryDirectory() as root:
+        with open(os.path.join(root, "contacts.csv"), "w") as f:
+            f.write("Ann\nBob\n")
+        path = os.path.join(root, "ica5.zip")
+        with zipfile.ZipFile(path, "w") as zf:
+            for student, greeting in (("alice", "Hi"), ("bob", "Hello")):
+                zf.writestr(f"submissions/{student}/ica5.py", _MAIN)
+                zf.writestr(f"submissions/{student}/helper.py",
+                            f"def greet(n):\n    return '{greeting} ' + n\n")
+                zf.writestr(f"submissions/{student}/.DS_Store", "junk")
+            zf.writestr("submissions/carol/notes.txt", "no code")
+            zf.extractall(os.path.join(root, "extracted"))
+        extracted = os.path.join(root, "extracted", "submissions")
+        with open(os.path.join(extracted, "contacts.csv"), "w") as f:
+            f.write("Ann\nBob\n")
+
+        runner = ScriptRunner(timeout=10)
+        tcs = [{"input": ["Zed"]}]
+        paths = runner.find_student_submissions(path, "folder")
+        assert [os.path.basename(p) for p in paths] == ["alice", "bob"]
+        from_zip = runner.run_batch(paths, tcs, "folder", path)
+        from_dir = runner.run_batch(runner.find_student_submissions(extracted, "folder"),
+                                    tcs, "folder", extracted)
+        assert from_zip["alice"][0]["stdout"] == "Hi Zed 2\n"
+        for name in ("alice", "bob"):
+            assert [r["stdout"] for r in from_zip[name]] == \
+                   [r["stdout"] for r in from_dir[name]]
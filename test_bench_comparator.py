@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Tests for the comparator micro-benchmarks (benchmarks/bench_comparator.py)
+"""
+
+from benchmarks.bench_comparator import _calibration, cases, measure, regressions
+
+
+def test_comparator_cases_run_and_gate_flags_only_regressions():
+    for name, fn in cases().items():
+        fn()
+    baseline = {"benchmarks": {"a": {"relative": 1.0}, "b": {"relative": 1.0}}}
+    current = {"benchmarks": {"a": {"relative": 1.2}, "b": {"relative": 1.4},
+                              "new": {"relative": 9.0}}}
+    assert regressions(baseline, current, 0.3) == ["b"]
+
+
+def test_times_are_relative_to_the_calibration_next_to_them():
+    seconds, calibration, relative = measure(_calibration, rounds=3)
+    assert seconds > 0 and calibration > 0
+    assert 0.5 < relative < 2.0
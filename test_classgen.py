@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic class generator and throughput benchmark (benchmarks/)
+"""
+
+import os
+import tempfile
+
+import pytest
+
+from benchmarks.bench_throughput import run_benchmark
+from benchmarks.classgen import KINDS, generate_class, parse_mix
+
+
+def test_mix_is_split_exactly_and_every_kind_runs():
+    with tempfile.TemporaryDirectory() as root:
+        cls = generate_class(root, 10, 4, parse_mix("perfect=5,crash=3,cosmetic=2"))
+        counts = {k: list(cls.kinds.values()).count(k) for k in set(cls.kinds.values())}
+        assert counts == {"perfect": 5, "crash": 3, "cosmetic": 2}
+        assert sorted(os.listdir(cls.assignment_path)) == ["contacts.csv"] + sorted(cls.kinds)
+        assert [tc.get("expected_filename") for tc in cls.test_cases] == \
+               [None, None, "out.csv", None]
+        assert all(tc["input"][-1] == "q" for tc in cls.test_cases)
+
+    with pytest.raises(ValueError):
+        parse_mix("perfect=1,flaky=1")
+
+
+def test_benchmark_reports_throughput_latency_and_outcomes():
+    mix = {kind: 1 for kind in KINDS if kind != "timeout"}
+    result = run_benchmark(n_students=len(mix), n_tests=2, workers=2, mix=mix)
+    assert result["students_per_s"] > 0
+    assert 0 < result["test_p50_ms"] <= result["test_p99_ms"]
+    assert sum(result["categories"].values()) == len(mix)
+    assert result["categories"]["crash"] == 1
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the comparison engine (engine/comparator.py)
+"""
+
+import sys
+
+from benchmarks.corpus import SAMPLE_LINES, contact_manager_output, random_lines
+from benchmarks.reference import ReferenceSemanticExtractor
+from engine.comparator import SemanticExtractor
+
+
+def test_extractor_matches_reference_on_samples():
+    """Every sample line classifies exactly as the rule-by-rule reference"""
+    fast, ref = SemanticExtractor(), ReferenceSemanticExtractor()
+    for line in SAMPLE_LINES:
+        assert fast.extract(line, []) == ref.extract(line, []), line
+
+
+def test_extractor_matches_reference_on_program_output():
+    """Token-identical output on a long realistic stdout, with input echoes"""
+    fast, ref = SemanticExtractor(), ReferenceSemanticExtractor()
+    stdout = contact_manager_output(5000, seed=7)
+    inputs = ["d", "Ally Gator", "Goodbye!", "1. Ally Gator"]
+    assert fast.extract(stdout, inputs) == ref.extract(stdout, inputs)
+
+
+def test_extractor_matches_reference_on_fuzz_corpus():
+    """Token-identical output on random lines built from rule-relevant text"""
+    fast, ref = SemanticExtractor(), ReferenceSemanticExtractor()
+    for seed in range(5):
+        stdout = "\n".join(random_lines(2000, seed=seed))
+        assert fast.extract(stdout, []) == ref.extract(stdout, [])
+
+
+def test_status_normalization():
+    """Status lines drop file references, quotes and parentheticals"""
+    tokens = SemanticExtractor().extract(
+        'Ally Gator was removed and the file "contacts.csv" has been updated.\n'
+        'Contact (#3) not found.',
+        [],
+    )
+    assert tokens == [
+        ("status", "ally gator was removed"),
+        ("status", "contact not found"),
+    ]
+
+
+def test_extractor_skips_rules_on_huge_lines():
+    """Lines over MAX_CLASSIFY_LEN are kept verbatim as generic text"""
+    extractor = SemanticExtractor()
+    huge = "Name: " + "x" * extractor.MAX_CLASSIFY_LEN
+    assert extractor.extract(huge + "\nName: Ally", []) == [
+        ("text", huge),
+        ("label", "Name: Ally"),
+    ]
+
+
+def test_unclosed_parentheses_normalize_in_linear_time():
+    """A status line full of unclosed '(' must not rescan to the end per '('"""
+    import time
+    extractor = SemanticExtractor()
+    line = "error (a) " + "(" * 200_000
+    start = time.perf_counter()
+    assert extractor._normalize_status(line) == "error " + "(" * 200_000
+    assert time.perf_counter() - start < 1.0
+    for short in ("x (a) (b", "error (a (b) c) d", "((x)) )(", "a) (b"):
+        assert extractor._normalize_status(short) == \
+            ReferenceSemanticExtractor()._normalize_status(short)
+
+
+def test_numeric_tier_uses_profile_tolerance():
+    """Float formatting differences match NUMERIC within tolerance only"""
+    from engine.comparator import ProfileMatcher, classify_test
+    from engine.models import MatchTier
+    from engine.profile import ComparisonProfile
+
+    base = {"stdout": "Average: 3.3333333\nTotal: 10\n"}
+    student = {"stdout": "Average: 3.33\nTotal:   10.0\n"}
+    loose = ProfileMatcher(ComparisonProfile(abs_tol=0.01))
+    assert classify_test(1, [], base, student, matcher=loose).match_tier == MatchTier.NUMERIC
+    assert classify_test(1, [], base, student).match_tier != MatchTier.NUMERIC
+
+    same_value = {"stdout": "Average: 3.3333333\nTotal: 10.0\n"}
+    assert classify_test(1, [], base, same_value).match_tier == MatchTier.NUMERIC
+
+    worded = {"stdout": "Mean: 3.33\nTotal: 10\n"}
+    assert classify_test(1, [], base, worded, matcher=loose).match_tier != MatchTier.NUMERIC
+
+
+def test_numeric_tokenizer_keeps_glued_digits_as_text():
+    """Numbers are split out in one pass; digits inside words stay text"""
+    from engine.comparator import DEFAULT_MATCHER
+
+    texts, nums = DEFAULT_MATCHER.split_numbers("ICA5 total: -2.5e1, 42.")
+    assert nums == ["-2.5e1", "42"]
+    assert texts == ["ICA5 total: ", ", ", "."]
+
+
+def test_bulk_number_comparison():
+    """Thousands of numbers compare the same on the bulk and scalar paths"""
+    from engine.comparator import _numbers_close
+
+    base = [f"{i / 7:.6f}" for i in range(5000)]
+    student = [f"{i / 7:.2f}" for i in range(5000)]
+    assert _numbers_close(base, student, abs_tol=0.005, rel_tol=0.0)
+    assert not _numbers_close(base, student, abs_tol=0.0, rel_tol=0.0)
+    assert _numbers_close(["inf", "1e999"], ["inf", "inf"], 0.0, 0.0)
+
+
+def test_students_share_base_data_and_identical_outputs():
+    """One TestBase per test for the batch; equal outputs stored once"""
+    from engine.blobs import BlobStore
+    from engine.categorizer import build_test_bases, process_student
+    from engine.models import MatchTier
+
+    tcs = [{"input": ["1"]}, {"input": ["2"]}]
+    base = [{"stdout": "Total: 3\n"}, {"stdout": "Total: 4\n", "files": {"out.txt": "4"}}]
+    student = [{"stdout": "Total: 3\n"}, {"stdout": "Total: 5\n", "files": {"out.txt": "4"}}]
+
+    blobs = BlobStore()
+    bases = build_test_bases(base, tcs)
+    a = process_student("a", "a", base, [dict(r) for r in student], tcs, bases=bases, blobs=blobs)
+    b = process_student("b", "b", base, [dict(r) for r in student], tcs, bases=bases, blobs=blobs)
+
+    assert [t.match_tier for t in a.test_results] == [MatchTier.EXACT, MatchTier.FILE_ONLY]
+    assert a.test_results[0].base is b.test_results[0].base
+    assert a.test_results[0].stdout_blob is b.test_results[0].stdout_blob
+    assert a.test_results[1].student_stdout == "Total: 5\n"
+    assert a.test_results[1].student_files == {"out.txt": "4"}
+    assert len(blobs) == 3       # "Total: 3", "Total: 5", "4"
+    assert not hasattr(a.test_results[0], "__dict__") or sys.version_info < (3, 10)
+
+
+def test_blob_store_round_trips_compressed_values():
+    """Blobs come back exactly, whether or not they were compressed"""
+    from engine.blobs import BlobStore, resolve
+
+    blobs = BlobStore()
+    values = ["short", "menu\n" * 500, "\udcff surrogate" * 20, b"\x00\x01" * 100, "", None]
+    refs = [blobs.put(v) for v in values]
+    assert [resolve(r) for r in refs] == values
+    assert blobs.put("menu\n" * 500) is refs[1]
+    assert blobs.stored_bytes < blobs.raw_bytes
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Tests for the line diff engine (engine/diff.py)
+"""
+
+import random
+
+from engine.comparator import unified_diff_lines
+from engine.diff import diff_opcodes
+
+
+def _check_opcodes(a, b, ops):
+    """Opcodes must cover both sides in order, with 'equal' spans truly equal"""
+    rebuilt_a, rebuilt_b = [], []
+    for tag, i1, i2, j1, j2 in ops:
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+        rebuilt_a += a[i1:i2]
+        rebuilt_b += b[j1:j2]
+    assert rebuilt_a == a and rebuilt_b == b
+
+
+def _lcs_length(a, b):
+    prev = [0] * (len(b) + 1)
+    for x in a:
+        cur = [0]
+        for j, y in enumerate(b):
+            cur.append(prev[j] + 1 if x == y else max(prev[j + 1], cur[j]))
+        prev = cur
+    return prev[-1]
+
+
+def test_opcodes_are_valid_on_random_inputs():
+    """Histogram, Myers and bounded paths all produce consistent opcodes"""
+    rng = random.Random(3)
+    for _ in range(300):
+        alphabet = "abcdefghij"[:rng.randint(1, 10)]
+        a = [rng.choice(alphabet) for _ in range(rng.randint(0, 400))]
+        b = [rng.choice(alphabet) for _ in range(rng.randint(0, 400))]
+        _check_opcodes(a, b, diff_opcodes(a, b))
+        _check_opcodes(a, b, diff_opcodes(a, b, max_lines=10))
+
+
+def test_reordered_repeats_stay_within_the_work_budget():
+    """Blocks of lines on one side, the same lines interleaved on the other"""
+    import time
+
+    n = 40_000
+    kinds = n // 60
+    a = [f"line {i % kinds}" for i in range(n)]
+    b = [f"line {i // 60}" for i in range(n)]
+    started = time.perf_counter()
+    ops = diff_opcodes(a, b)
+    # Quadratic without the budget: about 7 s here; about 0.7 s with it
+    assert time.perf_counter() - started < 3.0
+    _check_opcodes(a, b, ops)
+
+
+def test_small_regions_get_a_minimal_diff():
+    """Small inputs go through Myers, which keeps a longest common subsequence"""
+    rng = random.Random(4)
+    for _ in range(200):
+        a = [rng.choice("abcd") for _ in range(rng.randint(0, 40))]
+        b = [rng.choice("abcd") for _ in range(rng.randint(0, 40))]
+        equal = sum(i2 - i1 for tag, i1, i2, _, _ in diff_opcodes(a, b) if tag == "equal")
+        assert equal == _lcs_length(a, b)
+
+
+def test_unified_diff_lines_layout():
+    """Replaced lines are listed base-first, like the difflib version"""
+    diff = unified_diff_lines("a\nb\nc\nd", "a\nB\nc\nd\ne")
+    assert diff == [
+        ("equal", "a"), ("delete", "b"), ("insert", "B"),
+        ("equal", "c"), ("equal", "d"), ("insert", "e"),
+    ]
+
+
+def test_bounded_diff_survives_insertions():
+    """Past max_lines, an inserted line does not knock everything out of step"""
+    a = [f"line {i}" for i in range(5000)]
+    b = a[:100] + ["inserted"] + a[100:]
+    ops = diff_opcodes(a, b, max_lines=1000)
+    _check_opcodes(a, b, ops)
+    assert sum(i2 - i1 for tag, i1, i2, _, _ in ops if tag == "equal") == 5000
+
+
+def test_diff_cache_memoizes_by_content():
+    """Equal texts share one cached diff, computed on the background worker"""
+    from ui.diff_cache import DiffCache
+
+    cache = DiffCache()
+    first = cache.request("a\nb", "a\nc").result(timeout=5)
+    assert first == unified_diff_lines("a\nb", "a\nc")
+    again = cache.request("a" + "\nb", "a\nc")
+    assert again.done() and again.result() is first
+
+    cache.prefetch([("x", "y"), ("x", "y")])
+    assert cache.request("x", "y").result(timeout=5) == [("delete", "x"), ("insert", "y")]
+
+
+def test_diff_cache_produces_prefetch_pairs_on_its_worker():
+    """prefetch_from() calls the pair producer off the calling thread"""
+    import threading
+    from ui.diff_cache import DiffCache
+
+    cache = DiffCache()
+    threads, called = [], threading.Event()
+
+    def pairs():
+        threads.append(threading.current_thread())
+        called.set()
+        return [("p", "q")]
+
+    cache.prefetch_from(pairs)
+    cache.prefetch_from(lambda: 1 / 0)            # a failing producer is skipped
+    assert cache.request("p", "q").result(timeout=5) == [("delete", "p"), ("insert", "q")]
+    assert called.wait(5) and threads[0] is not threading.current_thread()
+
+
+def test_diff_cache_evicts_least_recently_used():
+    """Capacity is counted in diff lines"""
+    from ui.diff_cache import DiffCache
+
+    cache = DiffCache(max_lines=4)
+    cache.request("1\n2", "1\n2").result(timeout=5)
+    cache.request("3\n4", "3\n4").result(timeout=5)
+    cache.request("5\n6", "5\n6").result(timeout=5)
+    assert len(cache._entries) == 2
+    assert cache.request("5\n6", "5\n6").done()
+
+
+def test_diff_layout_windows_match_full_render():
+    """Any window of DiffLayout rows equals the same slice of a full render"""
+    from ui.diff_view import DiffLayout
+
+    diff = unified_diff_lines("a\nb\nc\nd\ne", "a\nx\nc\ne\nf")
+    layout = DiffLayout(diff)
+    assert layout.rows == len(diff)
+    assert layout.hunks == [i for i, (tag, _) in enumerate(diff)
+                            if tag != "equal" and (i == 0 or diff[i - 1][0] == "equal")]
+
+    def rows(args):
+        out = []
+        for text, tag in zip(args[0::2], args[1::2]):
+            out += [(tag, line) for line in text.split("\n")[:-1]]
+        return out
+
+    full_base = rows(layout.base.insert_args(0, layout.rows))
+    full_student = rows(layout.student.insert_args(0, layout.rows))
+    assert len(full_base) == len(full_student) == layout.rows
+    for tag, line in diff:
+        if tag in ("delete", "replace"):
+            assert ("delete", line) in full_base
+        if tag in ("insert", "replace"):
+            assert ("insert", line) in full_student
+    for start in range(layout.rows + 1):
+        for end in range(start, layout.rows + 1):
+            assert rows(layout.base.insert_args(start, end)) == full_base[start:end]
+            assert rows(layout.student.insert_args(start, end)) == full_student[start:end]
+
+
+def test_failed_diff_renders_as_a_note():
+    """A diff whose computation raised is shown as a note, not left pending"""
+    from concurrent.futures import Future
+    from ui.detail_panel import _diff_or_note
+
+    failed = Future()
+    failed.set_exception(MemoryError("too big"))
+    assert _diff_or_note(failed) == [("equal", "(diff unavailable: too big)")]
+    done = Future()
+    done.set_result([("insert", "x")])
+    assert _diff_or_note(done) == [("insert", "x")]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for submission discovery (engine/discovery.py)
+"""
+
+import os
+import tempfile
+
+from engine import discovery
+from engine.runner import ScriptRunner
+from engine.staging import StagingCache
+
+
+def _write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _class(root):
+    for name in ("alice", "bob"):
+        os.makedirs(os.path.join(root, name))
+        _write(os.path.join(root, name, "helper.py"), "X = 1\n")
+        _write(os.path.join(root, name, f"{name}_ica5.py"), f"print('{name}')\n")
+    _write(os.path.join(root, "alice", "notes.txt"), "draft")
+    _write(os.path.join(root, "alice", ".DS_Store"), "")
+    os.makedirs(os.path.join(root, "carol"))                # nothing to grade
+    _write(os.path.join(root, "carol", "readme.md"), "")
+    os.makedirs(os.path.join(root, "__pycache__"))
+    _write(os.path.join(root, "__pycache__", "x.py"), "")
+
+
+def test_folder_scan_builds_one_manifest_per_submission():
+    with tempfile.TemporaryDirectory() as root:
+        _class(root)
+        runner = ScriptRunner()
+        found = runner.discover(root, "folder")
+        assert [os.path.basename(m.path) for m in found] == ["alice", "bob"]
+        alice, bob = found
+        assert alice.main_script == os.path.join(root, "alice", "alice_ica5.py")
+        assert sorted(alice.files) == ["alice_ica5.py", "helper.py", "notes.txt"]
+        assert alice.data_files == ["notes.txt"]
+        assert alice.files["notes.txt"].size == 5
+        assert alice.files["helper.py"].digest == bob.files["helper.py"].digest
+        assert alice.digest != bob.digest
+        assert runner.find_student_submissions(root, "folder") == [alice.path, bob.path]
+        assert runner.manifest(bob.path) == bob
+
+
+def test_file_mode_manifests_share_the_folder_listing():
+    with tempfile.TemporaryDirectory() as root:
+        _write(os.path.join(root, "alice.py"), "print(1)\n")
+        _write(os.path.join(root, "bob.py"), "print(2)\n")
+        _write(os.path.join(root, "contacts.csv"), "")
+        found = ScriptRunner().discover(root, "file")
+        assert [m.main_script for m in found] == [os.path.join(root, "alice.py"),
+                                                  os.path.join(root, "bob.py")]
+        assert sorted(found[0].files) == ["alice.py", "bob.py", "contacts.csv"]
+
+
+def test_rescan_hashes_only_changed_files(monkeypatch):
+    hashed = []
+    real = discovery._digest
+    monkeypatch.setattr(discovery, "_digest", lambda p: hashed.append(p) or real(p))
+    with tempfile.TemporaryDirectory() as root:
+        _class(root)
+        runner = ScriptRunner()
+        runner.discover(root, "folder")
+        assert len(hashed) == 5
+        hashed.clear()
+        runner.discover(root, "folder")
+        assert hashed == []
+        _write(os.path.join(root, "bob", "bob_ica5.py"), "print('bob!')\n")
+        runner.discover(root, "folder")
+        assert hashed == [os.path.join(root, "bob", "bob_ica5.py")]
+
+        # A scanner shared by the runners of later runs keeps the hashes
+        hashed.clear()
+        scanner = discovery.SubmissionScanner()
+        ScriptRunner(scanner=scanner).discover(root, "folder")
+        assert len(hashed) == 5
+        ScriptRunner(scanner=scanner).discover(root, "folder")
+        assert len(hashed) == 5
+
+
+def test_batch_runs_from_manifests_and_skips_unchanged_content_when_staging():
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+        _class(root)
+        runner = ScriptRunner(timeout=10, staging=StagingCache(cache))
+        paths = runner.find_student_submissions(root, "folder")
+        got = runner.run_batch(paths, [{"input": []}], "folder", root)
+        assert {n: r[0]["stdout"] for n, r in got.items()} == {"alice": "alice\n",
+                                                               "bob": "bob\n"}
+        assert runner.staging.copied == 5
+
+        # Downloaded again: new mtimes, same content
+        for m in runner.discover(root, "folder"):
+            for name in m.files:
+                path = os.path.join(m.path, name)
+                os.utime(path, ns=(m.files[name].mtime_ns + 10**9,) * 2)
+        paths = runner.find_student_submissions(root, "folder")
+        got = runner.run_batch(paths, [{"input": []}], "folder", root)
+        assert got["bob"][0]["stdout"] == "bob\n"
+        assert runner.staging.copied == 5
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus metrics endpoint (engine/exporter.py)
+"""
+
+import os
+import tempfile
+import urllib.request
+
+from engine import trace
+from engine.blobs import BlobStore
+from engine.exporter import MetricsExporter
+from engine.metrics import RunMetrics
+from engine.runner import ScriptRunner
+
+
+_SCRIPT = """\
+cmd = input()
+if cmd == "crash":
+    print(undefined)
+while cmd == "hang":
+    pass
+print(cmd)
+"""
+
+
+def test_scrape_after_a_batch():
+    with tempfile.TemporaryDirectory() as root:
+        sub = os.path.join(root, "alice")
+        os.makedirs(sub)
+        with open(os.path.join(sub, "main.py"), "w") as f:
+            f.write(_SCRIPT)
+        tcs = [{"input": ["hi"]}, {"input": ["crash"]}, {"input": ["hang"]}]
+
+        metrics = RunMetrics()
+        blobs = BlobStore()
+        for text in ("a", "b", "a", "a"):
+            blobs.put(text * 100)
+        exporter = MetricsExporter(metrics)
+        exporter.add_cache("blobs", lambda: (blobs.hits, len(blobs)), per_run=True)
+        exporter.add_cache("staging", lambda: (5, 1))
+        try:
+            port = exporter.serve(0)
+            ScriptRunner(timeout=1).run_batch([sub], tcs, "folder", root, metrics=metrics)
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as resp:
+                assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                lines = resp.read().decode().splitlines()
+        finally:
+            exporter.close()
+
+    assert "autograder_tests_executed_total 3" in lines
+    assert "autograder_test_timeouts_total 1" in lines
+    assert 'autograder_test_errors_total{type="NameError"} 1' in lines
+    assert 'autograder_test_errors_total{type="Timeout"} 1' in lines
+    assert 'autograder_stage_seconds_count{stage="execute"} 3' in lines
+    assert 'autograder_stage_seconds_bucket{stage="execute",le="+Inf"} 3' in lines
+    assert "autograder_queue_depth 0" in lines
+    # Per-run caches restart at zero, so they are gauges, not counters
+    assert 'autograder_run_cache_hits{cache="blobs"} 2' in lines
+    assert 'autograder_run_cache_misses{cache="blobs"} 2' in lines
+    assert "# TYPE autograder_run_cache_hits gauge" in lines
+    assert not any(line.startswith("autograder_cache_") and "blobs" in line for line in lines)
+    assert 'autograder_cache_hits_total{cache="staging"} 5' in lines
+    # Closing the exporter stops it observing spans
+    assert not trace._listeners
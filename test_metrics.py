@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for live run metrics (engine/metrics.py)
+"""
+
+import os
+import tempfile
+import time
+
+from engine import metrics as metrics_mod
+from engine.metrics import RunMetrics
+from engine.runner import ScriptRunner
+
+
+def test_counts_rates_and_eta():
+    m = RunMetrics()
+    m.reset(students=10, tests=2, workers=4)
+    snap = m.snapshot()
+    assert (snap.busy, snap.idle, snap.queued, snap.eta_s) == (0, 4, 10, None)
+
+    for _ in range(4):
+        m.student_started()
+    m.test_finished()
+    m.test_finished("Timeout")
+    time.sleep(0.05)
+    snap = m.snapshot()
+    assert (snap.busy, snap.idle, snap.queued, snap.timeouts) == (4, 0, 6, 1)
+    assert snap.tests_per_s > 0 and snap.students_per_s == 0
+    assert snap.eta_s is not None      # from the test rate until a student finishes
+
+    m.student_finished()
+    snap = m.snapshot()
+    assert (snap.students_done, snap.busy, snap.idle) == (1, 3, 1)
+    assert snap.students_per_s > 0
+    assert abs(snap.eta_s - 9 / snap.students_per_s) < 0.5
+
+
+def test_rate_is_a_moving_window(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(metrics_mod.time, "monotonic", lambda: clock[0])
+    m = RunMetrics()
+    m.reset(students=1000, tests=1, workers=1)
+    for _ in range(200):                # slow start: 1 student/s
+        clock[0] += 1
+        m.student_started()
+        m.student_finished()
+    for _ in range(metrics_mod._WINDOW):  # then 10 students/s
+        clock[0] += 0.1
+        m.student_started()
+        m.student_finished()
+    assert abs(m.snapshot().students_per_s - 10) < 0.01
+
+
+_SCRIPT = """\
+cmd = input()
+while cmd == "hang":
+    pass
+print(cmd)
+"""
+
+
+def test_runner_updates_metrics():
+    with tempfile.TemporaryDirectory() as root:
+        paths = []
+        for name in ("alice", "bob", "carol"):
+            sub = os.path.join(root, name)
+            os.makedirs(sub)
+            with open(os.path.join(sub, "main.py"), "w") as f:
+                f.write(_SCRIPT)
+            paths.append(sub)
+        tcs = [{"input": ["hi"]}, {"input": ["hang"]}]
+        m = RunMetrics()
+        ScriptRunner(timeout=1).run_batch(paths, tcs, "folder", root,
+                                          max_workers=2, metrics=m)
+        snap = m.snapshot()
+        assert (snap.students_total, snap.students_done, snap.tests_done) == (3, 3, 6)
+        assert (snap.timeouts, snap.busy, snap.queued, snap.eta_s) == (3, 0, 0, 0.0)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the students × tests outcome index (engine/outcomes.py)
+"""
+
+import pytest
+
+from engine import models
+from engine.models import MatchTier, StudentCategory, StudentResult
+from engine.outcomes import OutcomeMatrix
+
+E, N, S, M, X = (MatchTier.EXACT, MatchTier.NORMALIZED, MatchTier.SEMANTIC,
+                 MatchTier.MISMATCH, MatchTier.ERROR)
+
+
+def _student(name, tiers, file_test=None):
+    tests = [
+        models.TestResult(
+            base=models.TestBase(test_num=i, input_lines=[], stdout="",
+                                 files={"out.txt": "x"} if i == file_test else {},
+                                 semantic_values=[]),
+            stdout_blob="", files_blob={}, match_tier=tier,
+            stdout_match=True, file_match=True, file_mismatch_details=[],
+            semantic_values_student=[],
+        )
+        for i, tier in enumerate(tiers, 1)
+    ]
+    return StudentResult(name=name, path=name, category=StudentCategory.PARTIAL,
+                         score=0.0, test_results=tests, overall_match_tier=tiers[0])
+
+
+RESULTS = [
+    _student("ana",   [E, M, E], file_test=3),
+    _student("ben",   [M, E, X], file_test=3),
+    _student("cara",  [S, S, S], file_test=3),
+    _student("dev",   [X, X]),                  # stopped before test 3
+]
+
+
+def _backends():
+    yield False
+    try:
+        import numpy  # noqa: F401
+        yield True
+    except ImportError:
+        pass
+
+
+@pytest.mark.parametrize("use_numpy", list(_backends()))
+def test_outcome_queries(use_numpy):
+    """Queries select the same students as scanning the results would"""
+    m = OutcomeMatrix(RESULTS, use_numpy=use_numpy)
+    assert m.file_tests == [3]
+    assert m.names(m.query("fail:1 pass:2")) == ["ben"]
+    assert m.names(m.query("error:file")) == ["ben"]
+    assert m.names(m.query("semantic:all")) == ["cara"]
+    assert m.names(m.query("!fail:any")) == ["cara"]
+    assert m.names(m.query("exact:1,2")) == ["ana", "ben"]
+    assert m.count(m.query("")) == 4
+    assert m.pass_rates() == [0.5, 0.5, 2 / 3]
+    assert m.tier_counts()[1][MatchTier.ERROR] == 1
+
+    for bad in ("fail", "bogus:1", "pass:x", "pass:9"):
+        with pytest.raises(ValueError):
+            m.query(bad)
+
+
+def test_outcome_backends_agree_on_many_students():
+    """Bitsets spanning many bytes / words give identical answers"""
+    tiers = list(MatchTier)
+    results = [_student(f"s{i:04d}", [tiers[(i * k) % len(tiers)] for k in range(1, 6)])
+               for i in range(1000)]
+    plain = OutcomeMatrix(results, use_numpy=False)
+    expected = [r.name for r in results
+                if not r.test_results[0].passed and r.test_results[4].passed]
+    assert plain.names(plain.query("fail:1 pass:5")) == expected
+    for use_numpy in _backends():
+        m = OutcomeMatrix(results, use_numpy=use_numpy)
+        assert m.names(m.query("fail:1 pass:5")) == expected
+        assert m.pass_rates() == plain.pass_rates()
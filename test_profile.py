@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for assignment comparison profiles (engine/profile.py)
+"""
+
+import os
+
+import pytest
+
+from engine.categorizer import process_student
+from engine.comparator import ProfileMatcher, classify_test
+from engine.models import MatchTier
+from engine.profile import DEFAULT_PROFILE, ComparisonProfile, load_profile, profile_from_dict
+
+
+def test_bundled_contact_manager_profile_is_the_default():
+    """profiles/contact_manager.json mirrors the built-in defaults"""
+    path = os.path.join(os.path.dirname(__file__), "profiles", "contact_manager.json")
+    assert load_profile(path) == DEFAULT_PROFILE
+
+
+def test_profile_rejects_bad_content(tmp_path):
+    """Unknown keys, wrong types and bad regexes raise ValueError"""
+    for bad in ({"colour": 1}, {"ignore_case": "yes"}, {"skip_patterns": ["("]},
+                {"whitespace": "squash"}, {"abs_tol": -1}, {"status_verbs": [" "]}):
+        with pytest.raises(ValueError):
+            profile_from_dict(bad)
+    # Valid alone, but not where ProfileMatcher embeds them
+    for bad in (["(?i)debug.*"], ["(?P<menu>x)"], ["(?P<a>x)", "(?P<a>y)"]):
+        with pytest.raises(ValueError, match="skip pattern"):
+            ComparisonProfile(skip_patterns=tuple(bad))
+    ProfileMatcher(ComparisonProfile(skip_patterns=("debug.*", "(?P<a>x)")))
+    path = tmp_path / "broken.json"
+    path.write_text("{not json", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_profile(str(path))
+
+
+def test_profile_skip_patterns_and_status_verbs():
+    """A different assignment's banners are skipped and its verbs recognised"""
+    matcher = ProfileMatcher(ComparisonProfile(
+        name="Inventory",
+        skip_patterns=("INVENTORY SYSTEM",),
+        status_verbs=("was restocked",),
+    ))
+    tokens = matcher.extractor.extract(
+        "INVENTORY SYSTEM\nContact Manager\nWidget was restocked (x3)", [])
+    assert tokens == [("text", "Contact Manager"), ("status", "widget was restocked")]
+
+
+def test_profile_case_and_whitespace_policy():
+    """ignore_case / whitespace decide what reaches the NORMALIZED tier"""
+    base, student = {"stdout": "Total:  5\n"}, {"stdout": "total: 5\n"}
+    strict = ProfileMatcher(ComparisonProfile(whitespace="exact"))
+    lenient = ProfileMatcher(ComparisonProfile(ignore_case=True))
+    assert classify_test(1, [], base, student, matcher=strict).match_tier != MatchTier.NORMALIZED
+    assert classify_test(1, [], base, student, matcher=lenient).match_tier == MatchTier.NORMALIZED
+
+
+def test_profile_invalid_loop_exemptions():
+    """Rigid-validation note honours the profile's exempt words"""
+    base = [{"stdout": "ok\n", "returncode": 0}]
+    student = [{"stdout": "Invalid item.\nInvalid item.\nInvalid item.\n",
+                "returncode": 1, "error": "EOFError", "error_type": "EOFError"}]
+    tcs = [{"input": ["x"]}]
+    default = process_student("s", "s", base, student, tcs)
+    exempt = process_student("s", "s", base, student, tcs, matcher=ProfileMatcher(
+        ComparisonProfile(invalid_loop_exempt=("item",))))
+    assert any("Rigid input validation" in n for n in default.notes)
+    assert not any("Rigid input validation" in n for n in exempt.notes)
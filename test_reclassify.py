@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for reclassifying cached runner output (engine/reclassify.py)
+"""
+
+import os
+import tempfile
+
+from engine.categorizer import process_student
+from engine.comparator import ProfileMatcher
+from engine.models import MatchTier, StudentCategory
+from engine import reclassify
+from engine.profile import ComparisonProfile
+from engine.reclassify import RawBatch, classify_batch
+from engine.runner import ScriptRunner
+
+
+TCS = [{"input": ["add Ann"]},
+       {"input": ["save"], "expected_filename": "out.txt"}]
+BASE = [{"stdout": "Menu\n" * 20 + "Added Ann\n"},
+        {"stdout": "Saved\n", "files": {"out.txt": "Ann\n"}}]
+
+
+def _students(n):
+    kinds = [
+        [{"stdout": "Menu\n" * 20 + "Added Ann\n"}, {"stdout": "Saved\n", "files": {"out.txt": "Ann\n"}}],
+        [{"stdout": "MENU\n" * 20 + "added ann\n"}, {"stdout": "saved!\n", "files": {"out.txt": "Ann\n"}}],
+        [{"stdout": "", "stderr": "Traceback…\nEOFError: EOF", "error": "EOFError: EOF",
+          "error_type": "EOFError", "returncode": 1},
+         {"stdout": "Saved\n", "files": {"out.txt": None}}],
+    ]
+    return [(f"s{i:03}", f"/subs/s{i:03}", kinds[i % 3]) for i in range(n)]
+
+
+def _batch(n):
+    batch = RawBatch(BASE, TCS)
+    for name, path, raws in _students(n):
+        batch.add(name, path, raws)
+    return batch
+
+
+def _summary(results):
+    return [(r.name, r.category, r.score, r.notes,
+             [(t.match_tier, t.student_stdout, t.student_files, t.error, t.base_stdout)
+              for t in r.test_results])
+            for r in results]
+
+
+def test_cached_raws_classify_like_fresh_ones(monkeypatch):
+    """Serial and process-pool classification match process_student() on the raws"""
+    monkeypatch.setattr(reclassify, "_POOL_STARTUP_S", 0.0)
+    pools = []
+    real_parallel = reclassify._classify_parallel
+    monkeypatch.setattr(reclassify, "_classify_parallel",
+                        lambda *a: pools.append(1) or real_parallel(*a))
+    students = _students(30)
+    expected = [process_student(name, path, BASE, raws, TCS) for name, path, raws in students]
+    batch = _batch(30)
+    streamed = []
+    serial = classify_batch(batch, TCS, max_workers=1)
+    parallel = classify_batch(batch, TCS, max_workers=2, on_results=streamed.extend)
+    assert _summary(serial) == _summary(expected)
+    assert _summary(parallel) == _summary(expected)
+    assert sorted(r.name for r in streamed) == [r.name for r in expected]
+    assert pools == [1]
+    # Parallel results point at the parent's shared base data and stored outputs
+    assert parallel[0].test_results[0].base is parallel[3].test_results[0].base
+    assert parallel[0].test_results[0].stdout_blob is serial[0].test_results[0].stdout_blob
+
+
+def test_pool_breaking_midway_delivers_each_student_once(monkeypatch):
+    """Chunks finished before the pool broke are kept, not classified again"""
+    from concurrent.futures.process import BrokenProcessPool
+    monkeypatch.setattr(reclassify, "_POOL_STARTUP_S", 0.0)
+
+    def breaks_after_one(batch, chunks, first, done_chunks, bases, tcs, check_stdout,
+                         matcher, max_workers, on_results, should_stop):
+        done_chunks[first] = [process_student(name, path, BASE, raws, TCS)
+                              for name, path, raws in chunks[first]]
+        on_results(done_chunks[first])
+        raise BrokenProcessPool("worker killed")
+
+    monkeypatch.setattr(reclassify, "_classify_parallel", breaks_after_one)
+    expected = [process_student(name, path, BASE, raws, TCS)
+                for name, path, raws in _students(30)]
+    streamed = []
+    results = classify_batch(_batch(30), TCS, max_workers=2, on_results=streamed.extend)
+    assert sorted(r.name for r in streamed) == [r.name for r in expected]
+    assert _summary(results) == _summary(expected)
+
+
+def test_reclassify_applies_new_settings():
+    """Stdout grading, expected file content and the profile all apply without re-running"""
+    batch = _batch(3)
+    assert [r.category for r in classify_batch(batch, TCS, max_workers=1)] == \
+           [StudentCategory.PERFECT, StudentCategory.COSMETIC, StudentCategory.CRASH]
+
+    files_only = classify_batch(batch, TCS, check_stdout=False, max_workers=1)
+    assert files_only[1].category == StudentCategory.PERFECT
+
+    edited = [TCS[0], dict(TCS[1], expected_file_content="Bob")]
+    assert classify_batch(batch, edited, max_workers=1)[0].test_results[1].match_tier == \
+           MatchTier.MISMATCH
+
+    lenient = ProfileMatcher(ComparisonProfile(ignore_case=True))
+    assert classify_batch(batch, TCS, matcher=lenient, max_workers=1)[1] \
+        .test_results[0].match_tier == MatchTier.NORMALIZED
+
+def test_only_execution_changes_need_a_new_run():
+    batch = _batch(1)
+    assert batch.changed_tests([TCS[0], dict(TCS[1], expected_file_content="x")]) == []
+    assert batch.changed_tests([{"input": ["add Bob"]}, TCS[1]]) == [0]
+    assert batch.changed_tests([TCS[0], dict(TCS[1], expected_filename="o.csv")]) == [1]
+    assert batch.changed_tests(TCS[:1]) is None
+
+
+_SCRIPT = """\
+import os
+with open("log.txt") as f:
+    seen = f.read().split()
+name = input()
+with open("log.txt", "a") as f:
+    f.write(name + "\\n")
+print("seen", seen, "new", name, "stale" if os.path.exists("out.txt") else "")
+open("out.txt", "w").write(name)
+"""
+
+
+def test_one_test_reruns_exactly_as_in_a_full_run():
+    """A test executed alone sees the same fixtures and gives the same output"""
+    with tempfile.TemporaryDirectory() as root:
+        with open(os.path.join(root, "log.txt"), "w") as f:
+            f.write("fixture\n")
+        sub = os.path.join(root, "alice")
+        os.mkdir(sub)
+        with open(os.path.join(sub, "main.py"), "w") as f:
+            f.write(_SCRIPT)
+        tcs = [{"input": ["a"]}, {"input": ["b"], "expected_filename": "out.txt"},
+               {"input": ["c"]}]
+        runner = ScriptRunner(timeout=10)
+
+        full = runner.run_student(sub, tcs, "folder", root)
+        alone = runner.run_batch([sub], tcs, "folder", root, test_indices=[1])["alice"]
+        assert len(alone) == 1
+        assert {k: v for k, v in alone[0].items() if k != "elapsed"} == \
+               {k: v for k, v in full[1].items() if k != "elapsed"}
+        assert full[1]["stdout"] == "seen ['fixture'] new b \n"
+
+        # Editing test 2 and merging its new output regrades just that test
+        batch = RawBatch(full, tcs)
+        batch.add("alice", sub, full)
+        edited = [tcs[0], dict(tcs[1], input=["z"]), tcs[2]]
+        assert batch.changed_tests(edited) == [1]
+        rerun = runner.run_batch([sub], edited, "folder", root, test_indices=[1])
+        batch.replace_test(1, edited[1], full[1], {"alice": rerun["alice"][0]})
+        assert batch.changed_tests(edited) == []
+        result = classify_batch(batch, edited, max_workers=1)[0]
+        assert result.test_results[1].student_stdout == "seen ['fixture'] new z \n"
+        assert result.test_results[1].match_tier == MatchTier.MISMATCH
+        assert [t.passed for t in result.test_results] == [True, False, True]
+        assert result.category == StudentCategory.PARTIAL
+        assert result.notes == ["File output mismatch: Contents differ: out.txt"]
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the local staging cache (engine/staging.py)
+"""
+
+import os
+import tempfile
+
+from engine.runner import ScriptRunner
+from engine.staging import StagingCache
+
+
+def _write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_only_changed_files_are_copied_again():
+    with tempfile.TemporaryDirectory() as share, tempfile.TemporaryDirectory() as cache:
+        sub = os.path.join(share, "alice")
+        os.makedirs(sub)
+        _write(os.path.join(sub, "main.py"), "print(1)\n")
+        _write(os.path.join(sub, "notes.txt"), "draft")
+        staging = StagingCache(cache)
+
+        local = staging.stage_dir(sub)
+        assert os.path.basename(local) == "alice"
+        assert sorted(os.listdir(local)) == ["main.py", "notes.txt"]
+        assert (staging.copied, staging.reused) == (2, 0)
+
+        staging.stage_dir(sub)
+        assert (staging.copied, staging.reused) == (2, 2)
+
+        _write(os.path.join(sub, "main.py"), "print(22)\n")
+        os.remove(os.path.join(sub, "notes.txt"))
+        staging.stage_dir(sub)
+        assert (staging.copied, staging.reused) == (3, 2)
+        assert os.listdir(local) == ["main.py"]
+        with open(os.path.join(local, "main.py")) as f:
+            assert f.read() == "print(22)\n"
+
+
+def test_staged_batch_matches_direct_batch():
+    with tempfile.TemporaryDirectory() as share, tempfile.TemporaryDirectory() as cache:
+        _write(os.path.join(share, "contacts.csv"), "Ann\nBob\n")
+        _write(os.path.join(share, "ICA5.pdf"), "not data")
+        for name in ("alice", "bob"):
+            os.makedirs(os.path.join(share, name))
+            _write(os.path.join(share, name, f"{name}_ica5.py"),
+                   "print(input(), len(open('contacts.csv').read().split()))\n")
+        tcs = [{"input": ["hi"]}, {"input": ["yo"]}]
+
+        direct = ScriptRunner(timeout=10)
+        staged = ScriptRunner(timeout=10, staging=StagingCache(cache))
+        for mode in ("folder",):
+            paths = direct.find_student_submissions(share, mode)
+            want = direct.run_batch(paths, tcs, mode, share)
+            got = staged.run_batch(paths, tcs, mode, share)
+            assert sorted(got) == ["alice", "bob"]
+            for name in got:
+                assert [r["stdout"] for r in got[name]] == [r["stdout"] for r in want[name]]
+            assert got["alice"][0]["stdout"] == "hi 2\n"
+        assert staged.staging.copied == 3           # two scripts and contacts.csv
+
+
+def test_file_mode_stages_the_shared_folder_once():
+    with tempfile.TemporaryDirectory() as share, tempfile.TemporaryDirectory() as cache:
+        for name in ("alice", "bob", "carol"):
+            _write(os.path.join(share, f"{name}.py"), f"print('{name}')\n")
+        runner = ScriptRunner(timeout=10, staging=StagingCache(cache))
+        paths = runner.find_student_submissions(share, "file")
+        got = runner.run_batch(paths, [{"input": []}], "file", share)
+        assert {n: r[0]["stdout"] for n, r in got.items()} == \
+               {"alice.py": "alice\n", "bob.py": "bob\n", "carol.py": "carol\n"}
+        assert runner.staging.copied == 3
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite run store (engine/store.py)
+"""
+
+import os
+import tempfile
+
+from engine.blobs import BlobStore
+from engine.categorizer import build_test_bases, process_student
+from engine.models import MatchTier
+from engine.store import RunStore, open_session, save_session
+
+
+def _run():
+    tcs = [{"input": ["a"]}, {"input": ["b"], "expected_filename": "out.txt"}]
+    base = [{"stdout": "menu\n" * 50 + "Added a\n"},
+            {"stdout": "Saved\n", "files": {"out.txt": "b\n"}}]
+    students = {
+        "alice": [{"stdout": "menu\n" * 50 + "Added a\n", "elapsed": 0.25},
+                  {"stdout": "Saved\n", "files": {"out.txt": "b\n"}}],
+        "bob":   [{"stdout": "", "error": "Traceback…\nEOFError", "error_type": "EOFError",
+                   "returncode": 1},
+                  {"stdout": "Saved\n", "files": {"out.txt": None}}],
+    }
+    blobs = BlobStore()
+    bases = build_test_bases(base, tcs)
+    return [process_student(name, f"/subs/{name}", base, raws, tcs, bases=bases, blobs=blobs)
+            for name, raws in students.items()]
+
+
+def test_run_round_trips_through_the_store():
+    """A reopened run has the same results, with outputs read on demand"""
+    results = _run()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RunStore(os.path.join(tmp, "runs.db"))
+        run_id = store.save_run({"mode": "folder"}, results, label="ICA5")
+        assert [(r.label, r.students) for r in store.runs()] == [("ICA5", 2)]
+        assert store.config(run_id) == {"mode": "folder"}
+
+        loaded = store.load_run(run_id)
+        for old, new in zip(results, loaded):
+            assert (new.name, new.category, new.score, new.notes) == \
+                   (old.name, old.category, old.score, old.notes)
+            for a, b in zip(old.test_results, new.test_results):
+                assert b.match_tier == a.match_tier
+                assert b.student_stdout == a.student_stdout
+                assert b.student_files == a.student_files
+                assert b.base_stdout == a.base_stdout and b.base_files == a.base_files
+                assert b.error == a.error and b.elapsed == a.elapsed
+                assert b.semantic_values_base == a.semantic_values_base
+
+        # Outputs are shared by content across runs
+        store.save_run({}, loaded)
+        blob_count = store._conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+        store.save_run({}, results)
+        assert store._conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == blob_count
+        store.close()
+
+        reopened = RunStore(os.path.join(tmp, "runs.db"))
+        assert len(reopened.runs()) == 3
+        assert reopened.load_run(run_id)[0].test_results[0].student_stdout.endswith("Added a\n")
+        reopened.close()
+
+
+def test_find_uses_every_filter():
+    """find() narrows by student, test, tier and error type"""
+    store = RunStore(":memory:")
+    run_id = store.save_run({}, _run())
+    assert store.find(run_id, tier=MatchTier.ERROR.value) == [("bob", 1, "error", "EOFError")]
+    assert store.find(run_id, error_type="EOFError", test_num=2) == []
+    assert [row[0] for row in store.find(run_id, test_num=2)] == ["alice", "bob"]
+    assert len(store.find(run_id, student="alice")) == 2
+    assert store.load_run(run_id, with_tests=False)[1].test_results == []
+
+
+def test_session_file_loads_students_before_their_tests():
+    """A session reopens from its index; per-test rows are read on first use"""
+    results = _run()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ica5.agsession")
+        save_session(path, {"test_cases": [{"input": ["a"]}]}, results, label="ICA5")
+        save_session(path, {"test_cases": []}, results, label="ICA5 again")   # replaced whole
+
+        store, run_id, loaded = open_session(path)
+        assert [r.label for r in store.runs()] == ["ICA5 again"]
+        assert store.config(run_id) == {"test_cases": []}
+        assert [(r.name, r.score, r.notes) for r in loaded] == \
+               [(r.name, r.score, r.notes) for r in results]
+        assert [len(r.test_results) for r in loaded] == [2, 2]
+        assert not any(r.test_results.loaded for r in loaded)
+
+        bob = loaded[1].test_results
+        assert bob[0].error.endswith("EOFError") and not loaded[0].test_results.loaded
+        assert [tr.match_tier for tr in bob] == [tr.match_tier for tr in results[1].test_results]
+        assert loaded[0].test_results[0].base is bob[0].base
+        store.close()
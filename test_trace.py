@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for span instrumentation (engine/trace.py)
+"""
+
+import json
+import os
+import tempfile
+
+from engine import trace
+from engine.categorizer import process_student
+from engine.runner import ScriptRunner
+
+
+def test_disabled_spans_record_nothing():
+    assert not trace.enabled()
+    assert trace.span("execute", student="a") is trace.span("copy")
+
+
+def test_run_is_traced_per_stage_student_and_test():
+    """Every runner and classification stage is recorded, tagged and exportable"""
+    with tempfile.TemporaryDirectory() as root:
+        sub = os.path.join(root, "alice")
+        os.mkdir(sub)
+        with open(os.path.join(sub, "main.py"), "w") as f:
+            f.write("print(input())\n")
+        tcs = [{"input": ["a"]}, {"input": ["b"]}]
+
+        tracer = trace.start()
+        try:
+            runner = ScriptRunner(timeout=10)
+            raws = runner.run_batch([sub], tcs, "folder", root)["alice"]
+            process_student("alice", sub, raws, raws, tcs)
+        finally:
+            assert trace.stop() is tracer
+
+        hists = tracer.histograms()
+        assert {name: h.count for name, h in hists.items()} == {
+            "interpreter_startup": 3, "copy": 1, "reset": 2, "execute": 2,
+            "read_files": 2, "compare": 2, "classify": 1,
+        }
+        tags = [tags for name, _, _, _, tags in tracer.events if name == "execute"]
+        assert tags == [{"student": "alice", "test": 1}, {"student": "alice", "test": 2}]
+        assert hists["execute"].percentile(50) <= hists["execute"].max
+        assert "execute" in tracer.format_histogram()
+
+        path = os.path.join(root, "trace.json")
+        tracer.write_chrome_trace(path)
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        spans = [e for e in events if e["ph"] == "X"]
+        assert len(spans) == len(tracer.events)
+        assert all(e["dur"] >= 0 and e["args"]["worker"] for e in spans)
+        workers = {e["tid"] for e in spans if e["name"] == "execute"}
+        assert {e["tid"] for e in events if e["ph"] == "M"} >= workers
+
+
+def test_startup_baseline_failure_does_not_abort_the_batch():
+    """A missing interpreter skips the baseline samples; the batch still runs"""
+    with tempfile.TemporaryDirectory() as root:
+        sub = os.path.join(root, "alice")
+        os.mkdir(sub)
+        with open(os.path.join(sub, "main.py"), "w") as f:
+            f.write("print(1)\n")
+
+        tracer = trace.start()
+        try:
+            runner = ScriptRunner(python_exe=os.path.join(root, "no-python"), timeout=10)
+            results = runner.run_batch([sub], [{"input": []}], "folder", root)
+        finally:
+            trace.stop()
+
+        assert "interpreter_startup" not in tracer.histograms()
+        assert list(results) == ["alice"]
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the coalescing UI update queue (ui/updates.py)
+"""
+
+import threading
+
+from ui.updates import UiUpdates
+
+
+class _Timer:
+    """Stands in for a Tk widget: after() just remembers the callback."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, fn):
+        self.scheduled.append((ms, fn))
+
+
+def test_keyed_updates_coalesce_and_batches_merge():
+    timer = _Timer()
+    updates = UiUpdates(timer)
+    log = []
+
+    def worker(w):
+        for i in range(100):
+            updates.post(lambda i=i: log.append(("progress", i)), key="progress")
+            updates.extend("results", [(w, i)], lambda items: log.append(("add", len(items))))
+
+    threads = [threading.Thread(target=worker, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    updates.post(lambda: log.append("done"))
+
+    assert updates.drain() == 3
+    assert log[0] == ("add", 400)
+    assert log[1][0] == "progress"
+    assert log[2] == "done"
+    assert updates.drain() == 0
+
+
+def test_timer_keeps_draining_after_a_failing_update():
+    timer = _Timer()
+    updates = UiUpdates(timer)
+    log = []
+    updates.post(lambda: 1 / 0)
+    updates.post(lambda: log.append("ran"))
+    ms, tick = timer.scheduled.pop()
+    assert ms == 50
+    tick()
+    assert log == ["ran"]
+    assert len(timer.scheduled) == 1
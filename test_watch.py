@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Tests for watch mode (engine/watch.py)
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from engine.metrics import RunMetrics
+from engine.models import StudentCategory
+from engine.runner import ScriptRunner
+from engine.store import RunStore
+from engine.watch import SubmissionWatcher, WatchGrader
+
+
+def _write(folder, source):
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "main.py"), "w") as f:
+        f.write(source)
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def test_changes_are_handed_over_once_settled():
+    with tempfile.TemporaryDirectory() as root:
+        _write(os.path.join(root, "alice"), "print(1)\n")
+        ready = []
+        watcher = SubmissionWatcher(root, lambda: sorted(
+            os.path.join(root, d) for d in os.listdir(root)), ready.extend,
+            settle_s=60, use_inotify=False)
+        watcher.scan(initial=True)
+        assert ready == [os.path.join(root, "alice")]
+
+        _write(os.path.join(root, "bob"), "print(2)\n")
+        watcher.scan()
+        watcher.scan()
+        assert len(ready) == 1              # still settling
+        watcher.settle_s = 0
+        watcher.scan()
+        assert ready[1:] == [os.path.join(root, "bob")]
+        watcher.scan()
+        assert len(ready) == 2              # unchanged since handed over
+
+
+def test_submissions_are_listed_again_only_when_the_top_level_changes():
+    with tempfile.TemporaryDirectory() as root:
+        _write(os.path.join(root, "alice"), "print(1)\n")
+        finds = []
+
+        def find():
+            finds.append(1)
+            return sorted(os.path.join(root, d) for d in os.listdir(root)
+                          if os.path.exists(os.path.join(root, d, "main.py")))
+
+        ready = []
+        watcher = SubmissionWatcher(root, find, ready.extend, settle_s=0, use_inotify=False)
+        watcher.scan(initial=True)
+        _write(os.path.join(root, "alice"), "print(11)\n")
+        watcher.scan()
+        watcher.scan()
+        assert len(finds) == 1 and len(ready) == 2
+        # A touched path inside a known submission maps onto the list
+        assert watcher._submissions_for({os.path.join(root, "alice", "main.py")}) == \
+               {os.path.join(root, "alice")}
+        assert len(finds) == 1
+
+        os.makedirs(os.path.join(root, "bob"))      # not a submission yet
+        watcher.scan()
+        assert len(finds) == 2
+        _write(os.path.join(root, "bob"), "print(2)\n")
+        watcher.scan()
+        watcher.scan()
+        assert len(finds) == 3 and ready[-1] == os.path.join(root, "bob")
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_grader_grades_arrivals_and_edits(use_inotify):
+    with tempfile.TemporaryDirectory() as root:
+        base, assignment = os.path.join(root, "base"), os.path.join(root, "assignment")
+        _write(base, "print('Hello ' + input())\n")
+        _write(os.path.join(assignment, "alice"), "print('Hello ' + input())\n")
+
+        results, lock = {}, threading.Lock()
+
+        def on_result(r):
+            with lock:
+                results.setdefault(r.name, []).append(r.category)
+            store.put_student(run_id, r)
+
+        store = RunStore(":memory:")
+        run_id = store.save_run({}, [], label="watch")
+        metrics = RunMetrics()
+        grader = WatchGrader(ScriptRunner(timeout=5), base, assignment, "folder",
+                             [{"input": ["Ann"]}], on_result, metrics=metrics,
+                             settle_s=0.2, poll_s=0.05, use_inotify=use_inotify)
+        assert grader.start()
+        try:
+            _wait_for(lambda: "alice" in results)
+            _write(os.path.join(assignment, "bob"), "print('hello ' + input())\n")
+            _wait_for(lambda: "bob" in results)
+            _write(os.path.join(assignment, "bob"), "print('Hello ' + input())\n")
+            _wait_for(lambda: len(results["bob"]) == 2)
+        finally:
+            grader.stop()
+
+        assert results["alice"] == [StudentCategory.PERFECT]
+        assert results["bob"] == [StudentCategory.COSMETIC, StudentCategory.PERFECT]
+        loaded = {r.name: r.category for r in store.load_run(run_id)}
+        assert loaded == {"alice": StudentCategory.PERFECT, "bob": StudentCategory.PERFECT}
+        snap = metrics.snapshot()
+        assert (snap.students_total, snap.students_done, snap.queued) == (3, 3, 0)
+
+
+def test_grader_reports_a_submission_whose_run_raises():
+    class Exploding(ScriptRunner):
+        def run_student(self, student_path, *args, **kwargs):
+            if os.path.basename(student_path) == "carol":
+                raise RuntimeError("sandbox vanished")
+            return super().run_student(student_path, *args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as root:
+        base, assignment = os.path.join(root, "base"), os.path.join(root, "assignment")
+        _write(base, "print('Hello')\n")
+        _write(os.path.join(assignment, "carol"), "print('Hello')\n")
+        results = []
+        metrics = RunMetrics()
+        grader = WatchGrader(Exploding(timeout=5), base, assignment, "folder",
+                             [{"input": []}], results.append, metrics=metrics,
+                             poll_s=0.05, use_inotify=False)
+        assert grader.start()
+        try:
+            _wait_for(lambda: results)
+        finally:
+            grader.stop()
+
+        assert results[0].name == "carol"
+        assert results[0].test_results[0].error == "sandbox vanished"
+        assert metrics.snapshot().students_done == 1
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_regrade_sees_files_added_to_a_known_submission(use_inotify):
+    with tempfile.TemporaryDirectory() as root:
+        base, assignment = os.path.join(root, "base"), os.path.join(root, "assignment")
+        alice = os.path.join(assignment, "alice")
+        _write(base, "print('Hello')\n")
+        _write(alice, "import util\nprint(util.GREETING)\n")
+        results = []
+        grader = WatchGrader(ScriptRunner(timeout=5), base, assignment, "folder",
+                             [{"input": []}], results.append,
+                             settle_s=0.2, poll_s=0.05, use_inotify=use_inotify)
+        assert grader.start()
+        try:
+            _wait_for(lambda: results)
+            with open(os.path.join(alice, "util.py"), "w") as f:
+                f.write("GREETING = 'Hello'\n")
+            _wait_for(lambda: len(results) == 2)
+        finally:
+            grader.stop()
+
+        assert results[0].category == StudentCategory.CRASH
+        assert results[1].category == StudentCategory.PERFECT
@@ -18,7 +18,9 @@ Layout (left panel = config + controls, right panel = results):
 
 from __future__ import annotations
 
+import dataclasses
 import os
+import sqlite3
 import sys
 import threading
 import time
@@ -33,13 +35,34 @@ from ui.theme import Theme, apply as apply_theme
 from ui.summary_bar import SummaryBar
 from ui.results_table import ResultsTable
 from ui.detail_panel import DetailPanel
+from ui.diff_cache import DiffCache
+from ui.outcome_panel import OutcomePanel
+from ui.updates import UiUpdates
+from engine import trace
+from engine.archive import is_archive
+from engine.exporter import MetricsExporter
+from engine.metrics import RunMetrics
 from engine.runner import ScriptRunner
 from engine.categorizer import process_student
+from engine.comparator import DEFAULT_MATCHER, ProfileMatcher
+from engine.discovery import SubmissionScanner
 from engine.models import StudentResult
+from engine.profile import load_profile
+from engine.reclassify import RawBatch, classify_batch
+from engine.staging import StagingCache
+from engine.watch import WatchGrader
+from engine.outcomes import OutcomeMatrix
+from engine.store import (
+    DEFAULT_STORE_PATH, SESSION_SUFFIX, RunInfo, RunStore, open_session, save_session,
+)
+
+
+# How often the summary bar re-reads the live run metrics (ms)
+_METRICS_POLL_MS = 500
 
 
 class App:
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, metrics_port: Optional[int] = None):
         self.root = root
         self.root.title(Theme.TITLE)
         self.root.geometry(f"{Theme.WINDOW_W}x{Theme.WINDOW_H}")
@@ -54,17 +77,34 @@ class App:
         self._assignment_path = tk.StringVar()
         self._module_names   = tk.StringVar()
         self._utility_path   = tk.StringVar()
+        self._profile_path   = tk.StringVar()
         self._mode           = tk.StringVar(value="folder")
         self._check_stdout   = tk.BooleanVar(value=True)
         self._show_details   = tk.BooleanVar(value=False)
         self._max_workers    = tk.IntVar(value=4)
+        self._trace_run      = tk.BooleanVar(value=False)
+        self._stage_local    = tk.BooleanVar(value=False)
+        self._staging        = StagingCache()       # used while _stage_local is set
+        self._scanner        = SubmissionScanner()  # shared, so file hashes carry over
         self._test_cases: list[_TestCaseWidget] = []
         self._results: list[StudentResult] = []
+        self._store: Optional[RunStore] = None
+        self._session: Optional[RunStore] = None        # open session file, if any
+        self._run_id: Optional[int] = None              # in _session, else in _store
+        self._config: Optional[dict] = None             # settings behind _results
+        self._raw_batch: Optional[RawBatch] = None     # last run's program output
+        self._watch: Optional[WatchGrader] = None       # while in watch mode
+        self._metrics = RunMetrics()                    # updated by the runner's threads
+        self._metrics_job: Optional[str] = None         # pending _poll_metrics
         self._is_running     = False
         self._status_var     = tk.StringVar(value="Ready")
         self._progress_var   = tk.StringVar(value="")
+        self._updates        = UiUpdates(root)      # worker threads -> Tk thread
+        self._diffs          = DiffCache()
 
         self._build()
+        if metrics_port is not None:
+            self._serve_metrics(metrics_port)
 
     # ------------------------------------------------------------------
     # Build layout
@@ -138,6 +178,7 @@ class App:
             ("Assignment Path:",  self._assignment_path, self._browse_assignment, 0),
             ("Module Name(s):",   self._module_names,    None,                    0),
             ("Utility Path:",     self._utility_path,    self._browse_utility,    0),
+            ("Compare Profile:",  self._profile_path,    self._browse_profile,    0),
         ]
         for i, (label, var, browse_cmd, _) in enumerate(rows, start=1):
             ttk.Label(f, text=label).grid(row=i, column=0, sticky="w", pady=3)
@@ -146,6 +187,9 @@ class App:
             if browse_cmd:
                 ttk.Button(f, text="…", width=3, command=browse_cmd).grid(
                     row=i, column=2, pady=3)
+            if var is self._assignment_path:
+                ttk.Button(f, text="zip", width=4, command=self._browse_assignment_zip).grid(
+                    row=i, column=3, padx=(4, 0), pady=3)
 
     def _build_test_section(self, parent):
         outer = ttk.LabelFrame(parent, text="Test Cases", padding=8)
@@ -169,6 +213,10 @@ class App:
                         variable=self._check_stdout).pack(anchor="w")
         ttk.Checkbutton(f, text="Show detailed diff in results",
                         variable=self._show_details).pack(anchor="w")
+        ttk.Checkbutton(f, text="Record performance trace",
+                        variable=self._trace_run).pack(anchor="w")
+        ttk.Checkbutton(f, text="Stage submissions on local disk (network shares)",
+                        variable=self._stage_local).pack(anchor="w")
 
         worker_row = ttk.Frame(f)
         worker_row.pack(anchor="w", pady=(4, 0))
@@ -185,10 +233,22 @@ class App:
         self._stop_btn = ttk.Button(f, text="■ Stop", command=self._stop,
                                     state=tk.DISABLED)
         self._stop_btn.pack(side="left", padx=(0, 6))
+        self._reclassify_btn = ttk.Button(f, text="↻ Reclassify", command=self._reclassify,
+                                          state=tk.DISABLED)
+        self._reclassify_btn.pack(side="left", padx=(0, 6))
         ttk.Button(f, text="Test Single…", command=self._test_single).pack(side="left")
+        self._watch_btn = ttk.Button(f, text="👁 Watch", command=self._toggle_watch)
+        self._watch_btn.pack(side="left", padx=(6, 0))
 
         self._save_btn = ttk.Button(f, text="Save Report", command=self._save_report)
         self._save_btn.pack(side="right")
+        ttk.Button(f, text="Open Run…", command=self._open_run).pack(side="right", padx=(0, 6))
+
+        s = ttk.Frame(parent)
+        s.pack(fill="x", padx=8, pady=(0, 8))
+        ttk.Button(s, text="Save Session…", command=self._save_session).pack(side="right")
+        ttk.Button(s, text="Open Session…", command=self._open_session).pack(
+            side="right", padx=(0, 6))
 
     # ------ Right panel --------------------------------------------------
 
@@ -214,13 +274,16 @@ class App:
         self._table = ResultsTable(table_frame, on_select=self._on_student_select)
         self._table.grid(row=0, column=0, sticky="nsew")
 
+        self._outcomes = OutcomePanel(table_frame, query_callback=self._on_query)
+        self._outcomes.grid(row=1, column=0, sticky="ew", pady=(4, 0))
+
         # Detail panel
         detail_frame = ttk.LabelFrame(frame, text="Inspection", padding=4)
         detail_frame.grid(row=2, column=0, sticky="nsew", padx=4, pady=2)
         detail_frame.columnconfigure(0, weight=1)
         detail_frame.rowconfigure(0, weight=1)
 
-        self._detail = DetailPanel(detail_frame)
+        self._detail = DetailPanel(detail_frame, self._diffs)
         self._detail.grid(row=0, column=0, sticky="nsew")
 
         return frame
@@ -266,11 +329,23 @@ class App:
         if p:
             self._assignment_path.set(p)
 
+    def _browse_assignment_zip(self):
+        p = filedialog.askopenfilename(title="Select LMS Submissions Zip",
+                                       filetypes=[("Zip archives", "*.zip")])
+        if p:
+            self._assignment_path.set(p)
+
     def _browse_utility(self):
         p = filedialog.askdirectory(title="Select Utility Folder")
         if p:
             self._utility_path.set(p)
 
+    def _browse_profile(self):
+        p = filedialog.askopenfilename(title="Select Comparison Profile",
+                                       filetypes=[("JSON", "*.json"), ("All", "*.*")])
+        if p:
+            self._profile_path.set(p)
+
     # ------------------------------------------------------------------
     # Grading run
     # ------------------------------------------------------------------
@@ -284,32 +359,44 @@ class App:
         if not test_cases:
             messagebox.showerror("No test cases", "Add at least one test case.")
             return
+        matcher = self._load_matcher()
+        if matcher is None:
+            return
 
         self._is_running = True
         self._run_btn.config(state=tk.DISABLED)
+        self._reclassify_btn.config(state=tk.DISABLED)
         self._stop_btn.config(state=tk.NORMAL)
         self._table.clear()
         self._summary.clear()
+        self._outcomes.clear()
         self._detail.clear()
         self._results.clear()
+        self._close_session()
+        self._run_id = None
+        self._config = None
+        self._raw_batch = None
         self._status_var.set("Starting…")
 
-        thread = threading.Thread(target=self._grade_thread, args=(test_cases,), daemon=True)
+        if self._trace_run.get():
+            trace.start()
+        self._start_metrics()
+        thread = threading.Thread(target=self._grade_thread,
+                                  args=(test_cases, matcher), daemon=True)
         thread.start()
 
     def _stop(self):
+        if self._watch is not None:
+            self._stop_watch()
+            return
         self._is_running = False
         self._status_var.set("Stopped by user")
         self._run_btn.config(state=tk.NORMAL)
         self._stop_btn.config(state=tk.DISABLED)
 
-    def _grade_thread(self, test_cases: list[dict]):
+    def _grade_thread(self, test_cases: list[dict], matcher: ProfileMatcher):
         try:
-            runner = ScriptRunner(
-                timeout=Theme.TIMEOUT,
-                utility_path=self._utility_path.get(),
-                module_names=[m.strip() for m in self._module_names.get().split(",") if m.strip()],
-            )
+            runner = self._make_runner()
             mode            = self._mode.get()
             base_path       = self._base_path.get()
             assignment_path = self._assignment_path.get()
@@ -341,50 +428,543 @@ class App:
                 student_paths, test_cases, mode, assignment_path,
                 max_workers=max_workers,
                 progress_callback=progress_cb,
+                metrics=self._metrics,
             )
 
             if not self._is_running:
                 return
 
-            # Classify
-            self._set_status("Classifying results…")
-            results: list[StudentResult] = []
+            # Keep the raw output (compressed, once per distinct output) so
+            # the run can be reclassified without executing anything again
+            batch = RawBatch(base_raws, test_cases)
             for path in student_paths:
-                if not self._is_running:
-                    break
                 name = os.path.basename(path)
-                student_raws = all_raw.get(name, [])
-                if not student_raws:
-                    continue
-                sr = process_student(
-                    name=name,
-                    path=path,
-                    base_raws=base_raws,
-                    student_raws=student_raws,
-                    test_cases=test_cases,
-                    check_stdout=check_stdout,
-                )
-                results.append(sr)
+                if all_raw.get(name):
+                    batch.add(name, path, all_raw[name])
+            del all_raw
 
+            self._set_status("Classifying results…")
+            results = classify_batch(
+                batch, test_cases,
+                check_stdout=check_stdout,
+                matcher=matcher,
+                max_workers=max_workers,
+                on_results=lambda b: self._updates.extend("results", b, self._table.add),
+                should_stop=lambda: not self._is_running,
+            )
+
+            if self._is_running:
+                self._raw_batch = batch
+                results = self._record_run(results, test_cases, matcher)
             self._results = results
-            self.root.after(0, lambda: self._display_results(results))
+            self._updates.post(lambda: self._display_results(results))
+
+        except Exception as e:
+            msg = f"Error: {e}\n{traceback.format_exc()}"
+            self._set_status(msg)
+        finally:
+            self._finish_thread()
+
+    def _finish_thread(self):
+        """Re-enable the controls once a grading thread ends (worker thread)."""
+        self._is_running = False
+        tracer = trace.stop()
+        if tracer is not None and tracer.events:
+            self._save_trace(tracer)
+        reclassify = tk.NORMAL if self._raw_batch is not None else tk.DISABLED
+        def controls():
+            self._run_btn.config(state=tk.NORMAL)
+            self._reclassify_btn.config(state=reclassify)
+            self._stop_btn.config(state=tk.DISABLED)
+        self._updates.post(controls)
+
+    def _start_metrics(self):
+        """Show live throughput in the summary bar until the run ends."""
+        self._metrics.reset()
+        if self._metrics_job is not None:
+            self.root.after_cancel(self._metrics_job)
+        self._metrics_job = self.root.after(_METRICS_POLL_MS, self._poll_metrics)
+
+    def _poll_metrics(self):
+        self._metrics_job = None
+        self._summary.show_metrics(self._metrics.snapshot())
+        if self._is_running:
+            self._metrics_job = self.root.after(_METRICS_POLL_MS, self._poll_metrics)
+
+    def _serve_metrics(self, port: int):
+        """Expose run metrics for Prometheus on 127.0.0.1:port."""
+        exporter = MetricsExporter(self._metrics)
+        exporter.add_cache("diffs", lambda: (self._diffs.hits, self._diffs.misses))
+
+        def blob_stats():
+            batch = self._raw_batch
+            return (batch.blobs.hits, len(batch.blobs)) if batch is not None else (0, 0)
+        exporter.add_cache("blobs", blob_stats, per_run=True)      # a new store per run
+        exporter.add_cache("staging", lambda: (self._staging.reused, self._staging.copied))
+        try:
+            port = exporter.serve(port)
+        except OSError as e:
+            exporter.close()
+            self._set_status(f"Metrics endpoint unavailable on port {port}: {e}")
+            return
+        self._set_status(f"Serving metrics on http://127.0.0.1:{port}/metrics")
+
+    def _save_trace(self, tracer: trace.Tracer):
+        """Write a run's spans as a Chrome trace and show the per-stage
+        latency histogram (worker thread)."""
+        folder = os.path.join(os.path.dirname(DEFAULT_STORE_PATH), "traces")
+        path = os.path.join(folder, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        summary = tracer.format_histogram()
+        try:
+            os.makedirs(folder, exist_ok=True)
+            tracer.write_chrome_trace(path)
+            with open(path[:-len(".json")] + ".txt", "w", encoding="utf-8") as f:
+                f.write(summary + "\n")
+        except OSError as e:
+            self._set_status(f"Could not save trace: {e}")
+            return
+        text = f"{summary}\n\nChrome trace (chrome://tracing, ui.perfetto.dev):\n{path}"
+        self._updates.post(lambda: _show_text_dialog(self.root, "Stage latency", text))
+
+    # ------------------------------------------------------------------
+    # Watch mode
+    # ------------------------------------------------------------------
+
+    def _toggle_watch(self):
+        """Grade submissions as they arrive, until stopped.
+
+        The base solution runs once; after grading what is already in the
+        assignment folder, each new or changed submission is graded once it
+        has stopped changing, and its row and run-history entry replaced.
+        """
+        if self._watch is not None:
+            self._stop_watch()
+            return
+        if self._is_running:
+            return
+        if not self._base_path.get() or not self._assignment_path.get():
+            messagebox.showerror("Missing paths",
+                                 "Please set both Base Solution and Assignment Path.")
+            return
+        test_cases = self._get_test_cases()
+        if not test_cases:
+            messagebox.showerror("No test cases", "Add at least one test case.")
+            return
+        if is_archive(self._assignment_path.get()):
+            messagebox.showerror("Watch mode", "Watch mode needs an assignment folder, "
+                                 "not a zip export.")
+            return
+        matcher = self._load_matcher()
+        if matcher is None:
+            return
+
+        self._is_running = True
+        self._run_btn.config(state=tk.DISABLED)
+        self._reclassify_btn.config(state=tk.DISABLED)
+        self._stop_btn.config(state=tk.NORMAL)
+        self._watch_btn.config(text="■ Stop Watching")
+        self._table.clear()
+        self._summary.clear()
+        self._outcomes.clear()
+        self._detail.clear()
+        self._results = []
+        self._close_session()
+        self._run_id = None
+        self._raw_batch = None
+        self._config = self._run_config(test_cases, matcher)
+        self._status_var.set("Running base solution…")
+
+        grader = self._watch = WatchGrader(
+            self._make_runner(), self._base_path.get(), self._assignment_path.get(),
+            self._mode.get(), test_cases,
+            on_result=self._on_watched,
+            check_stdout=self._check_stdout.get(),
+            matcher=matcher,
+            max_workers=self._max_workers.get(),
+            metrics=self._metrics,
+        )
+        self._start_metrics()
+        threading.Thread(target=self._watch_thread, args=(grader,), daemon=True).start()
 
+    def _watch_thread(self, grader: WatchGrader):
+        store = self._run_store()
+        if store is not None:
+            try:
+                self._run_id = store.save_run(self._config, [],
+                                              label=f"{self._run_label()} (watch)")
+            except sqlite3.Error as e:
+                self._set_status(f"Could not save run history: {e}")
+        try:
+            started = grader.start()
+        except Exception as e:
+            self._set_status(f"Error: {e}\n{traceback.format_exc()}")
+            started = False
+        if not started:
+            def failed():
+                if self._watch is grader:
+                    self._stop_watch()
+                    self._set_status("ERROR: Base solution failed to run.")
+            self._updates.post(failed)
+            return
+        how = "inotify" if grader.watcher.using_inotify else "polling"
+        self._set_status(f"Watching {self._assignment_path.get()} ({how})…")
+
+    def _on_watched(self, result: StudentResult):
+        """Record one graded submission (watch worker thread)."""
+        store, run_id = self._store, self._run_id
+        if store is not None and run_id is not None:
+            try:
+                store.put_student(run_id, result)
+            except sqlite3.Error as e:
+                self._set_status(f"Could not save run history: {e}")
+        self._updates.extend("watched", [result], self._show_watched)
+
+    def _show_watched(self, results: list[StudentResult]):
+        if self._watch is None:
+            return
+        by_name = {r.name: r for r in self._results}
+        by_name.update((r.name, r) for r in results)
+        self._results = list(by_name.values())
+        self._table.add(results)
+        self._summary.update(self._results)
+        selected = self._detail.result
+        if selected is not None and selected.name in {r.name for r in results}:
+            self._detail.show(by_name[selected.name])
+        self._set_progress(f"{len(self._results)} graded — last: {results[-1].name}")
+
+    def _stop_watch(self):
+        grader, self._watch = self._watch, None
+        if grader is not None:
+            grader.stop()
+        self._is_running = False
+        self._run_btn.config(state=tk.NORMAL)
+        self._stop_btn.config(state=tk.DISABLED)
+        self._watch_btn.config(text="👁 Watch")
+        self._outcomes.update(self._results)
+        n = len(self._results)
+        avg = sum(r.score for r in self._results) / n if n else 0
+        self._set_status(f"Stopped watching — {n} students graded, avg {avg:.1f}%")
+        self._set_progress("")
+
+    # ------------------------------------------------------------------
+    # Reclassification
+    # ------------------------------------------------------------------
+
+    def _reclassify(self):
+        """Grade the last run again under the current settings.
+
+        Classification is repeated over the cached program output, so
+        toggling stdout grading, editing an expected file or switching the
+        comparison profile takes seconds rather than a full run. Tests whose
+        stdin or filename were edited are executed again, and only those.
+        """
+        batch = self._raw_batch
+        if self._is_running or batch is None:
+            return
+        test_cases = self._get_test_cases()
+        changed = batch.changed_tests(test_cases)
+        if changed is None:
+            messagebox.showerror(
+                "Test cases changed",
+                "Test cases were added or removed since the last run. "
+                "Use Run Autograder instead.")
+            return
+        matcher = self._load_matcher()
+        if matcher is None:
+            return
+
+        self._is_running = True
+        self._run_btn.config(state=tk.DISABLED)
+        self._reclassify_btn.config(state=tk.DISABLED)
+        self._stop_btn.config(state=tk.NORMAL)
+        self._status_var.set(f"Reclassifying {len(batch.students)} students…")
+
+        if self._trace_run.get():
+            trace.start()
+        self._start_metrics()
+        thread = threading.Thread(target=self._reclassify_thread,
+                                  args=(batch, test_cases, changed, matcher), daemon=True)
+        thread.start()
+
+    def _reclassify_thread(self, batch: RawBatch, test_cases: list[dict],
+                           changed: list[int], matcher: ProfileMatcher):
+        try:
+            start = time.perf_counter()
+            if changed and not self._rerun_tests(batch, test_cases, changed):
+                return
+            results = classify_batch(
+                batch, test_cases,
+                check_stdout=self._check_stdout.get(),
+                matcher=matcher,
+                max_workers=self._max_workers.get(),
+                should_stop=lambda: not self._is_running,
+            )
+            if not self._is_running:
+                return
+            results = self._record_run(results, test_cases, matcher)
+            self._results = results
+            elapsed = time.perf_counter() - start
+            self._updates.post(lambda: self._show_reclassified(results, elapsed))
         except Exception as e:
             msg = f"Error: {e}\n{traceback.format_exc()}"
             self._set_status(msg)
         finally:
-            self._is_running = False
-            self.root.after(0, lambda: self._run_btn.config(state=tk.NORMAL))
-            self.root.after(0, lambda: self._stop_btn.config(state=tk.DISABLED))
+            self._finish_thread()
+
+    def _rerun_tests(self, batch: RawBatch, test_cases: list[dict],
+                     changed: list[int]) -> bool:
+        """Execute just the edited tests for everyone and merge the output
+        into batch (worker thread). False if stopped before the merge."""
+        runner          = self._make_runner()
+        mode            = self._mode.get()
+        assignment_path = self._assignment_path.get()
+        max_workers     = self._max_workers.get()
+        label = ", ".join(str(i + 1) for i in changed)
+        plural = "s" if len(changed) > 1 else ""
+
+        self._set_status(f"Re-running test{plural} {label} on the base solution…")
+        base_raws = runner.run_base_solution(
+            self._base_path.get(), test_cases, mode, assignment_path, test_indices=changed)
+
+        def progress_cb(name, done, total_):
+            if self._is_running:
+                self._set_progress(f"{done}/{total_} — last: {name}")
+
+        self._set_status(f"Re-running test{plural} {label} for {len(batch.students)} "
+                         f"students (×{max_workers} parallel)…")
+        new_raws = runner.run_batch(
+            [path for _, path, _ in batch.students], test_cases, mode, assignment_path,
+            max_workers=max_workers,
+            progress_callback=progress_cb,
+            test_indices=changed,
+            metrics=self._metrics,
+        )
+        if not self._is_running:
+            return False
+
+        for k, i in enumerate(changed):
+            batch.replace_test(i, test_cases[i], base_raws[k],
+                               {name: raws[k] for name, raws in new_raws.items()})
+        self._set_status(f"Reclassifying {len(batch.students)} students…")
+        return True
+
+    def _show_reclassified(self, results: list[StudentResult], elapsed: float):
+        selected = self._detail.result
+        self._display_results(results)
+        if selected is not None:
+            current = next((r for r in results if r.name == selected.name), None)
+            if current is not None:
+                self._detail.show(current)
+            else:
+                self._detail.clear()
+        n = len(results)
+        avg = sum(r.score for r in results) / n if n else 0
+        self._set_status(f"Reclassified {n} students in {elapsed:.1f}s, avg {avg:.1f}%")
 
     def _display_results(self, results: list[StudentResult]):
         self._table.load(results)
         self._summary.update(results)
+        self._outcomes.update(results)
         n = len(results)
         avg = sum(r.score for r in results) / n if n else 0
         self._set_status(f"Done — {n} students graded, avg {avg:.1f}%")
         self._set_progress("")
 
+    def _record_run(self, results: list[StudentResult], test_cases: list[dict],
+                    matcher: ProfileMatcher) -> list[StudentResult]:
+        """Save a finished run to the run store (worker thread).
+
+        Returns the results as read back from the store, whose outputs live
+        in the database rather than in memory; or the given results if the
+        run could not be saved.
+        """
+        config = self._config = self._run_config(test_cases, matcher)
+        store = self._run_store()
+        if store is None:
+            return results
+        try:
+            self._run_id = store.save_run(config, results, label=self._run_label())
+        except sqlite3.Error as e:
+            self._set_status(f"Could not save run history: {e}")
+            return results
+        return store.load_run(self._run_id)
+
+    def _run_config(self, test_cases: list[dict], matcher: ProfileMatcher) -> dict:
+        return {
+            "mode":            self._mode.get(),
+            "base_path":       self._base_path.get(),
+            "assignment_path": self._assignment_path.get(),
+            "module_names":    self._module_names.get(),
+            "utility_path":    self._utility_path.get(),
+            "profile_path":    self._profile_path.get(),
+            "check_stdout":    self._check_stdout.get(),
+            "max_workers":     self._max_workers.get(),
+            "profile":         dataclasses.asdict(matcher.profile),
+            "test_cases":      test_cases,
+        }
+
+    def _run_label(self) -> str:
+        return os.path.basename(os.path.normpath(self._assignment_path.get())) or "Run"
+
+    def _run_store(self) -> Optional[RunStore]:
+        if self._store is None:
+            try:
+                self._store = RunStore(DEFAULT_STORE_PATH)
+            except (OSError, sqlite3.Error) as e:
+                self._set_status(f"Run history unavailable ({DEFAULT_STORE_PATH}): {e}")
+        return self._store
+
+    def _open_run(self):
+        if self._is_running:
+            return
+        store = self._run_store()
+        if store is None:
+            return
+        runs = store.runs()
+        if not runs:
+            messagebox.showinfo("No saved runs", "Finished runs are saved automatically.")
+            return
+        run_id = _pick_run_dialog(self.root, runs)
+        if run_id is None:
+            return
+        results = store.load_run(run_id)
+        self._detail.clear()
+        self._close_session()
+        self._run_id = run_id
+        self._config = store.config(run_id)
+        self._raw_batch = None
+        self._reclassify_btn.config(state=tk.DISABLED)
+        self._results = results
+        self._table.clear()
+        self._display_results(results)
+
+    # ------------------------------------------------------------------
+    # Session files
+    # ------------------------------------------------------------------
+
+    def _save_session(self):
+        if not self._results:
+            messagebox.showinfo("Nothing to save", "Run the autograder first.")
+            return
+        config = self._config
+        if config is None:
+            matcher = self._load_matcher()
+            if matcher is None:
+                return
+            config = self._run_config(self._get_test_cases(), matcher)
+        path = filedialog.asksaveasfilename(
+            title="Save Session",
+            defaultextension=SESSION_SUFFIX,
+            filetypes=[("Autograder session", f"*{SESSION_SUFFIX}"), ("All", "*.*")],
+        )
+        if not path:
+            return
+        self._set_status("Saving session…")
+        try:
+            save_session(path, config, self._results, label=self._run_label())
+        except (OSError, sqlite3.Error) as e:
+            messagebox.showerror("Could not save session", str(e))
+            self._set_status("Ready")
+            return
+        self._set_status(f"Session saved to {path}")
+
+    def _open_session(self):
+        """Reopen a saved session: settings, test cases and results.
+
+        The table and summary come from the session's student index straight
+        away; per-test results are read when a student is inspected, and for
+        the outcome heatmap in the background.
+        """
+        if self._is_running:
+            return
+        path = filedialog.askopenfilename(
+            title="Open Session",
+            filetypes=[("Autograder session", f"*{SESSION_SUFFIX}"), ("All", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            store, run_id, results = open_session(path)
+            config = store.config(run_id)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            messagebox.showerror("Could not open session", str(e))
+            return
+
+        self._detail.clear()
+        self._close_session()
+        self._session = store
+        self._run_id = run_id
+        self._config = config
+        self._raw_batch = None
+        self._reclassify_btn.config(state=tk.DISABLED)
+        self._apply_config(config)
+
+        self._results = results
+        self._table.clear()
+        self._table.load(results)
+        self._summary.update(results)
+        self._outcomes.clear()
+        n = len(results)
+        avg = sum(r.score for r in results) / n if n else 0
+        self._set_status(f"Session {os.path.basename(path)} — {n} students, avg {avg:.1f}%")
+        self._set_progress("")
+
+        def index_outcomes():
+            try:
+                matrix = OutcomeMatrix(results)
+            except sqlite3.Error:       # session closed meanwhile
+                return
+            self._updates.post(lambda: self._results is results
+                               and self._outcomes.show_matrix(matrix))
+
+        threading.Thread(target=index_outcomes, daemon=True).start()
+
+    def _close_session(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _apply_config(self, config: dict):
+        """Restore the left panel from a saved run configuration."""
+        for var, key in ((self._mode, "mode"),
+                         (self._base_path, "base_path"),
+                         (self._assignment_path, "assignment_path"),
+                         (self._module_names, "module_names"),
+                         (self._utility_path, "utility_path"),
+                         (self._profile_path, "profile_path"),
+                         (self._check_stdout, "check_stdout"),
+                         (self._max_workers, "max_workers")):
+            if key in config:
+                var.set(config[key])
+        test_cases = config.get("test_cases")
+        if test_cases:
+            for tc in self._test_cases:
+                tc.destroy()
+            self._test_cases.clear()
+            for data in test_cases:
+                self._add_test_case()
+                self._test_cases[-1].set_data(data)
+
+    def _make_runner(self) -> ScriptRunner:
+        return ScriptRunner(
+            timeout=Theme.TIMEOUT,
+            utility_path=self._utility_path.get(),
+            module_names=[m.strip() for m in self._module_names.get().split(",") if m.strip()],
+            staging=self._staging if self._stage_local.get() else None,
+            scanner=self._scanner,
+        )
+
+    def _load_matcher(self) -> Optional[ProfileMatcher]:
+        """Compile the configured comparison profile once for a whole batch."""
+        path = self._profile_path.get().strip()
+        if not path:
+            return DEFAULT_MATCHER
+        try:
+            return ProfileMatcher(load_profile(path))
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Invalid comparison profile", str(e))
+            return None
+
     # ------------------------------------------------------------------
     # Single submission test
     # ------------------------------------------------------------------
@@ -398,28 +978,37 @@ class App:
         if not test_cases:
             messagebox.showerror("No test cases", "Add at least one test case.")
             return
+        matcher = self._load_matcher()
+        if matcher is None:
+            return
 
-        runner = ScriptRunner(
-            timeout=Theme.TIMEOUT,
-            utility_path=self._utility_path.get(),
-            module_names=[m.strip() for m in self._module_names.get().split(",") if m.strip()],
-        )
+        runner = self._make_runner()
         mode            = self._mode.get()
         assignment_path = self._assignment_path.get()
-        student_paths   = runner.find_student_submissions(assignment_path, mode)
-
-        if not student_paths:
-            messagebox.showerror("No submissions", "No student submissions found.")
-            return
+        self._set_status("Looking for submissions…")
 
-        path = _pick_submission_dialog(self.root, student_paths)
-        if not path:
-            return
-
-        name = os.path.basename(path)
-        self._set_status(f"Testing {name}…")
+        def find():
+            # Scanning hashes every file, possibly on a network share
+            try:
+                student_paths = runner.find_student_submissions(assignment_path, mode)
+            except OSError as e:
+                student_paths = []
+                self._set_status(f"ERROR: {e}")
+            self._updates.post(lambda: pick(student_paths))
+
+        def pick(student_paths: list[str]):
+            if not student_paths:
+                messagebox.showerror("No submissions", "No student submissions found.")
+                return
+            path = _pick_submission_dialog(self.root, student_paths)
+            if not path:
+                self._set_status("Ready")
+                return
+            self._set_status(f"Testing {os.path.basename(path)}…")
+            threading.Thread(target=run, args=(path,), daemon=True).start()
 
-        def run():
+        def run(path: str):
+            name = os.path.basename(path)
             base_raws    = runner.run_base_solution(
                 self._base_path.get(), test_cases, mode, assignment_path)
             student_raws = runner.run_student(path, test_cases, mode, assignment_path)
@@ -427,15 +1016,22 @@ class App:
                 name=name, path=path,
                 base_raws=base_raws, student_raws=student_raws,
                 test_cases=test_cases, check_stdout=self._check_stdout.get(),
+                matcher=matcher,
             )
-            self.root.after(0, lambda: self._show_single(sr))
+            self._updates.post(lambda: self._show_single(sr))
 
-        threading.Thread(target=run, daemon=True).start()
+        threading.Thread(target=find, daemon=True).start()
 
     def _show_single(self, sr: StudentResult):
         self._results = [sr]
+        self._close_session()
+        self._run_id = None
+        self._config = None
+        self._raw_batch = None
+        self._reclassify_btn.config(state=tk.DISABLED)
         self._table.load([sr])
         self._summary.update([sr])
+        self._outcomes.update([sr])
         self._detail.show(sr)
         self._set_status(
             f"Single test — {sr.name}: {sr.category.label} ({sr.display_score})")
@@ -446,10 +1042,14 @@ class App:
 
     def _on_student_select(self, result: StudentResult):
         self._detail.show(result)
+        self._detail.prefetch(self._table.neighbours(result.name))
 
     def _on_filter(self, category: Optional[str]):
         self._table.apply_filter(category)
 
+    def _on_query(self, names: Optional[set[str]]):
+        self._table.apply_name_filter(names)
+
     # ------------------------------------------------------------------
     # Report saving
     # ------------------------------------------------------------------
@@ -465,7 +1065,11 @@ class App:
         )
         if not path:
             return
-        report = _build_report(self._results)
+        store = self._session or self._store
+        if self._run_id is not None and store is not None:
+            report = _build_report(store.load_run(self._run_id, with_tests=False))
+        else:
+            report = _build_report(self._results)
         with open(path, "w", encoding="utf-8") as f:
             f.write(report)
         messagebox.showinfo("Saved", f"Report saved to:\n{path}")
@@ -495,10 +1099,10 @@ class App:
                 pass
 
     def _set_status(self, msg: str):
-        self.root.after(0, lambda: self._status_var.set(msg))
+        self._updates.post(lambda: self._status_var.set(msg), key="status")
 
     def _set_progress(self, msg: str):
-        self.root.after(0, lambda: self._progress_var.set(msg))
+        self._updates.post(lambda: self._progress_var.set(msg), key="progress")
 
 
 # ---------------------------------------------------------------------------
@@ -585,6 +1189,20 @@ class _TestCaseWidget(ttk.Frame):
         txt = self._input.get("1.0", "end").strip()
         return bool(txt) and txt != _PLACEHOLDER_INPUT
 
+    def set_data(self, data: dict):
+        """Fill the fields from a get_data()-style dict."""
+        for widget, attr, placeholder, text in (
+            (self._input, "_has_input", _PLACEHOLDER_INPUT, "\n".join(data.get("input", []))),
+            (self._file_content, "_has_file", _PLACEHOLDER_FILE,
+             data.get("expected_file_content", "")),
+        ):
+            widget.delete("1.0", "end")
+            widget.insert("end", text or placeholder)
+            widget.configure(fg=Theme.FG if text else Theme.FG_DIM)
+            setattr(self, attr, bool(text))
+        self._fname.delete(0, "end")
+        self._fname.insert(0, data.get("expected_filename", ""))
+
     def get_data(self) -> dict:
         raw_input = self._input.get("1.0", "end").strip()
         if raw_input == _PLACEHOLDER_INPUT:
@@ -638,6 +1256,60 @@ def _pick_submission_dialog(root: tk.Tk, paths: list[str]) -> Optional[str]:
     return chosen[0]
 
 
+def _show_text_dialog(root: tk.Tk, title: str, text: str):
+    dialog = tk.Toplevel(root)
+    dialog.title(title)
+    dialog.geometry("760x480")
+    dialog.transient(root)
+    dialog.configure(bg=Theme.BG)
+
+    body = scrolledtext.ScrolledText(dialog, font=Theme.FONT_MONO, wrap="none",
+                                     bg=Theme.PANEL, fg=Theme.FG,
+                                     borderwidth=0, relief="flat")
+    body.pack(fill="both", expand=True, padx=12, pady=(12, 4))
+    body.insert("end", text)
+    body.configure(state="disabled")
+    ttk.Button(dialog, text="Close", command=dialog.destroy).pack(pady=8)
+
+
+def _pick_run_dialog(root: tk.Tk, runs: list[RunInfo]) -> Optional[int]:
+    dialog = tk.Toplevel(root)
+    dialog.title("Open Run")
+    dialog.geometry("480x320")
+    dialog.transient(root)
+    dialog.grab_set()
+    dialog.configure(bg=Theme.BG)
+
+    ttk.Label(dialog, text="Choose a past run:").pack(pady=(12, 4), padx=12)
+
+    lb = tk.Listbox(dialog, font=Theme.FONT_MONO,
+                    bg=Theme.PANEL, fg=Theme.FG,
+                    selectbackground=Theme.SEL_BG,
+                    borderwidth=0, relief="flat")
+    lb.pack(fill="both", expand=True, padx=12, pady=4)
+    for run in runs:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run.created))
+        lb.insert("end", f"{when}  {run.label}  ({run.students} students, "
+                         f"avg {run.avg_score:.1f}%)")
+
+    chosen = [None]
+
+    def ok():
+        sel = lb.curselection()
+        if sel:
+            chosen[0] = runs[sel[0]].id
+        dialog.destroy()
+
+    lb.bind("<Double-Button-1>", lambda e: ok())
+    btn_row = ttk.Frame(dialog)
+    btn_row.pack(pady=8)
+    ttk.Button(btn_row, text="Open", command=ok).pack(side="left", padx=6)
+    ttk.Button(btn_row, text="Cancel", command=dialog.destroy).pack(side="left")
+
+    dialog.wait_window()
+    return chosen[0]
+
+
 def _build_report(results: list[StudentResult]) -> str:
     from engine.models import StudentCategory
     lines = ["# Autograder Report\n"]
@@ -1,10 +1,15 @@
 """Detail panel: side-by-side output inspector for a selected student.
 
 Shows per-test-case comparisons with:
-  - Color-coded diff (base vs student stdout)
+  - Color-coded diff (base vs student stdout), rendered a window at a time
+    with jumps between hunks (see ui.diff_view)
   - Semantic value extraction highlighting
   - File output diff inline
   - Prev / Next test case navigation
+
+Diffs come from a DiffCache: the test on screen is computed first on a
+background thread, and the student's other tests (plus whatever the caller
+asks to prefetch) are computed behind it, so navigation renders from cache.
 """
 
 from __future__ import annotations
@@ -13,17 +18,21 @@ from tkinter import ttk
 from typing import Optional
 
 from ui.theme import Theme
-from engine.comparator import unified_diff_lines
+from ui.diff_cache import DiffCache
+from ui.diff_view import DiffView
+from engine.blobs import resolve
 from engine.models import MatchTier, StudentResult, TestResult
 
 
 class DetailPanel(ttk.Frame):
     """Right-side panel that shows per-test details for a selected student."""
 
-    def __init__(self, parent: tk.Widget):
+    def __init__(self, parent: tk.Widget, diff_cache: Optional[DiffCache] = None):
         super().__init__(parent, style="Panel.TFrame")
         self._result: Optional[StudentResult] = None
         self._test_idx: int = 0
+        self._diff_cache = diff_cache or DiffCache()
+        self._render_token = 0
         self._build()
 
     # ------------------------------------------------------------------
@@ -36,10 +45,26 @@ class DetailPanel(ttk.Frame):
         self._test_idx = 0
         self._render_header()
         self._render_test()
+        self.prefetch([result])
+
+    @property
+    def result(self) -> Optional[StudentResult]:
+        """The student currently shown, if any."""
+        return self._result
+
+    def prefetch(self, results: list[StudentResult]):
+        """Compute diffs for these students' tests in the background.
+
+        Stored outputs are decompressed there too, not on the Tk thread.
+        """
+        for r in results:
+            self._diff_cache.prefetch_from(
+                lambda r=r: [pair for tr in r.test_results for pair in _diff_pairs(tr)])
 
     def clear(self):
         self._result = None
         self._test_idx = 0
+        self._render_token += 1
         self._header_var.set("Select a student to inspect")
         self._clear_body()
 
@@ -139,16 +164,39 @@ class DetailPanel(ttk.Frame):
         self._next_btn.config(state=tk.NORMAL if self._test_idx < n - 1 else tk.DISABLED)
 
         tr = tests[self._test_idx]
+        self._render_token += 1
+        token = self._render_token
+        futures = [self._diff_cache.request(b, s) for b, s in _diff_pairs(tr)]
+        if all(f.done() for f in futures):
+            self._clear_body()
+            self._build_test_view(tr, [_diff_or_note(f) for f in futures])
+            return
+
+        self._clear_body()
+        tk.Label(self._scroll_frame, text="Computing diff…",
+                 bg=Theme.PANEL, fg=Theme.FG_DIM, font=Theme.FONT_SMALL
+                 ).grid(row=0, column=0, sticky="w", padx=4, pady=4)
+        self._await_diffs(token, tr, futures)
+
+    def _await_diffs(self, token: int, tr: TestResult, futures: list):
+        """Poll from the Tk thread until the background diffs are ready."""
+        if token != self._render_token:
+            return  # user navigated away; a newer render owns the body
+        if not all(f.done() for f in futures):
+            self.after(30, lambda: self._await_diffs(token, tr, futures))
+            return
         self._clear_body()
-        self._build_test_view(tr)
+        self._build_test_view(tr, [_diff_or_note(f) for f in futures])
 
     def _clear_body(self):
         for w in self._scroll_frame.winfo_children():
             w.destroy()
 
-    def _build_test_view(self, tr: TestResult):
+    def _build_test_view(self, tr: TestResult, diffs: list[list[tuple[str, str]]]):
+        """Build widgets for one test; diffs are in _diff_pairs(tr) order."""
         frame = self._scroll_frame
         row = 0
+        diffs = iter(diffs)
 
         # ---- Status badge ----
         tier_color = _tier_color(tr.match_tier)
@@ -178,11 +226,8 @@ class DetailPanel(ttk.Frame):
         # ---- Side-by-side stdout diff ----
         _section_label(frame, row, "Stdout  (Base  ↔  Student)")
         row += 1
-        diff_frame = ttk.Frame(frame, style="Panel.TFrame")
-        diff_frame.columnconfigure(0, weight=1)
-        diff_frame.columnconfigure(1, weight=1)
-        diff_frame.grid(row=row, column=0, columnspan=2, sticky="ew", pady=(0, 8))
-        self._build_diff(diff_frame, tr)
+        DiffView(frame, next(diffs)).grid(
+            row=row, column=0, columnspan=2, sticky="ew", pady=(0, 8))
         row += 1
 
         # ---- Semantic values ----
@@ -195,14 +240,11 @@ class DetailPanel(ttk.Frame):
             row += 1
 
         # ---- File output ----
-        if tr.base_files or tr.student_files:
+        if tr.base_files or tr.files_blob:
             _section_label(frame, row, "File Output")
             row += 1
-            for fname in sorted(set(list(tr.base_files.keys()) + list(tr.student_files.keys()))):
+            for fname in _file_names(tr):
                 b_content = tr.base_files.get(fname, "")
-                s_content = tr.student_files.get(fname, "")
-                b_txt = b_content if isinstance(b_content, str) else repr(b_content)
-                s_txt = s_content if isinstance(s_content, str) else repr(s_content)
 
                 tk.Label(frame, text=f"  {fname}",
                          bg=Theme.PANEL, fg=Theme.FG_DIM,
@@ -214,12 +256,8 @@ class DetailPanel(ttk.Frame):
                     _text_block(frame, row, f"[not generated]",
                                 fg=Theme.CRASH, height=2)
                 else:
-                    file_diff_frame = ttk.Frame(frame, style="Panel.TFrame")
-                    file_diff_frame.columnconfigure(0, weight=1)
-                    file_diff_frame.columnconfigure(1, weight=1)
-                    file_diff_frame.grid(row=row, column=0, columnspan=2,
-                                         sticky="ew", pady=(0, 4))
-                    self._build_raw_diff(file_diff_frame, b_txt, s_txt)
+                    DiffView(frame, next(diffs)).grid(
+                        row=row, column=0, columnspan=2, sticky="ew", pady=(0, 4))
                 row += 1
 
             if tr.file_mismatch_details:
@@ -230,52 +268,6 @@ class DetailPanel(ttk.Frame):
                         row=row, column=0, columnspan=2, sticky="w")
                     row += 1
 
-    def _build_diff(self, parent: ttk.Frame, tr: TestResult):
-        """Side-by-side colored diff of base vs student stdout."""
-        self._build_raw_diff(parent, tr.base_stdout or "", tr.student_stdout or "")
-
-    def _build_raw_diff(self, parent: ttk.Frame, base_txt: str, student_txt: str):
-        diff = unified_diff_lines(base_txt, student_txt)
-
-        base_col    = tk.Text(parent, wrap="none", font=Theme.FONT_MONO,
-                               bg=Theme.ENTRY_BG, fg=Theme.FG,
-                               relief="flat", height=min(20, max(4, len(diff) + 2)),
-                               state="disabled")
-        student_col = tk.Text(parent, wrap="none", font=Theme.FONT_MONO,
-                               bg=Theme.ENTRY_BG, fg=Theme.FG,
-                               relief="flat", height=min(20, max(4, len(diff) + 2)),
-                               state="disabled")
-        base_col.grid(row=0, column=0, sticky="nsew", padx=(0, 2))
-        student_col.grid(row=0, column=1, sticky="nsew")
-
-        base_col.tag_configure("delete", background=Theme.DIFF_DEL,
-                                foreground=Theme.DIFF_DEL_FG)
-        base_col.tag_configure("equal",  foreground=Theme.DIFF_EQ_FG)
-
-        student_col.tag_configure("insert", background=Theme.DIFF_ADD,
-                                   foreground=Theme.DIFF_ADD_FG)
-        student_col.tag_configure("equal",  foreground=Theme.DIFF_EQ_FG)
-
-        base_col.config(state="normal")
-        student_col.config(state="normal")
-
-        for tag, line in diff:
-            if tag == "equal":
-                base_col.insert("end",    line + "\n", "equal")
-                student_col.insert("end", line + "\n", "equal")
-            elif tag == "delete":
-                base_col.insert("end",    line + "\n", "delete")
-                student_col.insert("end", "\n")          # blank placeholder
-            elif tag == "insert":
-                base_col.insert("end",    "\n")          # blank placeholder
-                student_col.insert("end", line + "\n", "insert")
-            elif tag == "replace":
-                base_col.insert("end",    line + "\n", "delete")
-                student_col.insert("end", line + "\n", "insert")
-
-        base_col.config(state="disabled")
-        student_col.config(state="disabled")
-
     # ------------------------------------------------------------------
     # Scroll helpers
     # ------------------------------------------------------------------
@@ -297,10 +289,37 @@ class DetailPanel(ttk.Frame):
 # Helpers
 # ---------------------------------------------------------------------------
 
+def _file_names(tr: TestResult) -> list[str]:
+    return sorted(set(tr.base_files) | set(tr.files_blob))
+
+
+def _as_text(content) -> str:
+    return content if isinstance(content, str) else repr(content)
+
+
+def _diff_pairs(tr: TestResult) -> list[tuple[str, str]]:
+    """(base, student) texts diffed by the test view, in display order."""
+    pairs = [(tr.base_stdout or "", tr.student_stdout or "")]
+    for fname in _file_names(tr):
+        b_content = tr.base_files.get(fname, "")
+        if b_content is not None:
+            pairs.append((_as_text(b_content), _as_text(resolve(tr.files_blob.get(fname, "")))))
+    return pairs
+
+
+def _diff_or_note(future) -> list[tuple[str, str]]:
+    """A finished diff, or a one-line note in its place if computing it failed."""
+    try:
+        return future.result()
+    except Exception as e:
+        return [("equal", f"(diff unavailable: {e})")]
+
+
 def _tier_color(tier: MatchTier) -> str:
     return {
         MatchTier.EXACT:      Theme.PERFECT,
         MatchTier.NORMALIZED: Theme.PERFECT,
+        MatchTier.NUMERIC:    Theme.COSMETIC,
         MatchTier.SEMANTIC:   Theme.COSMETIC,
         MatchTier.FILE_ONLY:  Theme.PARTIAL,
         MatchTier.MISMATCH:   Theme.LOGIC_FAIL,
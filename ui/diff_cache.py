@@ -0,0 +1,132 @@
+"""Memoized, background-computed diffs for the Inspection panel.
+
+Diffs are keyed by a digest of the two texts, so identical outputs from
+different students (or the same student revisited) share one entry. A single
+worker thread computes them; requests for what is on screen jump ahead of
+prefetches for tests and students the user is likely to open next.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable
+
+from engine.comparator import unified_diff_lines
+
+
+# Priorities for the worker queue (lower runs first)
+PRIORITY_SHOW     = 0
+PRIORITY_PREFETCH = 1
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class DiffCache:
+    """Thread-safe LRU of unified_diff_lines() results.
+
+    Capacity is counted in diff lines rather than entries, so a handful of
+    huge outputs cannot pin an unbounded amount of memory.
+    """
+
+    def __init__(self, max_lines: int = 2_000_000):
+        self._max_lines = max_lines
+        self._lines = 0
+        self._entries: OrderedDict[tuple[bytes, bytes], list[tuple[str, str]]] = OrderedDict()
+        self._pending: dict[tuple[bytes, bytes], Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._worker = threading.Thread(target=self._work, name="diff-prefetch", daemon=True)
+        self._worker.start()
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+
+    def request(self, base: str, student: str,
+                priority: int = PRIORITY_SHOW) -> Future:
+        """Return a Future for the diff, computing it in the background."""
+        key = (_digest(base), _digest(student))
+        with self._lock:
+            diff = self._entries.get(key)
+            if priority == PRIORITY_SHOW:
+                if diff is not None:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            if diff is not None:
+                self._entries.move_to_end(key)
+                done: Future = Future()
+                done.set_result(diff)
+                return done
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = Future()
+            elif priority >= PRIORITY_PREFETCH:
+                return future  # already queued; don't queue a duplicate
+        # (Re)queue at this priority; the worker skips keys already resolved
+        self._queue.put((priority, next(self._seq), key, base, student))
+        return future
+
+    def prefetch(self, pairs: list[tuple[str, str]]):
+        """Queue low-priority computation of diffs that may be shown soon."""
+        for base, student in pairs:
+            self.request(base, student, PRIORITY_PREFETCH)
+
+    def prefetch_from(self, pairs: Callable[[], list[tuple[str, str]]]):
+        """prefetch(pairs()), with pairs() itself called on the worker, for
+        texts that are costly to produce (e.g. stored outputs to decompress)."""
+        self._queue.put((PRIORITY_PREFETCH, next(self._seq), None, pairs, None))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._lines = 0
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _work(self):
+        while True:
+            _, _, key, base, student = self._queue.get()
+            if key is None:                 # prefetch_from(): produce the pairs here
+                try:
+                    self.prefetch(base())
+                except Exception:
+                    pass                    # only a prefetch; shown tests ask again
+                continue
+            with self._lock:
+                future = self._pending.get(key)
+            if future is None or future.done():
+                continue
+            try:
+                diff = unified_diff_lines(base, student)
+            except Exception as e:  # surface to whoever waits on the future
+                with self._lock:
+                    self._pending.pop(key, None)
+                future.set_exception(e)
+                continue
+            with self._lock:
+                self._pending.pop(key, None)
+                self._store(key, diff)
+            future.set_result(diff)
+
+    def _store(self, key, diff):
+        """Insert under the lock, evicting least recently used entries."""
+        if key in self._entries:
+            return
+        self._entries[key] = diff
+        self._lines += len(diff)
+        while self._lines > self._max_lines and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._lines -= len(evicted)
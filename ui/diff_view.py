@@ -0,0 +1,271 @@
+"""Windowed side-by-side diff viewer for the Inspection panel.
+
+A 100k-line output used to be inserted into two tk.Text widgets one line at
+a time. DiffView keeps the full diff as plain rows and only puts a window
+of them (the visible region plus a margin) into the Text widgets:
+
+  - Rows are grouped into runs that share a tag, and each run's text is
+    joined once up front, so rendering a window is a single Text.insert()
+    call per column with the tag already attached to every chunk.
+  - An external scrollbar spans the whole diff. Scrolling inside the
+    window is native Text scrolling; getting near either edge, or dragging
+    the scrollbar elsewhere, re-renders the window around the new position.
+  - ▲ / ▼ buttons jump to the previous / next hunk of differences.
+"""
+
+from __future__ import annotations
+
+import tkinter as tk
+from bisect import bisect_left, bisect_right
+from tkinter import ttk
+
+from ui.theme import Theme
+
+
+# Rows kept above and below the visible region
+_MARGIN = 300
+
+# Re-render once the view is this close to an unloaded edge
+_EDGE = 60
+
+
+class DiffView(ttk.Frame):
+    """Two synchronized Text columns (base | student) over a windowed diff."""
+
+    def __init__(self, parent: tk.Widget, diff: list[tuple[str, str]]):
+        super().__init__(parent, style="Panel.TFrame")
+        self._layout = DiffLayout(diff)
+        self._n = self._layout.rows
+        self._hunks = self._layout.hunks
+        self._start = 0          # first row rendered in the Text widgets
+        self._end = 0            # one past the last rendered row
+        self._top = 0            # first visible row
+        self._syncing = False
+        self._rewindow_pending = False
+        self._build(visible=min(20, max(4, len(diff) + 2)))
+        self._render_window(0)
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    def _build(self, visible: int):
+        self.columnconfigure(0, weight=1)
+        self.columnconfigure(1, weight=1)
+
+        self._base_col    = self._make_text(visible)
+        self._student_col = self._make_text(visible)
+        self._base_col.grid(row=0, column=0, sticky="nsew", padx=(0, 2))
+        self._student_col.grid(row=0, column=1, sticky="nsew")
+
+        self._base_col.tag_configure("delete", background=Theme.DIFF_DEL,
+                                     foreground=Theme.DIFF_DEL_FG)
+        self._base_col.tag_configure("equal",  foreground=Theme.DIFF_EQ_FG)
+        self._student_col.tag_configure("insert", background=Theme.DIFF_ADD,
+                                        foreground=Theme.DIFF_ADD_FG)
+        self._student_col.tag_configure("equal",  foreground=Theme.DIFF_EQ_FG)
+
+        self._vsb = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        if self._n > visible:
+            self._vsb.grid(row=0, column=2, sticky="ns")
+
+        self._base_col.configure(yscrollcommand=lambda f, l: self._on_text_scroll(self._base_col))
+        self._student_col.configure(yscrollcommand=lambda f, l: self._on_text_scroll(self._student_col))
+
+        if self._hunks:
+            nav = ttk.Frame(self, style="Panel.TFrame")
+            nav.grid(row=1, column=0, columnspan=3, sticky="w", pady=(2, 0))
+            ttk.Button(nav, text="▲ Prev diff", width=11,
+                       command=self.prev_hunk).pack(side=tk.LEFT, padx=(0, 4))
+            ttk.Button(nav, text="Next diff ▼", width=11,
+                       command=self.next_hunk).pack(side=tk.LEFT)
+            self._hunk_var = tk.StringVar(value=f"{len(self._hunks)} hunk(s)")
+            tk.Label(nav, textvariable=self._hunk_var, bg=Theme.PANEL,
+                     fg=Theme.FG_DIM, font=Theme.FONT_SMALL).pack(side=tk.LEFT, padx=(8, 0))
+
+    def _make_text(self, height: int) -> tk.Text:
+        return tk.Text(self, wrap="none", font=Theme.FONT_MONO,
+                       bg=Theme.ENTRY_BG, fg=Theme.FG,
+                       relief="flat", height=height, state="disabled")
+
+    # ------------------------------------------------------------------
+    # Navigation
+    # ------------------------------------------------------------------
+
+    def next_hunk(self):
+        idx = bisect_right(self._hunks, self._top + 2)
+        if idx < len(self._hunks):
+            self._jump_to_hunk(idx)
+
+    def prev_hunk(self):
+        idx = bisect_left(self._hunks, self._top + 2) - 1
+        if idx >= 0:
+            self._jump_to_hunk(idx)
+
+    def _jump_to_hunk(self, idx: int):
+        self._hunk_var.set(f"hunk {idx + 1} / {len(self._hunks)}")
+        self._scroll_to(max(0, self._hunks[idx] - 2))
+
+    def _scroll_to(self, top: int):
+        top = max(0, min(top, self._n - 1))
+        if self._needs_window(top):
+            self._render_window(top)
+        self._syncing = True
+        try:
+            for col in (self._base_col, self._student_col):
+                col.yview(f"{top - self._start + 1}.0")
+        finally:
+            self._syncing = False
+        self._top = top
+        self._update_scrollbar()
+
+    # ------------------------------------------------------------------
+    # Scroll plumbing
+    # ------------------------------------------------------------------
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str = ""):
+        visible = self._visible_rows()
+        if action == "moveto":
+            top = int(float(amount) * self._n)
+        elif unit == "pages":
+            top = self._top + int(amount) * visible
+        else:
+            top = self._top + int(amount)
+        self._scroll_to(min(top, max(0, self._n - visible)))
+
+    def _on_text_scroll(self, source: tk.Text):
+        """A column scrolled natively: mirror it and re-window near edges."""
+        if self._syncing:
+            return
+        first = source.index("@0,0")
+        top = self._start + int(first.split(".")[0]) - 1
+        other = self._student_col if source is self._base_col else self._base_col
+        self._syncing = True
+        try:
+            other.yview(first)
+        finally:
+            self._syncing = False
+        self._top = top
+        self._update_scrollbar()
+
+        if self._needs_window(top) and not self._rewindow_pending:
+            self._rewindow_pending = True
+            self.after_idle(self._rewindow)
+
+    def _rewindow(self):
+        self._rewindow_pending = False
+        self._scroll_to(self._top)
+
+    def _needs_window(self, top: int) -> bool:
+        """True if rows around top are missing or close to a loaded edge."""
+        bottom = min(self._n, top + self._visible_rows())
+        if top < self._start or bottom > self._end:
+            return True
+        near_top = top - self._start < _EDGE and self._start > 0
+        near_end = self._end - bottom < _EDGE and self._end < self._n
+        return near_top or near_end
+
+    def _update_scrollbar(self):
+        if self._n:
+            lo = self._top / self._n
+            hi = min(1.0, (self._top + self._visible_rows()) / self._n)
+            self._vsb.set(lo, hi)
+
+    def _visible_rows(self) -> int:
+        return int(self._base_col.cget("height"))
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def _render_window(self, top: int):
+        start = max(0, top - _MARGIN)
+        end = min(self._n, top + self._visible_rows() + _MARGIN)
+        for col, column in ((self._base_col, self._layout.base),
+                            (self._student_col, self._layout.student)):
+            col.config(state="normal")
+            col.delete("1.0", "end")
+            args = column.insert_args(start, end)
+            if args:
+                col.insert("1.0", *args)
+            col.config(state="disabled")
+        self._start, self._end = start, end
+
+
+# ---------------------------------------------------------------------------
+# Row preparation (no Tk, so it can be tested headless)
+# ---------------------------------------------------------------------------
+
+class DiffLayout:
+    """Aligned rows of a unified_diff_lines() result, grouped for bulk insert.
+
+    Layout matches the original line-by-line renderer: a deleted line leaves
+    a blank, untagged placeholder on the student side and an inserted line a
+    blank on the base side, so both columns always have the same row count.
+    """
+
+    def __init__(self, diff: list[tuple[str, str]]):
+        base_rows: list[tuple[str, str]] = []
+        student_rows: list[tuple[str, str]] = []
+        self.hunks: list[int] = []      # rows where a non-equal stretch starts
+        prev_equal = True
+        for tag, line in diff:
+            if tag == "equal":
+                base_rows.append(("equal", line))
+                student_rows.append(("equal", line))
+            elif tag == "delete":
+                base_rows.append(("delete", line))
+                student_rows.append(("", ""))
+            elif tag == "insert":
+                base_rows.append(("", ""))
+                student_rows.append(("insert", line))
+            elif tag == "replace":
+                base_rows.append(("delete", line))
+                student_rows.append(("insert", line))
+            else:
+                continue
+            if tag != "equal" and prev_equal:
+                self.hunks.append(len(base_rows) - 1)
+            prev_equal = tag == "equal"
+        self.rows = len(base_rows)
+        self.base = _Column(base_rows)
+        self.student = _Column(student_rows)
+
+
+class _Column:
+    """One side of a DiffLayout: runs of consecutive rows sharing a tag."""
+
+    def __init__(self, rows: list[tuple[str, str]]):
+        self.starts: list[int] = []
+        self.tags: list[str] = []
+        self.lines: list[list[str]] = []
+        self.texts: list[str] = []      # each run pre-joined for the common case
+        i = 0
+        while i < len(rows):
+            tag = rows[i][0]
+            j = i
+            while j < len(rows) and rows[j][0] == tag:
+                j += 1
+            lines = [line for _, line in rows[i:j]]
+            self.starts.append(i)
+            self.tags.append(tag)
+            self.lines.append(lines)
+            self.texts.append("".join(line + "\n" for line in lines))
+            i = j
+
+    def insert_args(self, start: int, end: int) -> list[str]:
+        """Flat (text, tag, text, tag, …) Text.insert() args for rows [start, end)."""
+        args: list[str] = []
+        idx = max(0, bisect_right(self.starts, start) - 1)
+        while idx < len(self.starts) and self.starts[idx] < end:
+            run_start, lines = self.starts[idx], self.lines[idx]
+            lo = max(start, run_start) - run_start
+            hi = min(end, run_start + len(lines)) - run_start
+            if lo == 0 and hi == len(lines):
+                text = self.texts[idx]
+            else:
+                text = "".join(line + "\n" for line in lines[lo:hi])
+            if text:
+                args.extend((text, self.tags[idx]))
+            idx += 1
+        return args
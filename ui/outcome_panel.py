@@ -0,0 +1,135 @@
+"""Outcome query bar and per-test pass-rate heatmap.
+
+Layout:
+  Query: [fail:3 pass:5        ] [Apply] [Clear]   12 match
+  ▇ T1 92%  ▇ T2 40%  ▇ T3 100%  …
+
+Queries run against an OutcomeMatrix (engine.outcomes) built once per run,
+and the matching student names are handed to query_callback (None clears the
+filter). Clicking a heatmap cell queries the students who failed that test.
+"""
+
+from __future__ import annotations
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Optional
+
+from ui.theme import Theme
+from engine.models import StudentResult
+from engine.outcomes import OutcomeMatrix
+
+
+class OutcomePanel(ttk.Frame):
+    def __init__(self, parent: tk.Widget,
+                 query_callback: Callable[[Optional[set[str]]], None]):
+        super().__init__(parent, style="Panel.TFrame")
+        self._query_cb = query_callback
+        self._matrix: Optional[OutcomeMatrix] = None
+        self._build()
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+
+    def update(self, results: list[StudentResult]):
+        """Index a finished run and redraw the heatmap."""
+        self.show_matrix(OutcomeMatrix(results))
+
+    def show_matrix(self, matrix: OutcomeMatrix):
+        """Show a run indexed elsewhere (e.g. off the UI thread)."""
+        self._matrix = matrix
+        self._draw_heatmap()
+        if self._query_var.get().strip():
+            self._apply()
+
+    def clear(self):
+        self._matrix = None
+        self._heatmap.delete("all")
+        self._clear_query()
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    def _build(self):
+        self.columnconfigure(1, weight=1)
+
+        tk.Label(self, text="Query:", bg=Theme.PANEL, fg=Theme.FG_DIM,
+                 font=Theme.FONT_SMALL).grid(row=0, column=0, padx=(0, 4))
+        self._query_var = tk.StringVar()
+        entry = ttk.Entry(self, textvariable=self._query_var)
+        entry.grid(row=0, column=1, sticky="ew")
+        entry.bind("<Return>", lambda e: self._apply())
+        ttk.Button(self, text="Apply", command=self._apply).grid(
+            row=0, column=2, padx=(4, 0))
+        ttk.Button(self, text="Clear", command=self._clear_query).grid(
+            row=0, column=3, padx=(4, 0))
+
+        self._match_var = tk.StringVar()
+        tk.Label(self, textvariable=self._match_var, bg=Theme.PANEL,
+                 fg=Theme.FG_DIM, font=Theme.FONT_SMALL, anchor="w").grid(row=0, column=4, padx=(8, 0))
+
+        self._heatmap = tk.Canvas(self, height=22, bg=Theme.PANEL,
+                                  highlightthickness=0)
+        self._heatmap.grid(row=1, column=0, columnspan=5, sticky="ew", pady=(4, 0))
+
+    # ------------------------------------------------------------------
+    # Interaction
+    # ------------------------------------------------------------------
+
+    def _apply(self):
+        text = self._query_var.get().strip()
+        if self._matrix is None or not text:
+            self._clear_query()
+            return
+        try:
+            students = self._matrix.query(text)
+        except ValueError as e:
+            self._match_var.set(str(e))
+            return
+        names = self._matrix.names(students)
+        self._match_var.set(f"{len(names)} match")
+        self._query_cb(set(names))
+
+    def _clear_query(self):
+        self._query_var.set("")
+        self._match_var.set("")
+        self._query_cb(None)
+
+    def _query_failed(self, test_num: int):
+        self._query_var.set(f"fail:{test_num}")
+        self._apply()
+
+    # ------------------------------------------------------------------
+    # Heatmap
+    # ------------------------------------------------------------------
+
+    def _draw_heatmap(self):
+        canvas = self._heatmap
+        canvas.delete("all")
+        if self._matrix is None:
+            return
+        x = 0
+        for test_num, rate in enumerate(self._matrix.pass_rates(), 1):
+            label = f"T{test_num} {rate:.0%}"
+            width = 12 + 7 * len(label)
+            tag = f"test{test_num}"
+            canvas.create_rectangle(x, 2, x + width - 4, 20, fill=_rate_color(rate),
+                                    outline="", tags=(tag,))
+            canvas.create_text(x + 6, 11, text=label, anchor="w", fill=Theme.BG,
+                               font=Theme.FONT_SMALL, tags=(tag,))
+            canvas.tag_bind(tag, "<Button-1>",
+                            lambda e, t=test_num: self._query_failed(t))
+            x += width
+
+
+def _rate_color(rate: float) -> str:
+    """Blend from the crash red (0%) through yellow to the perfect green (100%)."""
+    def rgb(color: str) -> tuple[int, int, int]:
+        return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+    if rate < 0.5:
+        lo, hi, t = rgb(Theme.CRASH), rgb(Theme.PARTIAL), rate * 2
+    else:
+        lo, hi, t = rgb(Theme.PARTIAL), rgb(Theme.PERFECT), (rate - 0.5) * 2
+    return "#" + "".join(f"{round(a + (b - a) * t):02x}" for a, b in zip(lo, hi))
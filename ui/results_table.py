@@ -1,4 +1,10 @@
-"""Sortable, filterable Treeview table of student grading results."""
+"""Sortable, filterable Treeview table of student grading results.
+
+Rows are created once per student and kept: sorting and filtering reorder
+and detach the existing items with a single Treeview.set_children() call
+instead of deleting and reinserting every row, and results are indexed by
+name so selection lookups are O(1).
+"""
 
 from __future__ import annotations
 import subprocess
@@ -36,8 +42,10 @@ class ResultsTable(ttk.Frame):
     ):
         super().__init__(parent)
         self._on_select = on_select
-        self._all_results: list[StudentResult] = []
+        self._by_name: dict[str, StudentResult] = {}   # in arrival order
+        self._arrange_pending = False
         self._active_filter: Optional[str] = None
+        self._name_filter: Optional[set[str]] = None
         self._sort_col: str = _COL_SCORE
         self._sort_rev: bool = False
         self._build()
@@ -47,18 +55,64 @@ class ResultsTable(ttk.Frame):
     # ------------------------------------------------------------------
 
     def load(self, results: list[StudentResult]):
-        """Replace the table contents with a new result list."""
-        self._all_results = results
-        self._render()
+        """Replace the table contents with a new result list.
+
+        Rows for students already shown are updated in place rather than
+        recreated, so loading the final list after streaming is cheap.
+        """
+        names = {r.name for r in results}
+        stale = [name for name in self._by_name if name not in names]
+        if stale:
+            self._tree.delete(*stale)
+        for name in stale:
+            del self._by_name[name]
+        self._upsert(results)
+        self._by_name = {r.name: self._by_name[r.name] for r in results}
+        self._arrange()
+
+    def add(self, results: list[StudentResult]):
+        """Add or update rows for a batch of results as they stream in.
+
+        Re-sorting is deferred to idle time, so several batches arriving in
+        the same frame are arranged once.
+        """
+        self._upsert(results)
+        if not self._arrange_pending:
+            self._arrange_pending = True
+            self.after_idle(self._arrange)
 
     def apply_filter(self, category: Optional[str]):
         """Show only rows matching category value, or all if None."""
         self._active_filter = category
-        self._render()
+        self._arrange()
+
+    def apply_name_filter(self, names: Optional[set[str]]):
+        """Show only the named students (e.g. an outcome query), or all if None.
+
+        Combines with the category filter.
+        """
+        self._name_filter = names
+        self._arrange()
 
     def clear(self):
-        self._all_results = []
-        self._render()
+        if self._by_name:
+            self._tree.delete(*self._by_name)
+        self._by_name.clear()
+
+    def neighbours(self, name: str, radius: int = 2) -> list[StudentResult]:
+        """Return the results shown within radius rows of name, nearest first."""
+        if not self._tree.exists(name):
+            return []
+        found: list[StudentResult] = []
+        up = down = name
+        for _ in range(radius):
+            down = self._tree.next(down) if down else ""
+            up = self._tree.prev(up) if up else ""
+            for iid in (down, up):
+                result = self._result_by_name(iid) if iid else None
+                if result:
+                    found.append(result)
+        return found
 
     # ------------------------------------------------------------------
     # Build
@@ -114,15 +168,12 @@ class ResultsTable(ttk.Frame):
     # Render
     # ------------------------------------------------------------------
 
-    def _render(self):
-        # Clear
-        for item in self._tree.get_children():
-            self._tree.delete(item)
-
-        filtered = self._filtered()
-        sorted_  = self._sorted(filtered)
-
-        for r in sorted_:
+    def _upsert(self, results: list[StudentResult]):
+        """Create items for new students and refresh changed ones."""
+        for r in results:
+            old = self._by_name.get(r.name)
+            if old is r:
+                continue
             notes_str = " | ".join(r.notes) if r.notes else ""
             tier_str  = r.overall_match_tier.value.capitalize()
             values = (
@@ -132,21 +183,34 @@ class ResultsTable(ttk.Frame):
                 tier_str,
                 notes_str,
             )
-            self._tree.insert(
-                "", "end",
-                iid=r.name,
-                values=values,
-                tags=(r.category.value,),
-            )
+            if old is None:
+                self._tree.insert(
+                    "", "end",
+                    iid=r.name,
+                    values=values,
+                    tags=(r.category.value,),
+                )
+            else:
+                self._tree.item(r.name, values=values, tags=(r.category.value,))
+            self._by_name[r.name] = r
+
+    def _arrange(self):
+        """Order and filter the existing items in one Tcl call."""
+        self._arrange_pending = False
+        shown = self._sorted(self._filtered())
+        self._tree.set_children("", *(r.name for r in shown))
 
     # ------------------------------------------------------------------
     # Filtering & sorting
     # ------------------------------------------------------------------
 
     def _filtered(self) -> list[StudentResult]:
+        results = self._by_name.values()
+        if self._name_filter is not None:
+            results = [r for r in results if r.name in self._name_filter]
         if not self._active_filter:
-            return self._all_results
-        return [r for r in self._all_results if r.category.value == self._active_filter]
+            return list(results)
+        return [r for r in results if r.category.value == self._active_filter]
 
     def _sorted(self, results: list[StudentResult]) -> list[StudentResult]:
         col = self._sort_col
@@ -160,7 +224,7 @@ class ResultsTable(ttk.Frame):
             )}
             key = lambda r: _order.get(r.category.value, 99)
         elif col == _COL_TIER:
-            _torder = ["exact","normalized","semantic","file_only","mismatch","error"]
+            _torder = ["exact","normalized","numeric","semantic","file_only","mismatch","error"]
             key = lambda r: _torder.index(r.overall_match_tier.value) if r.overall_match_tier.value in _torder else 99
         else:
             key = lambda r: r.name.lower()
@@ -173,7 +237,7 @@ class ResultsTable(ttk.Frame):
         else:
             self._sort_col = col
             self._sort_rev = (col == _COL_SCORE)  # scores default descending
-        self._render()
+        self._arrange()
 
     # ------------------------------------------------------------------
     # Events
@@ -224,7 +288,4 @@ class ResultsTable(ttk.Frame):
         self._tree.clipboard_append(notes)
 
     def _result_by_name(self, name: str) -> Optional[StudentResult]:
-        for r in self._all_results:
-            if r.name == name:
-                return r
-        return None
+        return self._by_name.get(name)
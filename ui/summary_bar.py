@@ -2,6 +2,9 @@
 
 Layout:
   ■ 3 Perfect  ■ 17 Cosmetic  ■ 5 Logic Fail  ■ 6 Crash  │ 31 total │ Avg: 72.3%
+  4.2 students/s · 21.0 tests/s · ETA 0:38 · 4 busy / 0 idle · 1 timeout · 160 queued
+
+The second row shows live run metrics while a run is executing.
 
 Each colored chip is also a filter button — clicking it calls the provided
 filter_callback with the category string (or None to reset).
@@ -13,6 +16,7 @@ from tkinter import ttk
 from typing import Callable, Optional
 
 from ui.theme import Theme
+from engine.metrics import MetricsSnapshot
 from engine.models import StudentCategory, StudentResult
 
 
@@ -46,11 +50,25 @@ class SummaryBar(ttk.Frame):
         self._total_var.set(f"{n} total")
         self._avg_var.set(f"Avg: {avg:.1f}%")
 
+    def show_metrics(self, snap: MetricsSnapshot):
+        """Show a run's live throughput line (hidden until students are queued)."""
+        if not snap.students_total:
+            return
+        eta = "—" if snap.eta_s is None else _duration(snap.eta_s)
+        timeouts = f"{snap.timeouts} timeout{'s' if snap.timeouts != 1 else ''}"
+        self._metrics_var.set(
+            f"{snap.students_per_s:.1f} students/s · {snap.tests_per_s:.1f} tests/s · "
+            f"ETA {eta} · {snap.busy} busy / {snap.idle} idle · {timeouts} · "
+            f"{snap.queued} queued")
+        self._metrics_label.grid()
+
     def clear(self):
         for v in self._count_vars.values():
             v.set("0")
         self._total_var.set("0 total")
         self._avg_var.set("Avg: —")
+        self._metrics_var.set("")
+        self._metrics_label.grid_remove()
         self._set_active(None)
 
     # ------------------------------------------------------------------
@@ -116,6 +134,15 @@ class SummaryBar(ttk.Frame):
                  bg=Theme.BG, fg=Theme.ACCENT,
                  font=Theme.FONT_HEADER).grid(row=0, column=col, padx=(0, 6))
 
+        # Live run metrics
+        self._metrics_var = tk.StringVar(value="")
+        self._metrics_label = tk.Label(self, textvariable=self._metrics_var,
+                                       bg=Theme.BG, fg=Theme.FG_DIM,
+                                       font=Theme.FONT_BODY, anchor="w")
+        self._metrics_label.grid(row=1, column=0, columnspan=col + 1,
+                                 sticky="w", pady=(0, 4))
+        self._metrics_label.grid_remove()
+
     # ------------------------------------------------------------------
     # Interaction
     # ------------------------------------------------------------------
@@ -142,3 +169,10 @@ class SummaryBar(ttk.Frame):
                 chip.configure(bg=Theme.BORDER)
                 for w in chip.winfo_children():
                     w.configure(bg=Theme.BORDER)
+
+
+def _duration(seconds: float) -> str:
+    """'0:38', '12:05', '1:02:09'."""
+    m, sec = divmod(round(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h}:{m:02d}:{sec:02d}" if h else f"{m}:{sec:02d}"
@@ -0,0 +1,65 @@
+"""Thread-safe queue of UI updates, applied by the Tk loop on a timer.
+
+Worker threads never touch widgets. They post callables here, and the Tk
+thread drains the queue every 50 ms:
+
+    updates.post(lambda: status_var.set(msg), key="status")   # latest wins
+    updates.extend("results", chunk, table.add)               # one call per drain
+    updates.post(lambda: show(results))                       # runs in order
+
+A keyed post replaces the pending update with the same key, so a worker
+reporting progress per student costs the UI one update per tick however fast
+students finish. Updates run in the order they were (last) posted.
+"""
+
+from __future__ import annotations
+
+import threading
+import traceback
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+class UiUpdates:
+    def __init__(self, widget, interval_ms: int = 50):
+        self._widget = widget
+        self._interval = interval_ms
+        self._lock = threading.Lock()
+        # key -> (callable, items for extend() or None)
+        self._pending: OrderedDict[Hashable, tuple[Callable, Optional[list]]] = OrderedDict()
+        self._widget.after(interval_ms, self._tick)
+
+    def post(self, fn: Callable[[], object], key: Optional[Hashable] = None):
+        """Run fn on the Tk thread, replacing any pending update under key."""
+        with self._lock:
+            if key is None:
+                key = object()
+            else:
+                self._pending.pop(key, None)
+            self._pending[key] = (fn, None)
+
+    def extend(self, key: Hashable, items: list, apply: Callable[[list], object]):
+        """Queue items for apply(items), merged with any still pending under key."""
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = (apply, list(items))
+            else:
+                entry[1].extend(items)
+
+    def drain(self) -> int:
+        """Apply everything pending (Tk thread); returns how many updates ran."""
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+        for fn, items in pending.values():
+            try:
+                fn() if items is None else fn(items)
+            except Exception:
+                traceback.print_exc()
+        return len(pending)
+
+    def _tick(self):
+        try:
+            self.drain()
+        finally:
+            self._widget.after(self._interval, self._tick)